@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Checksum micro-benchmark: throughput of each checksum backend
+
+Checksums random payloads of each MSS size with every registered backend
+and reports MB/s.
+
+Usage:
+    python3 bench/bench_checksum.py [--mss 100 500 1000 ...] [--seconds 0.5]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from checksum import BACKENDS, CHECKSUM_BACKEND, reference_checksum
+
+DEFAULT_MSS = [100, 500, 1000, 1460, 4096, 8192, 16384, 65535]
+
+
+def measure(func, data, seconds):
+    """Call func(data) repeatedly for about `seconds`; return MB/s."""
+    iterations = 0
+    batch = 1
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _ in range(batch):
+            func(data)
+        iterations += batch
+        batch *= 2
+        elapsed = time.perf_counter() - start
+    return iterations * len(data) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure checksum backend throughput')
+    parser.add_argument('--mss', type=int, nargs='+', default=DEFAULT_MSS,
+                        help='Payload sizes in bytes (default: 100 ... 65535)')
+    parser.add_argument('--seconds', type=float, default=0.5,
+                        help='Minimum time per measurement (default: 0.5)')
+    args = parser.parse_args()
+    
+    backends = sorted(BACKENDS)
+    
+    print("="*70)
+    print("Checksum backend throughput (MB/s)")
+    print(f"Active backend: {CHECKSUM_BACKEND}")
+    print("="*70)
+    print(f"{'MSS':<10}" + "".join(f"{name:>14}" for name in backends))
+    print("-"*70)
+    
+    for mss in args.mss:
+        data = os.urandom(mss)
+        expected = reference_checksum(data)
+        row = f"{mss:<10}"
+        for name in backends:
+            if BACKENDS[name](data) != expected:
+                print(f"ERROR: backend {name} disagrees with reference at MSS={mss}")
+                sys.exit(1)
+            row += f"{measure(BACKENDS[name], data, args.seconds):>14.1f}"
+        print(row)
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: asyncio transfers vs thread-per-transfer
+
+Runs many simultaneous localhost transfers, each to its own receiver, once
+with every sender and receiver on a single asyncio event loop and once with
+a SimpleFTPServer thread and a SimpleFTPClient thread per transfer, and
+reports aggregate throughput for both.
+
+Usage:
+    python3 bench/bench_concurrency.py [--transfers 100] [--size 262144] [--window 32] [--mss 1000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aio import send_file, start_server
+from client import SimpleFTPClient
+from server import SimpleFTPServer
+
+
+def run_async(input_file, outputs, window, mss):
+    """All transfers on one event loop; returns elapsed seconds."""
+    async def transfer():
+        servers = [await start_server(0, out, 0.0, host='127.0.0.1') for out in outputs]
+        start = time.monotonic()
+        try:
+            await asyncio.gather(*(send_file('127.0.0.1', server.port, input_file, window, mss)
+                                   for server in servers))
+            return time.monotonic() - start
+        finally:
+            for server in servers:
+                server.stop()
+    
+    return asyncio.run(transfer())
+
+
+def run_threads(input_file, outputs, window, mss):
+    """One server thread and one client thread per transfer; returns elapsed seconds."""
+    servers = []
+    for out in outputs:
+        server = SimpleFTPServer(0, out, 0.0)
+        server.start()
+        servers.append(server)
+    server_threads = [threading.Thread(target=server.run) for server in servers]
+    for thread in server_threads:
+        thread.start()
+    
+    clients = [SimpleFTPClient('127.0.0.1', server.port, input_file, window, mss)
+               for server in servers]
+    client_threads = [threading.Thread(target=lambda c=c: (c.start(), c.run())) for c in clients]
+    
+    start = time.monotonic()
+    for thread in client_threads:
+        thread.start()
+    for thread in client_threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    
+    for server in servers:
+        server.stop()
+    for thread in server_threads:
+        thread.join()
+    return elapsed
+
+
+def verify(input_file, outputs):
+    with open(input_file, 'rb') as f:
+        expected = f.read()
+    for out in outputs:
+        with open(out, 'rb') as f:
+            if f.read() != expected:
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare asyncio and thread-per-transfer throughput')
+    parser.add_argument('--transfers', type=int, default=100, help='Concurrent transfers (default: 100)')
+    parser.add_argument('--size', type=int, default=256 * 1024, help='File size in bytes (default: 262144)')
+    parser.add_argument('--window', type=int, default=32, help='Window size N (default: 32)')
+    parser.add_argument('--mss', type=int, default=1000, help='MSS in bytes (default: 1000)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        with open(input_file, 'wb') as f:
+            f.write(os.urandom(args.size))
+        outputs = [os.path.join(tmp, f'out{i}.bin') for i in range(args.transfers)]
+        total_mb = args.transfers * args.size / 1e6
+        
+        print("="*70)
+        print(f"{args.transfers} concurrent transfers of {args.size} bytes (N={args.window}, MSS={args.mss})")
+        print("="*70)
+        print(f"{'Mode':<20} {'Time (s)':<12} {'Aggregate MB/s':<16} {'CPU (s)':<10} {'Intact'}")
+        print("-"*70)
+        
+        for name, runner in (('asyncio', run_async), ('thread-per-transfer', run_threads)):
+            cpu_start = time.process_time()
+            # Silence per-transfer server and timeout messages
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                elapsed = runner(input_file, outputs, args.window, args.mss)
+            cpu = time.process_time() - cpu_start
+            intact = verify(input_file, outputs)
+            print(f"{name:<20} {elapsed:<12.3f} {total_mb / elapsed:<16.2f} {cpu:<10.3f} {intact}")
+        print("="*70)
+
+
+if __name__ == '__main__':
+    main()
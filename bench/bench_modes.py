@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Go-Back-N vs Selective Repeat vs SACK: goodput and bytes on the wire
+
+Runs loopback transfers with an in-process server for each window size of
+the Task 1 sweep in each mode (and each congestion controller given with
+--cc), and reports transfer time, goodput, bytes sent and retransmissions.
+
+Usage:
+    python3 bench/bench_modes.py [--size 1048576] [--mss 500] [--loss 0.05] [--windows 1 2 4 ...] [--cc none reno cubic]
+"""
+
+import os
+import sys
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from client import SimpleFTPClient
+from server import SimpleFTPServer
+from congestion import CONTROLLERS
+
+WINDOW_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+def run_transfer(input_file, output_file, window, mss, loss, mode, congestion, seed):
+    """One loopback transfer; returns the client stats."""
+    random.seed(seed)
+    server = SimpleFTPServer(0, output_file, loss)
+    server.start()
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+    try:
+        client = SimpleFTPClient('127.0.0.1', server.port, input_file, window, mss, mode=mode,
+                                 congestion=congestion)
+        client.start()
+        client.run()
+    finally:
+        server.stop()
+        server_thread.join()
+    return client.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Go-Back-N, Selective Repeat and SACK')
+    parser.add_argument('--size', type=int, default=1024 * 1024, help='File size in bytes (default: 1 MiB)')
+    parser.add_argument('--mss', type=int, default=500, help='MSS in bytes (default: 500)')
+    parser.add_argument('--loss', type=float, default=0.05, help='Server loss probability (default: 0.05)')
+    parser.add_argument('--windows', type=int, nargs='+', default=WINDOW_SIZES,
+                        help='Window sizes to test (default: Task 1 sweep)')
+    parser.add_argument('--cc', nargs='+', default=['none'], choices=sorted(CONTROLLERS),
+                        help='Congestion controllers to compare (default: none)')
+    parser.add_argument('--seed', type=int, default=1, help='Loss RNG seed (default: 1)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        output_file = os.path.join(tmp, 'output.bin')
+        with open(input_file, 'wb') as f:
+            f.write(os.urandom(args.size))
+        
+        print("="*85)
+        print(f"GBN vs SR vs SACK: {args.size} bytes, MSS={args.mss}, p={args.loss}")
+        print("="*85)
+        print(f"{'N':<6} {'Mode':<5} {'CC':<6} {'Time (s)':<10} {'Goodput MB/s':<14} {'Wire bytes':<12} "
+              f"{'Overhead':<10} {'Retrans':<8}")
+        print("-"*85)
+        
+        for window in args.windows:
+            for mode in ('gbn', 'sr', 'sack'):
+                for congestion in args.cc:
+                    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                        stats = run_transfer(input_file, output_file, window, args.mss,
+                                             args.loss, mode, congestion, args.seed)
+                    goodput = stats['payload_bytes'] / stats['elapsed'] / 1e6
+                    overhead = stats['bytes_sent'] / stats['payload_bytes']
+                    print(f"{window:<6} {mode:<5} {congestion:<6} {stats['elapsed']:<10.3f} {goodput:<14.2f} "
+                          f"{stats['bytes_sent']:<12} {overhead:<10.2f} {stats['retransmissions']:<8}")
+        print("="*85)
+
+
+if __name__ == '__main__':
+    main()
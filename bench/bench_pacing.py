@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pacing benchmark: achieved vs. target sending rate
+
+Runs loopback transfers with an in-process server, once unpaced and once
+per target rate (plus cwnd-derived pacing with Reno), and reports the
+target and achieved rates, the error, retransmissions, loop wakeups and
+sender CPU time.
+
+Usage:
+    python3 bench/bench_pacing.py [--size 4194304] [--window 64] [--mss 1000] [--rates 1M 5M 20M]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from client import SimpleFTPClient
+from server import SimpleFTPServer
+from pacing import parse_rate
+
+DEFAULT_RATES = ['1M', '5M', '10M', '20M']
+
+
+def run_transfer(input_file, output_file, window, mss, pacing, congestion):
+    """One loopback transfer; returns the client."""
+    server = SimpleFTPServer(0, output_file, 0.0)
+    server.start()
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+    try:
+        client = SimpleFTPClient('127.0.0.1', server.port, input_file, window, mss,
+                                 congestion=congestion, pacing=pacing)
+        client.start()
+        client.run()
+    finally:
+        server.stop()
+        server_thread.join()
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure achieved vs. target pacing rate')
+    parser.add_argument('--size', type=int, default=4 * 1024 * 1024, help='File size in bytes (default: 4 MiB)')
+    parser.add_argument('--window', type=int, default=64, help='Window size N (default: 64)')
+    parser.add_argument('--mss', type=int, default=1000, help='MSS in bytes (default: 1000)')
+    parser.add_argument('--rates', nargs='+', default=DEFAULT_RATES,
+                        help='Target rates in bytes/s, suffixes k/M/G (default: 1M 5M 10M 20M)')
+    args = parser.parse_args()
+    
+    runs = [('unpaced', None, 'none')]
+    runs += [(rate, parse_rate(rate), 'none') for rate in args.rates]
+    runs.append(('cwnd', 'cwnd', 'reno'))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        output_file = os.path.join(tmp, 'output.bin')
+        with open(input_file, 'wb') as f:
+            f.write(os.urandom(args.size))
+        
+        print("="*78)
+        print(f"Pacing: {args.size} bytes, N={args.window}, MSS={args.mss}")
+        print("="*78)
+        print(f"{'Pacing':<10} {'Target MB/s':<13} {'Achieved MB/s':<15} {'Error':<9} "
+              f"{'Retrans':<9} {'Wakeups':<9} {'CPU (s)':<8}")
+        print("-"*78)
+        
+        for name, pacing, congestion in runs:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                client = run_transfer(input_file, output_file, args.window, args.mss,
+                                      pacing, congestion)
+            stats = client.stats
+            achieved = client.send_rate()
+            target = stats['pacing_target']
+            error = f"{(achieved - target) / target * 100:+.1f}%" if target else '-'
+            target = f"{target / 1e6:.2f}" if target else '-'
+            print(f"{name:<10} {target:<13} {achieved / 1e6:<15.2f} {error:<9} "
+                  f"{stats['retransmissions']:<9} {stats['wakeups']:<9} {stats['cpu_time']:<8.3f}")
+        print("="*78)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Pipelined receiver benchmark: goodput with a slow disk
+
+Runs loopback transfers into an in-process server whose output writes are
+artificially slowed (fixed latency per write call plus a disk rate), with
+the writes inline on the network thread and on the per-session writer
+thread (with and without the advertised receive window), and once with an
+unthrottled disk for reference. Progress is
+sampled every --interval seconds to show how steady goodput is; timeouts
+and retransmissions show how often slow ACKs fooled the sender.
+
+Usage:
+    python3 bench/bench_pipeline.py [--size 8388608] [--window 64] [--mss 1000] [--latency 0.02] [--disk-rate 20M]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import server as server_module
+from client import SimpleFTPClient
+from server import SimpleFTPServer
+from pacing import parse_rate
+from writer import WriteBehind
+
+
+def slow_writer(latency, rate):
+    """WriteBehind whose every write call stalls like a slow disk."""
+    class SlowWriteBehind(WriteBehind):
+        def _write(self, buffers, offset):
+            time.sleep(latency + sum(len(b) for b in buffers) / rate)
+            super()._write(buffers, offset)
+    return SlowWriteBehind
+
+
+def run_transfer(input_file, output_file, window, mss, chunk, threaded, advertise, writer_class, interval):
+    """One transfer; returns (client stats, per-interval goodputs in MB/s, refused segments)."""
+    server_module.WriteBehind = writer_class
+    server = SimpleFTPServer(0, output_file, 0.0, write_chunk=chunk, write_thread=threaded,
+                             advertise_window=advertise)
+    server.start()
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+    client = SimpleFTPClient('127.0.0.1', server.port, input_file, window, mss)
+    samples = []
+    done = threading.Event()
+    
+    def sample():
+        while not done.wait(interval):
+            samples.append(client.base * mss)
+    
+    sampler = threading.Thread(target=sample)
+    try:
+        client.start()
+        sampler.start()
+        client.run()
+    finally:
+        done.set()
+        if sampler.is_alive():
+            sampler.join()
+        session = server.last_session
+        refused = session.overflows if session else 0
+        server.stop()
+        server_thread.join()
+        server_module.WriteBehind = WriteBehind
+    rates = [(b - a) / interval / 1e6 for a, b in zip([0] + samples, samples)]
+    return client.stats, rates, refused
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare inline and pipelined receiver writes on a slow disk')
+    parser.add_argument('--size', type=int, default=8 * 1024 * 1024, help='File size in bytes (default: 8 MiB)')
+    parser.add_argument('--window', type=int, default=64, help='Window size N (default: 64)')
+    parser.add_argument('--mss', type=int, default=1000, help='MSS in bytes (default: 1000)')
+    parser.add_argument('--chunk', type=int, default=256 * 1024, help='Write chunk size (default: 256 KiB)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Seconds added to every disk write (default: 0.02)')
+    parser.add_argument('--disk-rate', type=parse_rate, default=parse_rate('20M'),
+                        help='Simulated disk rate in bytes/s (default: 20M)')
+    parser.add_argument('--interval', type=float, default=0.1,
+                        help='Goodput sampling interval in seconds (default: 0.1)')
+    args = parser.parse_args()
+    
+    slow = slow_writer(args.latency, args.disk_rate)
+    cases = [('fast disk, pipelined', True, True, WriteBehind),
+             ('slow disk, inline', False, True, slow),
+             ('slow disk, no rwnd', True, False, slow),
+             ('slow disk, pipelined', True, True, slow)]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        output_file = os.path.join(tmp, 'output.bin')
+        with open(input_file, 'wb') as f:
+            f.write(os.urandom(args.size))
+        
+        print("="*90)
+        print(f"Receiver pipeline: {args.size} bytes, N={args.window}, MSS={args.mss}, "
+              f"disk {args.latency * 1e3:.0f} ms + {args.disk_rate / 1e6:.0f} MB/s per write")
+        print("="*90)
+        print(f"{'Receiver':<22} {'Time (s)':<10} {'Goodput MB/s':<14} {'Min/max MB/s':<15} "
+              f"{'Timeouts':<10} {'Retrans':<9} {'Refused':<8}")
+        print("-"*90)
+        for name, threaded, advertise, writer_class in cases:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                stats, rates, refused = run_transfer(input_file, output_file, args.window, args.mss,
+                                                     args.chunk, threaded, advertise, writer_class,
+                                                     args.interval)
+            with open(output_file, 'rb') as f, open(input_file, 'rb') as g:
+                assert f.read() == g.read(), name
+            goodput = stats['payload_bytes'] / stats['elapsed'] / 1e6
+            spread = f"{min(rates):.2f}/{max(rates):.2f}" if rates else "-"
+            print(f"{name:<22} {stats['elapsed']:<10.3f} {goodput:<14.2f} {spread:<15} "
+                  f"{stats['timeouts']:<10} {stats['retransmissions']:<9} {refused:<8}")
+        print("="*90)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Receive-path allocation benchmark: memory allocated per received packet
+
+Feeds data packets over loopback into an in-process server's packet
+handler, once through the old path (recvfrom() returning a fresh bytes
+object, sliced again by deserialize) and once through the pooled
+DatagramIO path (recvfrom_into/recvmmsg into reused buffers, payload
+written straight from a memoryview). tracemalloc reports the transient
+peak allocated while each packet is received and handled; a separate
+untraced run gives the time per packet.
+
+Usage:
+    python3 bench/bench_recv_alloc.py [--mss 500] [--packets 20000] [--batch 64]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batchio import DatagramIO, MAX_DATAGRAM
+from packet import DataPacket
+from server import SimpleFTPServer
+
+
+def copying_receive(server):
+    """The receive path before pooling: one new 64 KiB bytes object per recvfrom()."""
+    batch = []
+    while len(batch) < server.io.batch_size:
+        try:
+            batch.append(server.sock.recvfrom(MAX_DATAGRAM))
+        except BlockingIOError:
+            break
+    return batch
+
+
+def pooled_receive(server):
+    return server.io.recv()
+
+
+def run(receive, output_file, mss, packets, batch, traced):
+    """Send packets in batches and handle them; returns (peak bytes per batch, seconds per packet)."""
+    server = SimpleFTPServer(0, output_file, 0.0)
+    server.start()
+    server.io = DatagramIO(server.sock, batch)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    out = DatagramIO(sender, batch)
+    addr = ('127.0.0.1', server.port)
+    payload = os.urandom(mss)
+    
+    peak_total = 0
+    rounds = 0
+    handled = 0
+    elapsed = 0.0
+    seq = 0
+    try:
+        while handled < packets:
+            count = min(batch, packets - seq)
+            frames = [DataPacket.build_frame(seq + i, payload) for i in range(count)]
+            seq += out.send(frames, addr)
+            while handled < seq:
+                if traced:
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter()
+                received = receive(server)
+                server.outbox = []
+                for raw, src in received:
+                    server._handle_packet(raw, src)
+                # ACKs are not what is being measured
+                server.outbox = None
+                elapsed += time.perf_counter() - start
+                del received
+                if traced:
+                    peak_total += tracemalloc.get_traced_memory()[1] - baseline
+                rounds += 1
+                handled = server.expected_seq
+    finally:
+        sender.close()
+        server.stop()
+    return peak_total / rounds, elapsed / handled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure receive-path allocations per packet')
+    parser.add_argument('--mss', type=int, default=500, help='Payload bytes per packet (default: 500)')
+    parser.add_argument('--packets', type=int, default=20000, help='Packets to receive (default: 20000)')
+    parser.add_argument('--batch', type=int, default=64, help='Datagrams per receive batch (default: 64)')
+    args = parser.parse_args()
+    
+    paths = [('recvfrom + copies', copying_receive), ('pooled views', pooled_receive)]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'output.bin')
+        print("="*70)
+        print(f"Receive path: {args.packets} packets, MSS={args.mss}, batch={args.batch}")
+        print("="*70)
+        print(f"{'Path':<20} {'Peak bytes/batch':<18} {'Peak bytes/packet':<18} {'us/packet':<10}")
+        print("-"*70)
+        for name, receive in paths:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                tracemalloc.start()
+                peak, _ = run(receive, output_file, args.mss, args.packets, args.batch, True)
+                tracemalloc.stop()
+                _, per_packet = run(receive, output_file, args.mss, args.packets, args.batch, False)
+            print(f"{name:<20} {peak:<18,.0f} {peak / args.batch:<18,.0f} {per_packet * 1e6:<10.2f}")
+        print("="*70)
+
+
+if __name__ == '__main__':
+    main()
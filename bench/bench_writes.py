@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Receiver write path benchmark: flush-per-packet vs. write-behind
+
+Writes a file as a stream of MSS-sized payloads, the way the server
+delivers in-order segments, first with write()+flush() per payload (the
+old receiver) and then through WriteBehind with each fsync policy, inline
+and on a writer thread. Reports time per payload, write system calls and
+throughput.
+
+Usage:
+    python3 bench/bench_writes.py [--size 33554432] [--mss 500] [--chunk 262144]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from writer import WriteBehind, DEFAULT_CHUNK_SIZE
+
+
+def flush_per_packet(path, payloads):
+    with open(path, 'wb') as f:
+        for payload in payloads:
+            f.write(payload)
+            f.flush()
+    return len(payloads)
+
+
+def write_behind(path, payloads, **options):
+    writer = WriteBehind(path, **options)
+    for payload in payloads:
+        writer.write(payload)
+    writer.close()
+    return writer.syscalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare flush-per-packet and write-behind output')
+    parser.add_argument('--size', type=int, default=32 * 1024 * 1024, help='Bytes to write (default: 32 MiB)')
+    parser.add_argument('--mss', type=int, default=500, help='Payload size in bytes (default: 500)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Write-behind chunk size (default: {DEFAULT_CHUNK_SIZE})')
+    args = parser.parse_args()
+    
+    data = memoryview(os.urandom(args.size))
+    payloads = [data[i:i + args.mss] for i in range(0, args.size, args.mss)]
+    cases = [('write+flush', flush_per_packet, {})]
+    for threaded in (False, True):
+        for fsync in ('none', 'end', 'periodic'):
+            name = f"{'thread' if threaded else 'inline'}, fsync={fsync}"
+            cases.append((name, write_behind, {'chunk_size': args.chunk, 'fsync': fsync,
+                                               'threaded': threaded}))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'output.bin')
+        print("="*70)
+        print(f"Writing {args.size} bytes as {len(payloads)} payloads of {args.mss} bytes "
+              f"(chunk={args.chunk})")
+        print("="*70)
+        print(f"{'Writer':<26} {'us/payload':<12} {'Write calls':<13} {'MB/s':<8}")
+        print("-"*70)
+        for name, run, options in cases:
+            start = time.perf_counter()
+            syscalls = run(path, payloads, **options)
+            elapsed = time.perf_counter() - start
+            with open(path, 'rb') as f:
+                assert f.read() == data, name
+            print(f"{name:<26} {elapsed / len(payloads) * 1e6:<12.2f} {syscalls:<13} "
+                  f"{args.size / elapsed / 1e6:<8.1f}")
+        print("="*70)
+
+
+if __name__ == '__main__':
+    main()
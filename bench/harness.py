@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark harness: transfers without subprocesses
+
+Runs Simple-FTP transfers with the client (and, unless a remote host is
+given, the server) in this process, the server on a thread bound to an
+ephemeral loopback port. Each measurement covers the transfer alone, not
+interpreter start-up and imports, and needs no remote host, so the Phase 5
+sweeps run anywhere. run_transfer() returns one result dict per transfer
+(time, goodput, retransmissions, timeouts, client and server CPU time);
+SWEEPS holds the three task grids and cells() expands one into runs.
+With a netem profile the in-process server sits behind a NetemProxy, so
+the same runs can be repeated over an emulated WAN path.
+The task scripts take their measurements from here; --records appends
+every result to a JSON Lines file (see results.py).
+
+Usage:
+    python3 bench/harness.py task1 [--file testfile_1mb.bin] [--runs 5] [--host H --port P] [--records F]
+"""
+
+import os
+import sys
+import time
+import filecmp
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from client import SimpleFTPClient
+from server import SimpleFTPServer
+from packet import STATUS_MISMATCH
+from netem import NetemProxy, make_links, PROFILES
+from results import record, append
+
+# Swept parameter, its values, and the fixed parameters (the Phase 5 grids)
+SWEEPS = {
+    'task1': ('window', [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024], {'mss': 500, 'loss': 0.05}),
+    'task2': ('mss', [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000], {'window': 64, 'loss': 0.05}),
+    'task3': ('loss', [0.01, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08, 0.09, 0.10],
+              {'window': 64, 'mss': 500}),
+}
+DEFAULT_TIMEOUT = 300.0
+
+
+def cells(name, runs, **fixed):
+    """(params, run) for every run of every point of sweep name, in order.
+    
+    fixed overrides the sweep's fixed parameters (and may add client
+    options such as congestion or dupack_threshold).
+    """
+    parameter, values, defaults = SWEEPS[name]
+    params = dict(defaults, **fixed)
+    return [(dict(params, **{parameter: value}), run)
+            for value in values for run in range(1, runs + 1)]
+
+
+def run_transfer(input_file, window, mss, loss=0.0, host=None, port=7735, timeout=DEFAULT_TIMEOUT,
+                 quiet=True, rto_trace=None, cwnd_trace=None, profile=None, seed=0, **client_options):
+    """Send input_file once and return the result dict.
+    
+    With host None a server with loss probability `loss` runs on a thread
+    in this process and the output is compared with the input; otherwise
+    the client sends to host:port and the loss is whatever that server
+    was started with. A netem profile (see netem.PROFILES) puts an
+    impairment proxy seeded with seed in front of the in-process server,
+    on top of its own loss. client_options go to SimpleFTPClient. A transfer
+    that fails or outlasts timeout has ok=False (and an `error`).
+    """
+    result = {'window': window, 'mss': mss, 'loss': loss, 'profile': profile, 'seed': seed,
+              'bytes': os.path.getsize(input_file), 'ok': False, 'error': None}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        server = server_thread = proxy = None
+        server_cpu = [0.0]
+        if host is None:
+            server = SimpleFTPServer(0, os.path.join(tmp, 'output.bin'), loss)
+            server.start()
+            
+            def serve():
+                start = time.thread_time()
+                server.run()
+                server_cpu[0] = time.thread_time() - start
+            
+            server_thread = threading.Thread(target=serve)
+            server_thread.start()
+            host, port = '127.0.0.1', server.port
+            if profile is not None:
+                proxy = NetemProxy(0, (host, port), *make_links(profile, seed))
+                proxy.start()
+                proxy_thread = threading.Thread(target=proxy.run)
+                proxy_thread.start()
+                port = proxy.port
+        client = SimpleFTPClient(host, port, input_file, window, mss, rto_trace=bool(rto_trace),
+                                 **client_options)
+        errors = []
+        
+        def send():
+            try:
+                client.start()
+                client.run()
+            except Exception as e:
+                errors.append(e)
+        
+        # A daemon thread, so a transfer that never finishes cannot hang the sweep
+        client_thread = threading.Thread(target=send, daemon=True)
+        client_thread.start()
+        client_thread.join(timeout)
+        if proxy is not None:
+            proxy.stop()
+            proxy_thread.join()
+        if server is not None:
+            server.stop()
+            server_thread.join()
+        
+        if client_thread.is_alive():
+            # Ends the client's loop at its next wakeup
+            client.phase = 'done'
+            result['error'] = f"timed out after {timeout:.0f}s"
+        elif errors:
+            result['error'] = str(errors[0])
+        elif server is not None and not filecmp.cmp(input_file, server.output_file, shallow=False):
+            result['error'] = "output differs from input"
+        elif client.transfer_status == STATUS_MISMATCH:
+            result['error'] = "receiver reports a length or digest mismatch"
+        else:
+            result['ok'] = True
+    
+    if rto_trace:
+        client.rto.write_trace(rto_trace)
+    if cwnd_trace:
+        client.cc.write_trace(cwnd_trace)
+    stats = client.stats
+    elapsed = stats['elapsed']
+    result.update({
+        'time': elapsed,
+        'goodput': stats['payload_bytes'] / elapsed if elapsed else 0.0,
+        'bytes_sent': stats['bytes_sent'],
+        'packets_sent': stats['packets_sent'],
+        'retransmissions': stats['retransmissions'],
+        'timeouts': stats['timeouts'],
+        'fast_retransmits': stats['fast_retransmits'],
+        'client_cpu': stats['cpu_time'],
+        'server_cpu': server_cpu[0],
+    })
+    if proxy is not None:
+        forward, reverse = proxy.forward.stats, proxy.reverse.stats
+        result['data_drops'] = forward['lost'] + forward['queue_drops']
+        result['ack_drops'] = reverse['lost'] + reverse['queue_drops']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a Phase 5 sweep in-process')
+    parser.add_argument('sweep', choices=sorted(SWEEPS))
+    parser.add_argument('--file', help='Input file (default: 1 MiB of random data)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per point (default: 5)')
+    parser.add_argument('--host', help='Send to this server instead of an in-process one')
+    parser.add_argument('--port', type=int, default=7735, help='Server port with --host (default: 7735)')
+    parser.add_argument('--cc', choices=['none', 'reno', 'cubic'], default='none',
+                        help='Client congestion control (default: none)')
+    parser.add_argument('--profile', choices=sorted(PROFILES),
+                        help='Emulated link between client and in-process server (src/netem.py)')
+    parser.add_argument('--seed', type=int, default=0, help='Link emulation seed (default: 0)')
+    parser.add_argument('--records', help='Append a JSON Lines record per transfer to this file')
+    args = parser.parse_args()
+    
+    parameter = SWEEPS[args.sweep][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = args.file
+        if input_file is None:
+            input_file = os.path.join(tmp, 'input.bin')
+            with open(input_file, 'wb') as f:
+                f.write(os.urandom(1024 * 1024))
+        
+        print("="*90)
+        print(f"Sweep {args.sweep}: {parameter} over {SWEEPS[args.sweep][1]}, "
+              f"{args.runs} runs each, server {args.host or 'in-process'}, "
+              f"link {args.profile or 'loopback'}")
+        print("="*90)
+        print(f"{'Window':<8} {'MSS':<6} {'Loss':<6} {'Run':<5} {'Time (s)':<10} {'Goodput MB/s':<14} "
+              f"{'Retrans':<9} {'Timeouts':<10} {'CPU c/s (s)':<12}")
+        print("-"*90)
+        for params, run in cells(args.sweep, args.runs, congestion=args.cc):
+            result = run_transfer(input_file, host=args.host, port=args.port, profile=args.profile,
+                                  seed=args.seed + run, **params)
+            if args.records:
+                append(args.records, [record(result, args.sweep, params, run, server=args.host)])
+            if not result['ok']:
+                print(f"{params['window']:<8} {params['mss']:<6} {params['loss']:<6} {run:<5} "
+                      f"FAILED: {result['error']}")
+                continue
+            cpu = f"{result['client_cpu']:.2f}/{result['server_cpu']:.2f}"
+            print(f"{result['window']:<8} {result['mss']:<6} {result['loss']:<6} {run:<5} "
+                  f"{result['time']:<10.3f} {result['goodput'] / 1e6:<14.3f} "
+                  f"{result['retransmissions']:<9} {result['timeouts']:<10} {cpu:<12}")
+        print("="*90)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Structured benchmark results: one JSON Lines record per transfer
+
+Every transfer the task scripts, harness.py and sweep.py run is appended
+to a JSON Lines file as one record: the run_transfer() result (time,
+goodput, bytes and packets sent, retransmissions, timeouts, CPU time)
+plus the sweep name, its parameters, the run number and `env`, the host
+and git revision it ran on. Files only ever grow, so runs from different
+machines and code versions can be collected in one place and told apart
+by env['revision'].
+
+load() is the one reader the plot scripts use. It also reads the tab
+tables of the older taskN_results.txt files, so past results still plot.
+
+Usage:
+    python3 bench/results.py task1_results.jsonl [--sweep task1]
+"""
+
+import os
+import re
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# Swept parameter named by the first column header of a legacy results table
+LEGACY_COLUMNS = {'N': 'window', 'MSS': 'mss', 'p': 'loss'}
+
+_run_info = None
+
+
+def git_revision():
+    """(commit hash, uncommitted changes?) of the checkout, or (None, None) outside git."""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                  text=True, timeout=5, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                cwd=REPO_DIR, capture_output=True, text=True, timeout=5,
+                                check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+    return revision, bool(status.strip())
+
+
+def run_info():
+    """Host and code version this process measures on (computed once per process)."""
+    global _run_info
+    if _run_info is None:
+        revision, dirty = git_revision()
+        _run_info = {
+            'host': socket.gethostname(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'revision': revision,
+            'dirty': dirty,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+    return _run_info
+
+
+def record(result, sweep, params, run, **extra):
+    """A run_transfer() result as a results record."""
+    return dict(result, sweep=sweep, params=params, run=run, env=run_info(), **extra)
+
+
+def append(path, records):
+    """Append records to the JSON Lines file at path, one per line."""
+    with open(path, 'a') as out:
+        # A line cut short when an earlier writer was killed must not swallow the next record
+        if out.tell() and not _ends_with_newline(path):
+            out.write("\n")
+        for rec in records:
+            out.write(json.dumps(rec) + "\n")
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def load(path, sweep=None, failed=False):
+    """Records from a JSON Lines results file (or a legacy taskN_results.txt table).
+    
+    Only successful transfers are returned unless failed is set; sweep
+    keeps the records of that sweep alone. Malformed lines are skipped.
+    """
+    if path.endswith('.txt'):
+        records = _load_legacy(path)
+    else:
+        records = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and 'params' in rec:
+                    records.append(rec)
+    return [rec for rec in records
+            if (failed or rec.get('ok')) and (sweep is None or rec.get('sweep') == sweep)]
+
+
+def _load_legacy(path):
+    """Per-run records from the tab table written by the task scripts before JSON Lines."""
+    records = []
+    sweep = parameter = None
+    with open(path) as f:
+        for line in f:
+            title = re.match(r'Task (\d) Results', line)
+            if title:
+                sweep = f"task{title.group(1)}"
+            header = re.match(r'(\S+)\tAvg', line)
+            if header:
+                parameter = LEGACY_COLUMNS.get(header.group(1))
+            # "64	68.206		56.749		85.259		85.259, 66.973, ..."
+            row = re.match(r'([0-9.]+)\t[0-9.]+\t\t[0-9.]+\t\t[0-9.]+\t\t(.+)$', line)
+            if row and parameter:
+                value = float(row.group(1)) if parameter == 'loss' else int(row.group(1))
+                for run, elapsed in enumerate(row.group(2).split(','), 1):
+                    records.append({parameter: value, 'time': float(elapsed), 'ok': True,
+                                    'sweep': sweep, 'params': {parameter: value}, 'run': run})
+    return records
+
+
+def times_by(records, parameter):
+    """{parameter value: [transfer times]}, ordered by value."""
+    times = {}
+    for rec in records:
+        times.setdefault(rec['params'][parameter], []).append(rec['time'])
+    return dict(sorted(times.items()))
+
+
+def averages(records, parameter):
+    """([parameter values], [mean transfer time at each]), ordered by value."""
+    times = times_by(records, parameter)
+    return list(times), [sum(t) / len(t) for t in times.values()]
+
+
+def revision_label(rec):
+    """Short name of the code version a record was measured with ('legacy' for old tables)."""
+    env = rec.get('env') or {}
+    if not env.get('revision'):
+        return 'legacy' if not env else 'unknown'
+    return env['revision'][:8] + ('+' if env.get('dirty') else '')
+
+
+def by_revision(records):
+    """{revision label: records}, in the order the revisions first appear."""
+    groups = {}
+    for rec in records:
+        groups.setdefault(revision_label(rec), []).append(rec)
+    return groups
+
+
+def find_results(sweep):
+    """The results file of a sweep in this or the parent directory, JSON Lines before legacy text."""
+    for name in (f"{sweep}_results.jsonl", f"{sweep}_results.txt"):
+        for directory in ('.', '..'):
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a JSON Lines results file')
+    parser.add_argument('file')
+    parser.add_argument('--sweep', help='Only records of this sweep (task1, task2, task3)')
+    args = parser.parse_args()
+    
+    records = load(args.file, args.sweep, failed=True)
+    groups = {}
+    for rec in records:
+        key = (rec.get('sweep'), revision_label(rec))
+        groups.setdefault(key, []).append(rec)
+    print("="*70)
+    print(f"{args.file}: {len(records)} records")
+    print("="*70)
+    print(f"{'Sweep':<8} {'Revision':<10} {'Runs':<6} {'Failed':<8} {'Avg (s)':<10} {'Retrans/run':<12}")
+    print("-"*70)
+    for (sweep, revision), group in sorted(groups.items(), key=lambda item: str(item[0])):
+        ok = [rec for rec in group if rec.get('ok')]
+        avg = sum(rec['time'] for rec in ok) / len(ok) if ok else float('nan')
+        retrans = sum(rec.get('retransmissions', 0) for rec in ok) / len(ok) if ok else float('nan')
+        print(f"{sweep or '-':<8} {revision:<10} {len(group):<6} {len(group) - len(ok):<8} "
+              f"{avg:<10.3f} {retrans:<12.1f}")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
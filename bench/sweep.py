@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Parallel sweep runner: one Phase 5 sweep spread over a process pool
+
+Expands a sweep from harness.SWEEPS into independent (parameters, run)
+cells and runs them with run_transfer() on --jobs worker processes. Each
+cell gets its own in-process server on an ephemeral port (and, with
+--profile, its own emulated link seeded from --seed and the run number),
+so cells share nothing but the CPU. Every finished cell is appended to
+the --checkpoint JSON Lines file as it completes, as a results record
+(see results.py) that the plot scripts can read; running the same
+command again skips the cells already done there, so an interrupted
+sweep resumes where it stopped. Failed cells are recorded too and
+retried on the next run.
+
+Transfers that run side by side compete for CPU, so keep --jobs at or
+below half the cores (each transfer keeps a server and a client busy).
+
+Usage:
+    python3 bench/sweep.py task1 [--jobs 8] [--runs 5] [--checkpoint task1_cells.jsonl] [--profile wan]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from harness import run_transfer, cells, SWEEPS, PROFILES
+from results import load, append, record
+
+
+def cell_key(params, run):
+    return json.dumps([params, run], sort_keys=True)
+
+
+def load_checkpoint(path):
+    """{cell key: record} of the cells that finished successfully in the checkpoint file."""
+    if not os.path.exists(path):
+        return {}
+    return {cell_key(rec['params'], rec['run']): rec for rec in load(path)}
+
+
+def run_cell(input_file, params, run):
+    """Worker process: one transfer.
+    
+    The link seed is offset by the run number, so runs of one point see
+    different (but repeatable) impairments.
+    """
+    return run_transfer(input_file, **dict(params, seed=params.get('seed', 0) + run))
+
+
+def run_sweep(name, input_file, runs, jobs, checkpoint, on_result=None, **fixed):
+    """Run every cell of sweep name not yet in checkpoint; returns the new results.
+    
+    fixed is passed to cells() and so becomes part of every cell's
+    parameters (and checkpoint key), e.g. congestion, profile or seed.
+    """
+    done = load_checkpoint(checkpoint)
+    todo = [(params, run) for params, run in cells(name, runs, **fixed)
+            if cell_key(params, run) not in done]
+    results = []
+    if not todo:
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_cell, input_file, params, run): (params, run) for params, run in todo}
+        try:
+            for future in as_completed(futures):
+                result = record(future.result(), name, *futures[future])
+                append(checkpoint, [result])
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        except KeyboardInterrupt:
+            # Finished cells are already in the checkpoint
+            pool.shutdown(cancel_futures=True)
+            raise
+    return results
+
+
+def summarize(checkpoint, name, runs, **fixed):
+    """{swept value: [times of successful runs]} for the cells of a sweep found in checkpoint."""
+    parameter = SWEEPS[name][0]
+    done = load_checkpoint(checkpoint)
+    times = {}
+    for params, run in cells(name, runs, **fixed):
+        record = done.get(cell_key(params, run))
+        if record is not None:
+            times.setdefault(params[parameter], []).append(record['time'])
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a Phase 5 sweep on a process pool')
+    parser.add_argument('sweep', choices=sorted(SWEEPS))
+    parser.add_argument('--file', help='Input file (default: 1 MiB of random data)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per point (default: 5)')
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Worker processes (default: half the CPUs)')
+    parser.add_argument('--checkpoint', help='JSON Lines file of finished cells (default: <sweep>_cells.jsonl)')
+    parser.add_argument('--cc', choices=['none', 'reno', 'cubic'], default='none',
+                        help='Client congestion control (default: none)')
+    parser.add_argument('--profile', choices=sorted(PROFILES),
+                        help='Emulated link between client and server (src/netem.py)')
+    parser.add_argument('--seed', type=int, default=0, help='Link emulation seed (default: 0)')
+    args = parser.parse_args()
+    
+    checkpoint = args.checkpoint or f"{args.sweep}_cells.jsonl"
+    fixed = {'congestion': args.cc, 'profile': args.profile, 'seed': args.seed}
+    parameter = SWEEPS[args.sweep][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = args.file
+        if input_file is None:
+            input_file = os.path.join(tmp, 'input.bin')
+            with open(input_file, 'wb') as f:
+                f.write(os.urandom(1024 * 1024))
+        
+        grid = cells(args.sweep, args.runs, **fixed)
+        done = load_checkpoint(checkpoint)
+        remaining = sum(cell_key(params, run) not in done for params, run in grid)
+        print("="*70)
+        print(f"Sweep {args.sweep}: {len(grid)} cells, {remaining} to run on {args.jobs} workers, "
+              f"checkpoint {checkpoint}")
+        print("="*70)
+        
+        def progress(result):
+            status = f"{result['time']:.3f}s" if result['ok'] else f"FAILED: {result['error']}"
+            print(f"  {parameter}={result['params'][parameter]} run {result['run']}: {status}", flush=True)
+        
+        run_sweep(args.sweep, input_file, args.runs, args.jobs, checkpoint, progress, **fixed)
+    
+    print("-"*70)
+    print(f"{parameter:<10} {'Runs':<6} {'Avg (s)':<12} {'Min (s)':<12} {'Max (s)':<12}")
+    print("-"*70)
+    for value, times in summarize(checkpoint, args.sweep, args.runs, **fixed).items():
+        print(f"{value:<10} {len(times):<6} {sum(times) / len(times):<12.3f} {min(times):<12.3f} "
+              f"{max(times):<12.3f}")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Plot congestion window traces: cwnd and ssthresh over time for one or more client runs
+Reads CSV traces written by `client.py --cwnd-trace` or `task_X.py --trace-dir`
+
+Usage:
+    python3 plot/plot_cwnd.py traces/task1_N64_run1_cwnd.csv [more.csv ...]
+"""
+
+import matplotlib.pyplot as plt
+import csv
+import os
+import sys
+
+if len(sys.argv) < 2:
+    print("Usage: python3 plot/plot_cwnd.py <trace.csv> [trace.csv ...]")
+    exit(1)
+
+plt.figure(figsize=(12, 7))
+
+for trace_file in sys.argv[1:]:
+    if not os.path.exists(trace_file):
+        print(f"Error: {trace_file} not found")
+        exit(1)
+    
+    times, cwnds, ssthresh_times, ssthreshs = [], [], [], []
+    loss_times, loss_cwnds = [], []
+    with open(trace_file, 'r') as f:
+        for row in csv.DictReader(f):
+            t = float(row['time'])
+            cwnd = float(row['cwnd'])
+            times.append(t)
+            cwnds.append(cwnd)
+            if row['ssthresh']:
+                ssthresh_times.append(t)
+                ssthreshs.append(float(row['ssthresh']))
+            if row['event'] in ('loss', 'timeout'):
+                loss_times.append(t)
+                loss_cwnds.append(cwnd)
+    
+    label = os.path.splitext(os.path.basename(trace_file))[0]
+    print(f"{label}: {len(times)} samples, {len(loss_times)} reductions, max cwnd {max(cwnds):.1f}")
+    line, = plt.step(times, cwnds, where='post', linewidth=2, label=f'cwnd ({label})')
+    plt.step(ssthresh_times, ssthreshs, '--', where='post', color=line.get_color(), alpha=0.6,
+             label=f'ssthresh ({label})')
+    plt.plot(loss_times, loss_cwnds, 'x', color=line.get_color(), markersize=8)
+
+# Formatting
+plt.xlabel('Time since start (seconds)', fontsize=13, fontweight='bold')
+plt.ylabel('Segments', fontsize=13, fontweight='bold')
+plt.title('Congestion Window Trace (x = loss or timeout)', fontsize=14, fontweight='bold')
+plt.grid(True, alpha=0.3, linestyle='--')
+plt.legend(fontsize=9)
+plt.tight_layout()
+
+os.makedirs('results', exist_ok=True)
+
+output_file = 'results/cwnd_trace.png'
+plt.savefig(output_file, dpi=150, bbox_inches='tight')
+print(f"\nPlot saved to: {output_file}")
+plt.show()
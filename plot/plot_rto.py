@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Plot RTO traces: SRTT and RTO over time for one or more client runs
+Reads CSV traces written by `client.py --rto-trace` or `task_X.py --trace-dir`
+
+Usage:
+    python3 plot/plot_rto.py traces/task1_N64_run1.csv [more.csv ...]
+"""
+
+import matplotlib.pyplot as plt
+import csv
+import os
+import sys
+
+if len(sys.argv) < 2:
+    print("Usage: python3 plot/plot_rto.py <trace.csv> [trace.csv ...]")
+    exit(1)
+
+plt.figure(figsize=(12, 7))
+
+for trace_file in sys.argv[1:]:
+    if not os.path.exists(trace_file):
+        print(f"Error: {trace_file} not found")
+        exit(1)
+    
+    times, rtos, srtt_times, srtts = [], [], [], []
+    backoff_times, backoff_rtos = [], []
+    with open(trace_file, 'r') as f:
+        for row in csv.DictReader(f):
+            t = float(row['time'])
+            rto = float(row['rto'])
+            times.append(t)
+            rtos.append(rto)
+            if row['srtt']:
+                srtt_times.append(t)
+                srtts.append(float(row['srtt']))
+            if row['event'] == 'backoff':
+                backoff_times.append(t)
+                backoff_rtos.append(rto)
+    
+    label = os.path.splitext(os.path.basename(trace_file))[0]
+    print(f"{label}: {len(times)} events, {len(backoff_times)} backoffs, final RTO {rtos[-1]:.3f}s")
+    line, = plt.step(times, rtos, where='post', linewidth=2, label=f'RTO ({label})')
+    plt.plot(srtt_times, srtts, '--', color=line.get_color(), alpha=0.6, label=f'SRTT ({label})')
+    plt.plot(backoff_times, backoff_rtos, 'x', color=line.get_color(), markersize=8)
+
+# Formatting
+plt.xlabel('Time since start (seconds)', fontsize=13, fontweight='bold')
+plt.ylabel('Seconds', fontsize=13, fontweight='bold')
+plt.title('Retransmission Timeout Trace (x = timeout backoff)', fontsize=14, fontweight='bold')
+plt.yscale('log')
+plt.grid(True, alpha=0.3, linestyle='--')
+plt.legend(fontsize=9)
+plt.tight_layout()
+
+os.makedirs('results', exist_ok=True)
+
+output_file = 'results/rto_trace.png'
+plt.savefig(output_file, dpi=150, bbox_inches='tight')
+print(f"\nPlot saved to: {output_file}")
+plt.show()
@@ -1,42 +1,40 @@
 #!/usr/bin/env python3
 """
 Plot Task 1 results: Window Size N vs Average Transfer Delay
-Reads data from task1_results.txt
+Reads task1_results.jsonl (or a legacy task1_results.txt) through bench/results.py
+
+Usage:
+    python3 plot/plot_task1.py [results-file]
 """
 
 import matplotlib.pyplot as plt
-import re
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from results import load, averages, by_revision, find_results
 
-# Read task1_results.txt
-# Try current directory first, then parent
-if os.path.exists('task1_results.txt'):
-    results_file = 'task1_results.txt'
-else:
-    results_file = '../task1_results.txt'
+# task1_results.jsonl (or a legacy task1_results.txt), from the current or
+# parent directory unless a file is given
+results_file = sys.argv[1] if len(sys.argv) > 1 else find_results('task1')
 
-if not os.path.exists(results_file):
-    print(f"Error: {results_file} not found")
+if results_file is None or not os.path.exists(results_file):
+    print(f"Error: {results_file or 'task1_results.jsonl'} not found")
     exit(1)
 
-window_sizes = []
-avg_delays = []
-
-with open(results_file, 'r') as f:
-    for line in f:
-        # Match lines like: "1	126.564		121.734		142.491		126.564, 125.084, ..."
-        match = re.match(r'(\d+)\s+([0-9.]+)\s+', line)
-        if match:
-            n = int(match.group(1))
-            avg = float(match.group(2))
-            window_sizes.append(n)
-            avg_delays.append(avg)
-
-if not window_sizes:
-    print(f"Error: Could not parse data from {results_file}")
+revisions = by_revision(load(results_file, 'task1'))
+
+if not revisions:
+    print(f"Error: No Task 1 results in {results_file}")
     exit(1)
 
-print(f"Loaded {len(window_sizes)} data points from {results_file}")
+# The newest code revision in the file is plotted and analysed; older ones
+# are drawn for comparison
+revision = list(revisions)[-1]
+window_sizes, avg_delays = averages(revisions[revision], 'window')
+
+print(f"Loaded {len(window_sizes)} data points from {results_file} (revision {revision})")
 print(f"Window sizes: {window_sizes}")
 print(f"Avg delays: {avg_delays}")
 
@@ -44,7 +42,12 @@ print(f"Avg delays: {avg_delays}")
 plt.figure(figsize=(12, 7))
 
 # Plot with markers
-plt.plot(window_sizes, avg_delays, 'bo-', linewidth=2.5, markersize=8, label='Average Delay')
+plt.plot(window_sizes, avg_delays, 'bo-', linewidth=2.5, markersize=8, label=f'Average Delay ({revision})')
+for other, records in list(revisions.items())[:-1]:
+    values, delays = averages(records, 'window')
+    plt.plot(values, delays, 'o--', linewidth=1.5, markersize=6, alpha=0.6, label=other)
+if len(revisions) > 1:
+    plt.legend()
 
 # Formatting
 plt.xlabel('Window Size N (segments)', fontsize=13, fontweight='bold')
@@ -69,7 +72,6 @@ for n, delay in zip(window_sizes, avg_delays):
 plt.tight_layout()
 
 # Create results directory if it doesn't exist
-import os
 os.makedirs('results', exist_ok=True)
 
 # Save
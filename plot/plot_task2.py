@@ -1,42 +1,40 @@
 #!/usr/bin/env python3
 """
 Plot Task 2 results: MSS vs Average Transfer Delay
-Reads data from task2_results.txt
+Reads task2_results.jsonl (or a legacy task2_results.txt) through bench/results.py
+
+Usage:
+    python3 plot/plot_task2.py [results-file]
 """
 
 import matplotlib.pyplot as plt
-import re
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from results import load, averages, by_revision, find_results
 
-# Read task2_results.txt
-# Try current directory first, then parent
-if os.path.exists('task2_results.txt'):
-    results_file = 'task2_results.txt'
-else:
-    results_file = '../task2_results.txt'
+# task2_results.jsonl (or a legacy task2_results.txt), from the current or
+# parent directory unless a file is given
+results_file = sys.argv[1] if len(sys.argv) > 1 else find_results('task2')
 
-if not os.path.exists(results_file):
-    print(f"Error: {results_file} not found")
+if results_file is None or not os.path.exists(results_file):
+    print(f"Error: {results_file or 'task2_results.jsonl'} not found")
     exit(1)
 
-mss_values = []
-avg_delays = []
-
-with open(results_file, 'r') as f:
-    for line in f:
-        # Match lines like: "100	45.234		42.123		48.567		45.234, 43.456, ..."
-        match = re.match(r'(\d+)\s+([0-9.]+)\s+', line)
-        if match:
-            mss = int(match.group(1))
-            avg = float(match.group(2))
-            mss_values.append(mss)
-            avg_delays.append(avg)
-
-if not mss_values:
-    print(f"Error: Could not parse data from {results_file}")
+revisions = by_revision(load(results_file, 'task2'))
+
+if not revisions:
+    print(f"Error: No Task 2 results in {results_file}")
     exit(1)
 
-print(f"Loaded {len(mss_values)} data points from {results_file}")
+# The newest code revision in the file is plotted and analysed; older ones
+# are drawn for comparison
+revision = list(revisions)[-1]
+mss_values, avg_delays = averages(revisions[revision], 'mss')
+
+print(f"Loaded {len(mss_values)} data points from {results_file} (revision {revision})")
 print(f"MSS values: {mss_values}")
 print(f"Avg delays: {avg_delays}")
 
@@ -44,7 +42,12 @@ print(f"Avg delays: {avg_delays}")
 plt.figure(figsize=(12, 7))
 
 # Plot with markers
-plt.plot(mss_values, avg_delays, 'go-', linewidth=2.5, markersize=8, label='Average Delay')
+plt.plot(mss_values, avg_delays, 'go-', linewidth=2.5, markersize=8, label=f'Average Delay ({revision})')
+for other, records in list(revisions.items())[:-1]:
+    values, delays = averages(records, 'mss')
+    plt.plot(values, delays, 'o--', linewidth=1.5, markersize=6, alpha=0.6, label=other)
+if len(revisions) > 1:
+    plt.legend()
 
 # Formatting
 plt.xlabel('MSS (bytes)', fontsize=13, fontweight='bold')
@@ -63,7 +66,6 @@ for mss, delay in zip(mss_values, avg_delays):
 plt.tight_layout()
 
 # Create results directory if it doesn't exist
-import os
 os.makedirs('results', exist_ok=True)
 
 # Save
@@ -1,42 +1,40 @@
 #!/usr/bin/env python3
 """
 Plot Task 3 results: Loss Probability p vs Average Transfer Delay
-Reads data from task3_results.txt
+Reads task3_results.jsonl (or a legacy task3_results.txt) through bench/results.py
+
+Usage:
+    python3 plot/plot_task3.py [results-file]
 """
 
 import matplotlib.pyplot as plt
-import re
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from results import load, averages, by_revision, find_results
 
-# Read task3_results.txt
-# Try current directory first, then parent
-if os.path.exists('task3_results.txt'):
-    results_file = 'task3_results.txt'
-else:
-    results_file = '../task3_results.txt'
+# task3_results.jsonl (or a legacy task3_results.txt), from the current or
+# parent directory unless a file is given
+results_file = sys.argv[1] if len(sys.argv) > 1 else find_results('task3')
 
-if not os.path.exists(results_file):
-    print(f"Error: {results_file} not found in current or parent directory")
+if results_file is None or not os.path.exists(results_file):
+    print(f"Error: {results_file or 'task3_results.jsonl'} not found")
     exit(1)
 
-loss_probs = []
-avg_delays = []
-
-with open(results_file, 'r') as f:
-    for line in f:
-        # Match lines like: "0.01	45.234		42.123		48.567		45.234, 43.456, ..."
-        match = re.match(r'([0-9.]+)\s+([0-9.]+)\s+', line)
-        if match:
-            p = float(match.group(1))
-            avg = float(match.group(2))
-            loss_probs.append(p)
-            avg_delays.append(avg)
-
-if not loss_probs:
-    print(f"Error: Could not parse data from {results_file}")
+revisions = by_revision(load(results_file, 'task3'))
+
+if not revisions:
+    print(f"Error: No Task 3 results in {results_file}")
     exit(1)
 
-print(f"Loaded {len(loss_probs)} data points from {results_file}")
+# The newest code revision in the file is plotted and analysed; older ones
+# are drawn for comparison
+revision = list(revisions)[-1]
+loss_probs, avg_delays = averages(revisions[revision], 'loss')
+
+print(f"Loaded {len(loss_probs)} data points from {results_file} (revision {revision})")
 print(f"Loss probabilities: {loss_probs}")
 print(f"Avg delays: {avg_delays}")
 
@@ -44,7 +42,12 @@ print(f"Avg delays: {avg_delays}")
 plt.figure(figsize=(12, 7))
 
 # Plot with markers
-plt.plot(loss_probs, avg_delays, 'ro-', linewidth=2.5, markersize=8, label='Average Delay')
+plt.plot(loss_probs, avg_delays, 'ro-', linewidth=2.5, markersize=8, label=f'Average Delay ({revision})')
+for other, records in list(revisions.items())[:-1]:
+    values, delays = averages(records, 'loss')
+    plt.plot(values, delays, 'o--', linewidth=1.5, markersize=6, alpha=0.6, label=other)
+if len(revisions) > 1:
+    plt.legend()
 
 # Formatting
 plt.xlabel('Loss Probability p', fontsize=13, fontweight='bold')
@@ -63,7 +66,6 @@ for p, delay in zip(loss_probs, avg_delays):
 plt.tight_layout()
 
 # Create results directory if it doesn't exist
-import os
 os.makedirs('results', exist_ok=True)
 
 # Save
@@ -0,0 +1,142 @@
+import argparse
+import json
+import socket
+import sys
+import threading
+
+DEFAULT_ADMIN_HOST = '127.0.0.1'
+# Longest the admin thread blocks, so stop() is noticed promptly
+POLL_INTERVAL = 0.1
+MAX_REQUEST = 65535
+REQUEST_TIMEOUT = 1.0
+REQUEST_RETRIES = 3
+
+
+class AdminChannel:
+    """Live settings for a running server, on a UDP socket of its own.
+    
+    Each datagram is a JSON object. {"set": {name: value, ...}} changes
+    settings through server.configure(); any other object (e.g. {}) just
+    queries. Every reply is {"ok": true, "settings": {...}, "status":
+    {...}} with the settings after the change, or {"ok": false, "error":
+    "..."} with nothing changed. Requests are answered on a thread, so
+    the server loop never waits for them.
+    
+    Anyone who can reach the socket can change the server, so it binds to
+    loopback unless told otherwise.
+    """
+    
+    def __init__(self, server, port, host=DEFAULT_ADMIN_HOST):
+        self.server = server
+        self.port = port
+        self.host = host
+        self.sock = None
+        self.thread = None
+        self.running = False
+    
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.host, self.port))
+        self.port = self.sock.getsockname()[1]
+        self.sock.settimeout(POLL_INTERVAL)
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        print(f"Admin channel on {self.host}:{self.port}")
+    
+    def _serve(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(MAX_REQUEST)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            reply = json.dumps(self.handle(data)).encode()
+            try:
+                self.sock.sendto(reply, addr)
+            except OSError:
+                pass
+    
+    def handle(self, data):
+        """Reply dict for one request datagram."""
+        try:
+            request = json.loads(data)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            changes = request.get('set', {})
+            if not isinstance(changes, dict):
+                raise ValueError("'set' must map setting names to values")
+            if changes:
+                self.server.configure(**changes)
+                print(f"Admin: set {', '.join(f'{k}={v!r}' for k, v in changes.items())}")
+        except (ValueError, OSError) as e:
+            # OSError: an output path the server cannot write
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'settings': self.server.settings(), 'status': self.server.status()}
+    
+    def stop(self):
+        # The server may be stopped from two threads at once
+        self.running = False
+        thread, self.thread = self.thread, None
+        if thread is not None:
+            thread.join()
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            sock.close()
+
+
+def request(addr, changes=None, timeout=REQUEST_TIMEOUT, retries=REQUEST_RETRIES):
+    """Send one admin request to addr (host, port) and return the reply dict.
+    
+    Settings are absolute, so a request is simply resent if no reply
+    comes within timeout. Raises TimeoutError after retries attempts.
+    """
+    message = json.dumps({'set': changes} if changes else {}).encode()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        for _ in range(retries):
+            sock.sendto(message, addr)
+            try:
+                data, _ = sock.recvfrom(MAX_REQUEST)
+            except socket.timeout:
+                continue
+            return json.loads(data)
+    raise TimeoutError(f"No reply from admin channel at {addr[0]}:{addr[1]}")
+
+
+def parse_assignment(text):
+    """'name=value' -> (name, value), the value read as JSON where it parses (else a string)."""
+    name, sep, value = text.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected name=value, got {text!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query or change the settings of a running Simple-FTP server')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int, help="The server's --admin-port")
+    parser.add_argument('--set', type=parse_assignment, action='append', default=[], metavar='NAME=VALUE',
+                        help='Change a setting, e.g. --set loss_prob=0.02 (repeatable)')
+    args = parser.parse_args()
+    
+    try:
+        reply = request((args.host, args.port), dict(args.set))
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not reply['ok']:
+        print(f"Error: {reply['error']}")
+        sys.exit(1)
+    for name, value in reply['settings'].items():
+        print(f"{name:<18} {value}")
+    for name, value in reply['status'].items():
+        print(f"{name:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import asyncio
+import socket
+import time
+from client import SimpleFTPClient
+from server import SimpleFTPServer, IDLE_FLUSH, RECV_TIMEOUT
+
+
+class _SenderProtocol(asyncio.DatagramProtocol):
+    """Feeds transport events into an AsyncFTPClient."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def datagram_received(self, data, addr):
+        self.client._handle_ack(data)
+        self.client._step()
+    
+    def error_received(self, exc):
+        # ICMP errors (e.g. server not up yet) are recovered by retransmission
+        pass
+    
+    def pause_writing(self):
+        self.client.send_blocked = True
+    
+    def resume_writing(self):
+        self.client.send_blocked = False
+        self.client._step()
+
+
+class AsyncFTPClient(SimpleFTPClient):
+    """Go-Back-N sender driven by an asyncio event loop.
+    
+    Shares windowing, framing and ACK handling with SimpleFTPClient; only
+    the socket I/O and the retransmission timer are replaced by transport
+    writes and loop callbacks, so one loop can run many transfers.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transport = None
+        self.loop = None
+        self.done = None
+        self.timer_handle = None
+        self.reading = False
+    
+    async def run(self):
+        """Send the file and return the transfer stats."""
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        addr_info = await self.loop.getaddrinfo(self.host, self.port, type=socket.SOCK_DGRAM)
+        self.server_addr = addr_info[0][4]
+        self._open_input()
+        self._begin_transfer()
+        
+        start = time.monotonic()
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _SenderProtocol(self), remote_addr=self.server_addr)
+        try:
+            self._step()
+            await self.done
+        finally:
+            self.stats['elapsed'] = time.monotonic() - start
+            self.stop()
+        return self.stats
+    
+    def _step(self):
+        """Send what the window allows, re-arm the timer, finish if done."""
+        if self.done.done():
+            return
+        if self._finished():
+            self.done.set_result(None)
+            return
+        self._send_phase()
+        self._arm_timer()
+        self._watch_input()
+    
+    def _watch_input(self):
+        """Step again once a stream that ran dry becomes readable, instead of polling it."""
+        if self._wants_input() and not self.reading:
+            self.loop.add_reader(self.stream.fd, self._step)
+            self.reading = True
+        elif self.reading and not self._wants_input():
+            self.loop.remove_reader(self.stream.fd)
+            self.reading = False
+    
+    def _arm_timer(self):
+        """Keep one timer callback pending while the retransmission timer runs.
+        
+        ACKs usually push the deadline later, so an early wakeup simply
+        re-arms for the remainder; the callback is only rescheduled when
+        a shrinking RTO moves the deadline earlier.
+        """
+        delay = self._select_timeout()
+        if delay is None:
+            return
+        if self.timer_handle is not None:
+            if self.timer_handle.when() - self.loop.time() <= delay:
+                return
+            self.timer_handle.cancel()
+        self.timer_handle = self.loop.call_later(delay, self._on_timer)
+    
+    def _on_timer(self):
+        # Also fires when the pacer admits the next segment; the timeout
+        # phase checks the retransmission timers itself
+        self.timer_handle = None
+        self._timeout_phase()
+        self._step()
+    
+    def _send_frames(self, frames):
+        for sent, frame in enumerate(frames):
+            # pause_writing() may fire part way through a batch
+            if self.send_blocked:
+                return sent
+            self.transport.sendto(frame)
+            self._sent(frame)
+        return len(frames)
+    
+    def stop(self):
+        """Cleanup."""
+        if self.timer_handle is not None:
+            self.timer_handle.cancel()
+            self.timer_handle = None
+        if self.reading:
+            self.loop.remove_reader(self.stream.fd)
+            self.reading = False
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        super().stop()
+
+
+class AsyncFTPServer(SimpleFTPServer, asyncio.DatagramProtocol):
+    """Go-Back-N receiver as an asyncio DatagramProtocol.
+    
+    Packet handling is inherited from SimpleFTPServer; ACKs go out through
+    the transport instead of a blocking socket. Output is written inline
+    on the loop by default (write_thread=False), so many sessions do not
+    mean many writer threads.
+    """
+    
+    def __init__(self, port, output_file, loss_prob, write_thread=False, **options):
+        super().__init__(port, output_file, loss_prob, write_thread=write_thread, **options)
+        self.transport = None
+        self.flush_handle = None
+        self.evict_handle = None
+    
+    async def serve(self, host='0.0.0.0'):
+        """Bind the endpoint, open the output file and start the admin channel if any."""
+        loop = asyncio.get_running_loop()
+        self._prepare_output()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: self, local_addr=(host, self.port))
+        self.port = self.transport.get_extra_info('sockname')[1]
+        self.running = True
+        if self.admin is not None:
+            # Requests are answered on the channel's own thread, as with start()
+            self.admin.start()
+        return self
+    
+    def datagram_received(self, data, addr):
+        self._handle_packet(data, addr)
+        if self.dirty and self.flush_handle is None:
+            self._arm_flush()
+        if self.sessions and self.evict_handle is None:
+            self._arm_evict()
+    
+    def _arm_flush(self):
+        loop = asyncio.get_running_loop()
+        self.flush_handle = loop.call_later(IDLE_FLUSH, self._on_flush_timer)
+    
+    def _on_flush_timer(self):
+        """Flush sessions that have gone idle; keep checking while any are still busy."""
+        self.flush_handle = None
+        self._flush_writes(IDLE_FLUSH)
+        if self.dirty:
+            self._arm_flush()
+    
+    def _arm_evict(self):
+        loop = asyncio.get_running_loop()
+        self.evict_handle = loop.call_later(RECV_TIMEOUT, self._on_evict_timer)
+    
+    def _on_evict_timer(self):
+        """Close idle sessions even when no datagrams arrive, like the quiet wakeups of run()."""
+        self.evict_handle = None
+        self._evict_idle()
+        if self.sessions:
+            self._arm_evict()
+    
+    def _send_packet(self, raw, addr):
+        self.transport.sendto(raw, addr)
+    
+    def stop(self):
+        """Cleanup."""
+        self.running = False
+        if self.admin is not None:
+            self.admin.stop()
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.evict_handle is not None:
+            self.evict_handle.cancel()
+            self.evict_handle = None
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self._close_sessions()
+
+
+async def send_file(host, port, input_file, window_size, mss, **options):
+    """Send input_file to a Simple-FTP receiver; returns the transfer stats."""
+    client = AsyncFTPClient(host, port, input_file, window_size, mss, **options)
+    return await client.run()
+
+
+async def start_server(port, output_file, loss_prob, host='0.0.0.0', **options):
+    """Start an AsyncFTPServer on the running loop; call stop() when done.
+    
+    options go to AsyncFTPServer (max_sessions, write_chunk, admin_port, ...).
+    """
+    server = AsyncFTPServer(port, output_file, loss_prob, **options)
+    return await server.serve(host)
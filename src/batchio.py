@@ -0,0 +1,313 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import socket
+import struct
+import sys
+from collections import OrderedDict
+
+BATCH_SIZE = 64
+MAX_DATAGRAM = 65535
+SOCKADDR_SIZE = 128
+# Peers whose encoded/decoded socket addresses are kept; a server sees an
+# unbounded stream of clients over its lifetime
+ADDRESS_CACHE = 256
+
+# SIMPLEFTP_MMSG=0 forces the portable sendto/recvfrom loops
+USE_MMSG = os.environ.get('SIMPLEFTP_MMSG', '1') != '0'
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_iovec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _msghdr), ('msg_len', ctypes.c_uint)]
+
+
+def _load_libc():
+    """libc with sendmmsg/recvmmsg, or None where they are unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        sendmmsg, recvmmsg = libc.sendmmsg, libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    # No argtypes: callers pass ints and prebuilt c_void_p pointers, which
+    # halves the per-call conversion overhead
+    return libc
+
+
+_libc = _load_libc()
+HAVE_MMSG = _libc is not None
+
+_U32 = struct.Struct('I')
+# iovec arrays for 1..BATCH_SIZE frames
+_IOVECS = {}
+MMSGHDR_SIZE = ctypes.sizeof(_mmsghdr)
+MSGLEN_OFFSET = _mmsghdr.msg_len.offset
+NAMELEN_OFFSET = _msghdr.msg_namelen.offset
+
+
+def encode_sockaddr(family, addr):
+    """struct sockaddr_in / sockaddr_in6 bytes for a numeric Python address tuple."""
+    if family == socket.AF_INET:
+        host, port = addr[:2]
+        return (struct.pack('=H', family) + struct.pack('!H', port)
+                + socket.inet_pton(family, host) + bytes(8))
+    host, port = addr[:2]
+    flowinfo, scope_id = (addr[2], addr[3]) if len(addr) == 4 else (0, 0)
+    return (struct.pack('=H', family) + struct.pack('!HI', port, flowinfo)
+            + socket.inet_pton(family, host.split('%')[0]) + struct.pack('=I', scope_id))
+
+
+def decode_sockaddr(raw):
+    """Python address tuple from struct sockaddr bytes, as recvfrom() returns it."""
+    family = struct.unpack_from('=H', raw)[0]
+    if family == socket.AF_INET:
+        return socket.inet_ntop(family, raw[4:8]), struct.unpack_from('!H', raw, 2)[0]
+    port, flowinfo = struct.unpack_from('!HI', raw, 2)
+    scope_id = struct.unpack_from('=I', raw, 24)[0]
+    return socket.inet_ntop(family, raw[8:24]), port, flowinfo, scope_id
+
+
+def _remember(cache, key, value):
+    """Add to an LRU address cache, dropping the least recently used entry when full."""
+    cache[key] = value
+    if len(cache) > ADDRESS_CACHE:
+        cache.popitem(last=False)
+
+
+class DatagramIO:
+    """Batched datagram I/O on one non-blocking socket.
+    
+    send() and recv() move up to batch_size datagrams per call, with one
+    sendmmsg/recvmmsg system call on Linux and a sendto/recvfrom loop
+    elsewhere (or with use_mmsg=False). Neither ever blocks except
+    recv() waiting up to `timeout` for the first datagram. `syscalls`
+    counts the send/receive system calls made.
+    
+    Datagrams are received straight into a preallocated pool of
+    batch_size slots, so recv() returns memoryviews rather than fresh
+    bytes. A view is only valid until the next recv() call reuses its
+    slot; callers that keep data longer must copy it.
+    """
+    
+    def __init__(self, sock, batch_size=BATCH_SIZE, bufsize=MAX_DATAGRAM, use_mmsg=None):
+        self.sock = sock
+        self.batch_size = batch_size
+        self.bufsize = bufsize
+        self.mmsg = HAVE_MMSG and (USE_MMSG if use_mmsg is None else use_mmsg)
+        self.syscalls = 0
+        self.recv_buf = bytearray(batch_size * bufsize)
+        self.recv_view = memoryview(self.recv_buf)
+        self.slots = [self.recv_view[i * bufsize:(i + 1) * bufsize] for i in range(batch_size)]
+        if self.mmsg:
+            self._setup_mmsg()
+    
+    def _setup_mmsg(self):
+        """Preallocate message headers and buffers reused by every call.
+        
+        Header arrays live in bytearrays so the per-call fields (iovec
+        base/length, name and message lengths) are written with struct
+        rather than ctypes attribute access, which costs more than the
+        system calls it saves. Outgoing frames are copied into one send
+        arena so no per-frame buffer addresses have to be looked up.
+        """
+        n = self.batch_size
+        self.send_msg_buf = bytearray(ctypes.sizeof(_mmsghdr) * n)
+        self.send_msgs = (_mmsghdr * n).from_buffer(self.send_msg_buf)
+        self.send_iov_buf = bytearray(ctypes.sizeof(_iovec) * n)
+        self.send_iovs = (_iovec * n).from_buffer(self.send_iov_buf)
+        self.send_msgs_ptr = ctypes.c_void_p(ctypes.addressof(self.send_msgs))
+        iov_base = ctypes.addressof(self.send_iovs)
+        for i in range(n):
+            self.send_msgs[i].msg_hdr.msg_iov = ctypes.cast(iov_base + i * ctypes.sizeof(_iovec),
+                                                            ctypes.POINTER(_iovec))
+            self.send_msgs[i].msg_hdr.msg_iovlen = 1
+        self.send_arena = None
+        self._grow_arena(n * 1024)
+        self.names = OrderedDict()
+        self.send_addr = None
+        self.named = 0
+        
+        self.recv_array = (ctypes.c_char * len(self.recv_buf)).from_buffer(self.recv_buf)
+        self.recv_name_buf = bytearray(n * SOCKADDR_SIZE)
+        self.recv_name_view = memoryview(self.recv_name_buf)
+        self.recv_name_array = (ctypes.c_char * len(self.recv_name_buf)).from_buffer(self.recv_name_buf)
+        self.recv_msg_buf = bytearray(ctypes.sizeof(_mmsghdr) * n)
+        self.recv_msgs = (_mmsghdr * n).from_buffer(self.recv_msg_buf)
+        self.recv_iov_buf = bytearray(ctypes.sizeof(_iovec) * n)
+        self.recv_iovs = (_iovec * n).from_buffer(self.recv_iov_buf)
+        self.recv_msgs_ptr = ctypes.c_void_p(ctypes.addressof(self.recv_msgs))
+        base = ctypes.addressof(self.recv_array)
+        names = ctypes.addressof(self.recv_name_array)
+        iov_base = ctypes.addressof(self.recv_iovs)
+        for i in range(n):
+            self.recv_iovs[i].iov_base = base + i * self.bufsize
+            self.recv_iovs[i].iov_len = self.bufsize
+            hdr = self.recv_msgs[i].msg_hdr
+            hdr.msg_iov = ctypes.cast(iov_base + i * ctypes.sizeof(_iovec), ctypes.POINTER(_iovec))
+            hdr.msg_iovlen = 1
+            hdr.msg_name = names + i * SOCKADDR_SIZE
+            hdr.msg_namelen = SOCKADDR_SIZE
+        self.recv_used = 0
+        self.addrs = OrderedDict()
+    
+    def _grow_arena(self, size):
+        self.send_arena = bytearray(size)
+        self.send_arena_array = (ctypes.c_char * size).from_buffer(self.send_arena)
+        self.send_arena_base = ctypes.addressof(self.send_arena_array)
+    
+    def _fileno(self):
+        fd = self.sock.fileno()
+        if fd < 0:
+            raise OSError(errno.EBADF, "Socket is closed")
+        return fd
+    
+    def send(self, frames, addr):
+        """Send frames to addr in order; returns how many were sent before the buffer filled.
+        
+        Errors other than a full send buffer are raised if nothing was sent.
+        """
+        if not self.mmsg:
+            return self._send_loop(frames, addr)
+        sent = 0
+        while sent < len(frames):
+            chunk = frames[sent:sent + self.batch_size]
+            try:
+                sent_now = self._sendmmsg(chunk, addr)
+            except OSError:
+                if sent == 0:
+                    raise
+                break
+            sent += sent_now
+            if sent_now < len(chunk):
+                break
+        return sent
+    
+    def _send_loop(self, frames, addr):
+        for sent, frame in enumerate(frames):
+            self.syscalls += 1
+            try:
+                self.sock.sendto(frame, addr)
+            except BlockingIOError:
+                return sent
+            except OSError:
+                if sent == 0:
+                    raise
+                return sent
+        return len(frames)
+    
+    def _sendmmsg(self, frames, addr):
+        count = len(frames)
+        iovecs = []
+        offset = 0
+        for frame in frames:
+            end = offset + len(frame)
+            if end > len(self.send_arena):
+                del self.send_arena_array
+                self._grow_arena(2 * end)
+                return self._sendmmsg(frames, addr)
+            self.send_arena[offset:end] = frame
+            iovecs += (self.send_arena_base + offset, end - offset)
+            offset = end
+        layout = _IOVECS.get(count)
+        if layout is None:
+            layout = _IOVECS[count] = struct.Struct('PN' * count)
+        layout.pack_into(self.send_iov_buf, 0, *iovecs)
+        
+        if addr != self.send_addr:
+            self.send_addr = addr
+            self.named = 0
+        if self.named < count:
+            name = self.names.get(addr)
+            if name is None:
+                raw = encode_sockaddr(self.sock.family, addr)
+                name = (ctypes.create_string_buffer(raw, len(raw)), len(raw))
+                _remember(self.names, addr, name)
+            else:
+                self.names.move_to_end(addr)
+            for i in range(self.named, count):
+                hdr = self.send_msgs[i].msg_hdr
+                hdr.msg_name = ctypes.addressof(name[0])
+                hdr.msg_namelen = name[1]
+            self.named = count
+        
+        self.syscalls += 1
+        result = _libc.sendmmsg(self._fileno(), self.send_msgs_ptr, count, 0)
+        if result < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return 0
+            raise OSError(err, os.strerror(err))
+        return result
+    
+    def recv(self, timeout=0):
+        """Up to batch_size (view, addr) pairs; waits up to timeout seconds for the first.
+        
+        Each view points into the receive pool and is overwritten by the next call.
+        """
+        if timeout:
+            try:
+                ready, _, _ = select.select([self._fileno()], [], [], timeout)
+            except ValueError:
+                raise OSError(errno.EBADF, "Socket is closed")
+            if not ready:
+                return []
+        if not self.mmsg:
+            return self._recv_loop()
+        return self._recvmmsg()
+    
+    def _recv_loop(self):
+        batch = []
+        for slot in self.slots:
+            self.syscalls += 1
+            try:
+                length, addr = self.sock.recvfrom_into(slot)
+            except BlockingIOError:
+                break
+            batch.append((slot[:length], addr))
+        return batch
+    
+    def _recvmmsg(self):
+        # The kernel overwrites msg_namelen; restore it for the slots used last time
+        for i in range(self.recv_used):
+            _U32.pack_into(self.recv_msg_buf, i * MMSGHDR_SIZE + NAMELEN_OFFSET, SOCKADDR_SIZE)
+        self.syscalls += 1
+        result = _libc.recvmmsg(self._fileno(), self.recv_msgs_ptr, self.batch_size, 0, None)
+        if result < 0:
+            self.recv_used = 0
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return []
+            raise OSError(err, os.strerror(err))
+        self.recv_used = result
+        batch = []
+        for i in range(result):
+            length = _U32.unpack_from(self.recv_msg_buf, i * MMSGHDR_SIZE + MSGLEN_OFFSET)[0]
+            namelen = _U32.unpack_from(self.recv_msg_buf, i * MMSGHDR_SIZE + NAMELEN_OFFSET)[0]
+            name = bytes(self.recv_name_view[i * SOCKADDR_SIZE:i * SOCKADDR_SIZE + namelen])
+            addr = self.addrs.get(name)
+            if addr is None:
+                addr = decode_sockaddr(name)
+                _remember(self.addrs, name, addr)
+            else:
+                self.addrs.move_to_end(name)
+            batch.append((self.slots[i][:length], addr))
+        return batch
@@ -1,4 +1,21 @@
-def compute_checksum(data):
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _fold(total):
+    """Fold carries of a 16-bit word sum back into the low 16 bits."""
+    while total >> 16:
+        total = (total & 0xffff) + (total >> 16)
+    return total
+
+
+def reference_checksum(data):
+    """Word-at-a-time Internet checksum; the reference every backend must match."""
     if len(data) == 0:
         return 0
     
@@ -15,5 +32,155 @@ def compute_checksum(data):
     return (~checksum) & 0xffff
 
 
+def _words_checksum(data):
+    """Sum native-order 16-bit words via memoryview.cast and byteswap once."""
+    length = len(data)
+    if length == 0:
+        return 0
+    
+    even = length & ~1
+    view = memoryview(data)
+    total = sum(view[:even].cast('B').cast('H')) if even else 0
+    if length & 1:
+        # Pad the trailing byte with zero in network order
+        total += view[even] if sys.byteorder == 'little' else view[even] << 8
+    total = _fold(total)
+    
+    if sys.byteorder == 'little':
+        # One's complement sums are byte-order independent (RFC 1071)
+        total = ((total & 0xff) << 8) | (total >> 8)
+    return (~total) & 0xffff
+
+
+def _bigint_checksum(data):
+    """Reduce the payload as one big-endian integer modulo 0xffff."""
+    length = len(data)
+    if length == 0:
+        return 0
+    
+    # 2**16 == 1 (mod 0xffff), so the word sum and the integer agree mod 0xffff
+    value = int.from_bytes(data, 'big')
+    if length & 1:
+        value <<= 8
+    if value == 0:
+        return 0xffff
+    total = value % 0xffff or 0xffff
+    return (~total) & 0xffff
+
+
+def _numpy_checksum(data):
+    """Sum big-endian 16-bit words with NumPy and fold once at the end."""
+    length = len(data)
+    if length == 0:
+        return 0
+    
+    even = length & ~1
+    total = int(np.frombuffer(data, dtype='>u2', count=even // 2).sum(dtype=np.uint64))
+    if length & 1:
+        total += memoryview(data)[even] << 8
+    return (~_fold(total)) & 0xffff
+
+
+# Below this size NumPy's per-call overhead outweighs its vectorized sum
+NUMPY_MIN_SIZE = 2048
+
+
+def _auto_checksum(data):
+    """Use NumPy for large payloads when installed, the integer reduction otherwise."""
+    if np is not None and len(data) >= NUMPY_MIN_SIZE:
+        return _numpy_checksum(data)
+    return _bigint_checksum(data)
+
+
+BACKENDS = {
+    'reference': reference_checksum,
+    'words': _words_checksum,
+    'bigint': _bigint_checksum,
+    'auto': _auto_checksum,
+}
+if np is not None:
+    BACKENDS['numpy'] = _numpy_checksum
+
+DEFAULT_BACKEND = 'auto'
+
+
+def select_backend(name):
+    """Return the checksum function registered under name."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown checksum backend '{name}' (available: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]
+
+
+CHECKSUM_BACKEND = os.environ.get('SIMPLEFTP_CHECKSUM', DEFAULT_BACKEND)
+compute_checksum = select_backend(CHECKSUM_BACKEND)
+
+
 def verify_checksum(data, checksum):
     return compute_checksum(data) == checksum
+
+
+def ones_complement_sum(data):
+    """Folded 16-bit one's complement sum of data, zero only if every word is zero."""
+    value = int.from_bytes(data, 'big')
+    if len(data) & 1:
+        value <<= 8
+    if value == 0:
+        return 0
+    return value % 0xffff or 0xffff
+
+
+def _swap(word):
+    return ((word & 0xff) << 8) | (word >> 8)
+
+
+def adjust_checksum(checksum, old_word, new_word):
+    """Update a checksum after one aligned 16-bit word changes (RFC 1624, eqn. 3)."""
+    total = _fold((~checksum & 0xffff) + (~old_word & 0xffff) + new_word)
+    return (~total) & 0xffff
+
+
+class InternetChecksum:
+    """Incremental Internet checksum over a stream of byte chunks.
+    
+    Chunks may have any length; a chunk that starts at an odd offset is
+    byte-swapped into place, so update() calls produce exactly the
+    compute_checksum() of the concatenated data.
+    """
+    
+    def __init__(self, data=b''):
+        self.total = 0
+        self.length = 0
+        if data:
+            self.update(data)
+    
+    def _add(self, partial, offset):
+        if offset & 1:
+            partial = _swap(partial)
+        self.total = _fold(self.total + partial)
+    
+    def update(self, data):
+        """Append a chunk of data to the running sum."""
+        self._add(ones_complement_sum(data), self.length)
+        self.length += len(data)
+        return self
+    
+    def combine(self, other):
+        """Append another partial checksum as if its data followed ours."""
+        self._add(other.total, self.length)
+        self.length += other.length
+        return self
+    
+    def copy(self):
+        clone = InternetChecksum()
+        clone.total = self.total
+        clone.length = self.length
+        return clone
+    
+    def digest(self):
+        """Checksum of all data seen so far, identical to compute_checksum()."""
+        if self.length == 0:
+            return 0
+        return (~self.total) & 0xffff
+    
+    def verify(self, checksum):
+        return self.digest() == checksum
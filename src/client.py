@@ -1,28 +1,135 @@
+import argparse
+import hashlib
+import os
+import random
+import selectors
 import socket
+import stat
 import sys
 import time
 import struct
-from packet import DataPacket, AckPacket
+from collections import OrderedDict
+from packet import (AckPacket, SackPacket, OpenPacket, ClosePacket, ControlReply, PACKET_TYPE_OPEN,
+                    UNKNOWN_SIZE, STATUS_OK, STATUS_REFUSED, FLAG_WINDOW)
+from checksum import compute_checksum
+from segments import FrameStore, MmapSegments, StreamSegments
+from rto import RtoEstimator, DEFAULT_INITIAL_RTO, DEFAULT_MIN_RTO, DEFAULT_MAX_RTO
+from congestion import CONTROLLERS, create_controller
+from pacing import TokenBucket, parse_rate, SLOW_START_GAIN, CONGESTION_AVOIDANCE_GAIN
 from constants import HEADER_SIZE
+from batchio import DatagramIO, BATCH_SIZE
+
+DEFAULT_DUPACK_THRESHOLD = 3
+MODES = ('gbn', 'sr', 'sack')
+# A SACK sender that gets no reply at all after this many timeouts assumes
+# a receiver without SACK support and falls back to plain Go-Back-N
+SACK_FALLBACK_TIMEOUTS = 3
+# An OPEN unanswered this many times means a receiver without the
+# handshake: the data is sent anyway. A CLOSE is given up on after
+# CLOSE_RETRIES, leaving the transfer unconfirmed.
+OPEN_RETRIES = 3
+CLOSE_RETRIES = 5
+# select() rounds timeouts up to whole milliseconds, so longer waits are
+# rounded down to this granularity and the sub-millisecond rest is slept
+PRECISE_SLEEP = 0.001
+
 
 class SimpleFTPClient:
-    """Go-Back-N sender."""
+    """Go-Back-N sender, or Selective Repeat (mode='sr') / SACK (mode='sack') sender.
     
-    def __init__(self, host, port, input_file, window_size, mss):
+    With handshake (the default) the transfer is opened with its metadata
+    before any data and closed with its length and SHA-256 digest once
+    everything is acknowledged; both are retransmitted on the RTO until
+    the receiver replies. transfer_status holds the receiver's verdict
+    on the CLOSE (STATUS_OK or STATUS_MISMATCH), or None if unconfirmed.
+    With rto_trace the RTO estimator keeps its trace (see RtoEstimator).
+    """
+    
+    def __init__(self, host, port, input_file, window_size, mss, bounded_frames=False,
+                 segmentation='auto', dupack_threshold=DEFAULT_DUPACK_THRESHOLD,
+                 initial_rto=DEFAULT_INITIAL_RTO, min_rto=DEFAULT_MIN_RTO,
+                 max_rto=DEFAULT_MAX_RTO, adaptive_rto=True, mode='gbn', congestion='none',
+                 pacing=None, handshake=True, rto_trace=False):
+        if segmentation not in ('auto', 'mmap', 'list', 'stream'):
+            raise ValueError(f"Unknown segmentation mode: {segmentation}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        if pacing is not None and pacing != 'cwnd' and pacing <= 0:
+            raise ValueError("Pacing rate must be positive")
         self.host = host
         self.port = port
         self.input_file = input_file
         self.window_size = window_size
         self.mss = mss
+        self.bounded_frames = bounded_frames
+        self.segmentation = segmentation
+        self.dupack_threshold = dupack_threshold
+        self.mode = mode
+        self.selective = mode == 'sr'
         
         self.sock = None
         self.file = None
         self.segments = []
+        self.checksums = []
+        self.frames = None
+        self.stream = None
         self.base = 0
         self.next_seq = 0
         self.timer = None
-        self.timeout_interval = 0.5
-        self.ack_buffer = b''
+        self.rto = RtoEstimator(initial_rto, min_rto, max_rto, adaptive=adaptive_rto, trace=rto_trace)
+        # window_size is the ceiling; the controller decides how much of it to use
+        self.cc = create_controller(congestion, window_size)
+        # Receive window advertised by the server, None until an ACK carries one
+        self.rwnd = None
+        # One past the highest segment ever sent (Go-Back-N rewinds next_seq
+        # below it), and the point past which a new loss shrinks cwnd again
+        self.high_seq = 0
+        self.recovery_point = 0
+        # Pacing: a fixed rate in bytes/s, or 'cwnd' for gain * cwnd / SRTT
+        # (the bucket is created once the first RTT sample is in)
+        self.pacing = pacing
+        self.pacer = None
+        if pacing is not None and pacing != 'cwnd':
+            self.pacer = TokenBucket(pacing, HEADER_SIZE + mss)
+        # First-transmission times of outstanding segments; retransmitted
+        # segments are removed so they never yield RTT samples (Karn)
+        self.send_times = {}
+        self.dup_acks = 0
+        self.in_recovery = False
+        # Selective Repeat: segments ACKed above base, and per-segment
+        # timers ordered by last transmission (earliest deadline first)
+        self.acked = set()
+        self.sr_timers = OrderedDict()
+        # SACK: highest SACKed end and holes already resent since the last timeout
+        self.sack_high = 0
+        self.sack_resent = set()
+        # Handshake: 'open' -> 'data' -> 'close' -> 'done'; control is the
+        # pending OPEN/CLOSE frame, control_sent when it last went out
+        self.handshake = handshake
+        self.phase = 'data'
+        self.transfer_id = random.getrandbits(32)
+        self.control = None
+        self.control_sent = None
+        self.control_tries = 0
+        self.digest = hashlib.sha256()
+        self.transfer_status = None
+        self.selector = None
+        self.io = None
+        self.batch_size = BATCH_SIZE
+        self.send_blocked = False
+        self.stats = {
+            'payload_bytes': 0,
+            'bytes_sent': 0,
+            'packets_sent': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'acks_received': 0,
+            'wakeups': 0,
+            'elapsed': 0.0,
+            'cpu_time': 0.0,
+            'pacing_target': 0.0,
+        }
     
     def start(self):
         """Resolve host, create socket, open file."""
@@ -30,106 +137,647 @@ class SimpleFTPClient:
         self.sock = socket.socket(addr_info[0], socket.SOCK_DGRAM)
         self.sock.setblocking(False)
         self.server_addr = addr_info[4]
+        self.io = DatagramIO(self.sock, self.batch_size, bufsize=4096)
+        self._open_input()
+        self._begin_transfer()
+    
+    def _open_input(self):
+        """Open the input file and set up segments and the frame store."""
+        if self.input_file == '-':
+            self.file = sys.stdin.buffer
+        else:
+            self.file = open(self.input_file, 'rb')
         
-        self.file = open(self.input_file, 'rb')
-        self._segment_file()
+        mode = self._segmentation_mode()
+        if mode == 'mmap':
+            # Frames are built from the mapping on demand and dropped once
+            # acknowledged, so memory stays near the window size
+            self.segments = MmapSegments(self.file, self.mss)
+            self.checksums = None
+            self.frames = FrameStore(self.segments, bounded=True, mode=self.mode)
+        elif mode == 'stream':
+            # Total length is only known once the ring reader hits EOF
+            self.stream = StreamSegments(self.file, self.mss, self.window_size)
+            self.segments = self.stream
+            self.checksums = None
+            self.frames = FrameStore(self.segments, bounded=True, mode=self.mode)
+        else:
+            self._segment_file()
+            self.frames = FrameStore(self.segments, self.checksums, bounded=self.bounded_frames,
+                                     mode=self.mode)
+    
+    def _begin_transfer(self):
+        """Queue the OPEN, sent by the first send phase; without the handshake go straight to data."""
+        if not self.handshake:
+            return
+        if self.input_file == '-':
+            name = 'stdin'
+        else:
+            name = os.path.basename(self.input_file)
+        if self.stream is not None:
+            size = UNKNOWN_SIZE
+        elif isinstance(self.segments, MmapSegments):
+            size = self.segments.size
+        else:
+            size = sum(len(segment) for segment in self.segments)
+        self._queue_control('open', OpenPacket(self.transfer_id, name, size, self.mss,
+                                               self.window_size, self.mode, FLAG_WINDOW))
+    
+    def _queue_control(self, phase, packet):
+        self.phase = phase
+        self.control = packet.serialize()
+        self.control_sent = None
+        self.control_tries = 0
+    
+    def _control_done(self, phase):
+        self.phase = phase
+        self.control = None
+        self.control_sent = None
+        # Backoff from unanswered control packets says nothing about the data path
+        self.rto.progress()
+    
+    def _segmentation_mode(self):
+        """mmap regular non-empty files; stream from pipes, devices and stdin."""
+        if self.segmentation != 'auto':
+            return self.segmentation
+        info = os.fstat(self.file.fileno())
+        if stat.S_ISREG(info.st_mode):
+            return 'mmap' if info.st_size > 0 else 'list'
+        return 'stream'
     
     def _segment_file(self):
         """Read file and create MSS-sized segments."""
-        buffer = b''
         while True:
-            chunk = self.file.read(1024)
+            # Buffered reads return a full MSS until EOF, even from pipes
+            chunk = self.file.read(self.mss)
             if not chunk:
-                if buffer:
-                    self.segments.append(buffer)
                 break
-            
-            buffer += chunk
-            while len(buffer) >= self.mss:
-                self.segments.append(buffer[:self.mss])
-                buffer = buffer[self.mss:]
+            self._add_segment(chunk)
+    
+    def _add_segment(self, data):
+        """Store a segment with its checksum, computed once for all (re)sends."""
+        self.segments.append(data)
+        self.checksums.append(compute_checksum(data))
     
     def run(self):
-        """Main send loop with timeout handling."""
+        """Event loop: sleep until the socket is ready or the timer expires."""
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
+        start_wall = time.monotonic()
+        start_cpu = time.thread_time()
         try:
-            while self.base < len(self.segments):
+            while not self._finished():
                 self._send_phase()
-                self._receive_phase()
+                self._update_interest()
+                timeout = self._select_timeout()
+                if timeout is not None and 0 < timeout < PRECISE_SLEEP:
+                    time.sleep(timeout)
+                    timeout = 0
+                elif timeout is not None:
+                    timeout = timeout // PRECISE_SLEEP * PRECISE_SLEEP
+                for key, mask in self.selector.select(timeout):
+                    if key.fileobj is not self.sock:
+                        # Input became readable; the next send phase reads it
+                        continue
+                    if mask & selectors.EVENT_WRITE:
+                        self.send_blocked = False
+                    if mask & selectors.EVENT_READ:
+                        self._receive_phase()
+                self.stats['wakeups'] += 1
                 self._timeout_phase()
         except Exception as e:
             print(f"ERROR in main loop: {e}", file=sys.stderr)
             raise
         finally:
+            self.stats['elapsed'] = time.monotonic() - start_wall
+            self.stats['cpu_time'] = time.thread_time() - start_cpu
             self.stop()
     
+    @property
+    def timeout_interval(self):
+        return self.rto.rto
+    
+    def _update_interest(self):
+        """Only wait for writability while the send buffer is full, and for input while it ran dry."""
+        events = selectors.EVENT_READ
+        if self.send_blocked:
+            events |= selectors.EVENT_WRITE
+        if self.selector.get_key(self.sock).events != events:
+            self.selector.modify(self.sock, events)
+        if self.stream is not None and self.stream.fd is not None:
+            watching = self.stream.fd in self.selector.get_map()
+            if self._wants_input() and not watching:
+                self.selector.register(self.stream.fd, selectors.EVENT_READ)
+            elif watching and not self._wants_input():
+                self.selector.unregister(self.stream.fd)
+    
+    def _wants_input(self):
+        """The window has room for next_seq but the stream had no data ready for it."""
+        return (self.stream is not None and self.stream.waiting and self.phase == 'data'
+                and not self.send_blocked and self.next_seq < self.base + self._send_window())
+    
+    def _select_timeout(self):
+        """Seconds until a retransmission timer fires or the pacer admits the next segment."""
+        if self.phase == 'data' and self._data_done():
+            # The send phase found EOF after the last ACK; nothing else would wake the loop
+            return 0
+        timeout = self._timer_timeout()
+        pace = self._pacing_delay()
+        if pace is not None and (timeout is None or pace < timeout):
+            return pace
+        return timeout
+    
+    def _timer_timeout(self):
+        """Seconds until the (earliest) retransmission timer fires, or None if idle."""
+        if self.phase != 'data':
+            if self.control_sent is None:
+                return None
+            started = self.control_sent
+        elif self.selective:
+            if not self.sr_timers:
+                return None
+            started = next(iter(self.sr_timers.values()))
+        elif self.timer is None:
+            return None
+        else:
+            started = self.timer
+        return max(0.0, started + self.timeout_interval - time.monotonic())
+    
+    def _pacing_delay(self):
+        """Seconds until the next segment may go out, or None if not pacing or nothing to send."""
+        if (self.pacer is None or self.send_blocked or self.phase != 'data'
+                or self.next_seq >= self.base + self._send_window()
+                or not self._segment_ready(self.next_seq)):
+            return None
+        return self.pacer.delay(len(self.frames.frame(self.next_seq)))
+    
+    def _update_pacing_rate(self):
+        """cwnd pacing: follow the congestion window over the smoothed RTT."""
+        if self.pacing != 'cwnd' or self.rto.srtt is None:
+            return
+        gain = SLOW_START_GAIN if self.cc.cwnd < self.cc.ssthresh else CONGESTION_AVOIDANCE_GAIN
+        rate = gain * self.cc.window * (HEADER_SIZE + self.mss) / max(self.rto.srtt, 1e-6)
+        if self.pacer is None:
+            self.pacer = TokenBucket(rate, HEADER_SIZE + self.mss)
+        else:
+            self.pacer.set_rate(rate)
+        self.stats['pacing_target'] = self.pacer.target
+    
+    def send_rate(self):
+        """Achieved sending rate in bytes/s, headers and retransmissions included."""
+        if self.stats['elapsed'] == 0:
+            return 0.0
+        return self.stats['bytes_sent'] / self.stats['elapsed']
+    
+    def cpu_per_mb(self):
+        """CPU seconds spent by the send loop per MB of file data."""
+        if self.stats['payload_bytes'] == 0:
+            return 0.0
+        return self.stats['cpu_time'] / (self.stats['payload_bytes'] / 1e6)
+    
+    def _finished(self):
+        """The transfer is over: all data acknowledged and, with the handshake, the CLOSE answered."""
+        if self.phase == 'data' and self._data_done():
+            if self.handshake:
+                self._queue_control('close', ClosePacket(self.transfer_id, self.stats['payload_bytes'],
+                                                         self.digest.digest()))
+            else:
+                self.phase = 'done'
+        return self.phase == 'done'
+    
+    def _data_done(self):
+        """All segments are acknowledged and no more input remains."""
+        if self.stream is not None and not self.stream.eof:
+            return False
+        return self.base >= len(self.segments)
+    
+    def _segment_ready(self, seq):
+        """Whether segment seq exists, reading what the stream has ready if needed (never blocks)."""
+        if self.stream is not None:
+            return self.stream.read_ahead(seq)
+        return seq < len(self.segments)
+    
+    def _send_frame(self, seq):
+        """Send one frame; False if the socket send buffer is full."""
+        return self._send_frames([self.frames.frame(seq)]) == 1
+    
+    def _send_frames(self, frames):
+        """Send frames in order in as few system calls as possible; returns how many went out."""
+        try:
+            sent = self.io.send(frames, self.server_addr)
+        except OSError:
+            sent = 0
+        if sent < len(frames):
+            # Send buffer full, wait for writability before sending more
+            self.send_blocked = True
+        for frame in frames[:sent]:
+            self._sent(frame)
+        return sent
+    
+    def _sent(self, frame):
+        self.stats['packets_sent'] += 1
+        self.stats['bytes_sent'] += len(frame)
+        if self.pacer is not None:
+            self.pacer.charge(len(frame))
+            self.stats['pacing_target'] = self.pacer.target
+    
     def _send_phase(self):
-        """Send packets if window has space."""
-        while self.next_seq < self.base + self.window_size and self.next_seq < len(self.segments):
-            pkt = DataPacket(self.next_seq, self.segments[self.next_seq])
-            
-            try:
-                self.sock.sendto(pkt.serialize(), self.server_addr)
-            except (BlockingIOError, socket.error):
-                # Send buffer full, stop trying to send more for now
+        """Send packets, a batch per system call, while min(cwnd, N) and the pacer allow."""
+        if self.phase != 'data':
+            if self.control is not None and self.control_sent is None and not self.send_blocked:
+                self._send_control()
+            return
+        self._update_pacing_rate()
+        while not self.send_blocked:
+            batch = self._next_batch()
+            if not batch:
                 break
+            sent = self._send_frames(batch)
             
-            if self.next_seq == self.base:
-                self.timer = time.time()
-            
-            self.next_seq += 1
+            now = time.monotonic()
+            for frame in batch[:sent]:
+                if self.next_seq < self.high_seq:
+                    # Go-Back-N resending the window after rewinding to base
+                    self.stats['retransmissions'] += 1
+                else:
+                    self.stats['payload_bytes'] += len(frame) - HEADER_SIZE
+                    if self.handshake:
+                        self.digest.update(memoryview(frame)[HEADER_SIZE:])
+                    self.send_times[self.next_seq] = now
+                    self.high_seq = self.next_seq + 1
+                if self.selective:
+                    self.sr_timers[self.next_seq] = now
+                elif self.next_seq == self.base:
+                    self.timer = now
+                self.next_seq += 1
+    
+    def _send_control(self):
+        if self._send_frames([self.control]):
+            self.control_sent = time.monotonic()
+    
+    def _next_batch(self):
+        """Frames from next_seq on that the window and pacer allow, up to batch_size."""
+        batch = []
+        queued = 0
+        seq = self.next_seq
+        window = self._send_window()
+        while (len(batch) < self.batch_size and seq < self.base + window
+               and self._segment_ready(seq)):
+            frame = self.frames.frame(seq)
+            if self.pacer is not None and self.pacer.delay(queued + len(frame)):
+                break
+            batch.append(frame)
+            queued += len(frame)
+            seq += 1
+        return batch
+    
+    def _send_window(self):
+        """Segments that may be outstanding: min(cwnd, rwnd, N).
+        
+        Never below one, so a closed receive window is probed by the
+        retransmission timer until an ACK reopens it.
+        """
+        if self.rwnd is None:
+            return self.cc.window
+        return max(1, min(self.cc.window, self.rwnd))
     
     def _receive_phase(self):
-        """Non-blocking ACK reception with buffering."""
-        try:
-            chunk, _ = self.sock.recvfrom(4096)  # Increased buffer size
-            if chunk:
-                self.ack_buffer += chunk
-        except (BlockingIOError, socket.error):
-            pass
+        """Drain every pending ACK datagram from the socket, a batch per system call."""
+        while True:
+            try:
+                batch = self.io.recv()
+            except OSError:
+                break
+            for raw, _ in batch:
+                self._handle_ack(raw)
+            if len(batch) < self.io.batch_size:
+                break
+    
+    def _handle_ack(self, raw):
+        """Process one ACK datagram and slide the window."""
+        ack = AckPacket.deserialize(raw) or SackPacket.deserialize(raw)
+        if ack is None:
+            reply = ControlReply.deserialize(raw)
+            if reply is not None:
+                self._handle_reply(reply)
+            return
+        self.stats['acks_received'] += 1
+        if ack.rwnd is not None:
+            self.rwnd = ack.rwnd
+        if isinstance(ack, SackPacket):
+            self._handle_sack(ack)
+        elif ack.selective:
+            self._handle_selective_ack(ack.ack_seq)
+        elif ack.ack_seq >= self.base:
+            self._advance(ack.ack_seq)
+        elif ack.ack_seq == self.base - 1 and self.base < self.next_seq:
+            self._on_dup_ack()
+    
+    def _handle_reply(self, reply):
+        """The receiver answered the pending OPEN or CLOSE."""
+        if (self.phase not in ('open', 'close') or reply.transfer_id != self.transfer_id
+                or (reply.answered == PACKET_TYPE_OPEN) != (self.phase == 'open')):
+            return
+        if self.control_tries == 0 and self.control_sent is not None:
+            self.rto.sample(time.monotonic() - self.control_sent)
+        if reply.status == STATUS_REFUSED:
+            print("Receiver refused the transfer")
+            self.transfer_status = reply.status
+            self._control_done('done')
+        elif self.phase == 'open':
+            self._control_done('data')
+        else:
+            self.transfer_status = reply.status
+            if reply.status != STATUS_OK:
+                print("Receiver reports a length or digest mismatch")
+            self._control_done('done')
+    
+    def _advance(self, ack_seq):
+        """Cumulative ACK: slide base past ack_seq and restart the timer."""
+        sent = self.send_times.get(ack_seq)
+        if sent is not None:
+            self.rto.sample(time.monotonic() - sent)
+        newly_acked = 0
+        for seq in range(self.base, ack_seq + 1):
+            self.send_times.pop(seq, None)
+            if seq not in self.acked:
+                newly_acked += 1
+        self.base = ack_seq + 1
+        self.next_seq = max(self.next_seq, self.base)
+        self._on_acked(newly_acked)
+        self._window_advanced()
+        if self.base == self.next_seq:
+            self.timer = None
+        else:
+            self.timer = time.monotonic()
+    
+    def _handle_sack(self, sack):
+        """SACK: record the ranges held by the receiver and resend only the holes.
         
-        while len(self.ack_buffer) >= HEADER_SIZE:
-            raw = self.ack_buffer[:HEADER_SIZE]
-            self.ack_buffer = self.ack_buffer[HEADER_SIZE:]
-            
-            ack = AckPacket.deserialize(raw)
-            if ack and ack.ack_seq >= self.base:
-                self.base = ack.ack_seq + 1
-                if self.base == self.next_seq:
-                    self.timer = None
-                else:
-                    self.timer = time.time()
+        A hole counts as lost once dupack_threshold segments above base
+        have been SACKed (the RFC 6675 rule), and each hole is resent at
+        most once until the next timeout.
+        """
+        now = time.monotonic()
+        sacked = len(self.acked)
+        for start, end in sack.blocks:
+            end = min(end, self.next_seq)
+            for seq in range(max(start, self.base), end):
+                if seq not in self.acked:
+                    self.acked.add(seq)
+                    sent = self.send_times.pop(seq, None)
+                    if sent is not None:
+                        self.rto.sample(now - sent)
+            self.sack_high = max(self.sack_high, end)
+        if len(self.acked) > sacked:
+            self._on_acked(len(self.acked) - sacked)
+        if sack.ack_seq > self.base:
+            self._advance(min(sack.ack_seq, self.next_seq) - 1)
+            self.acked = {seq for seq in self.acked if seq >= self.base}
+            self.sack_resent = {seq for seq in self.sack_resent if seq >= self.base}
+        if 0 < self.dupack_threshold <= len(self.acked):
+            if self._retransmit_unacked(self.sack_high):
+                self.stats['fast_retransmits'] += 1
+                self._on_congestion()
+    
+    def _on_acked(self, count):
+        """Let the congestion controller grow cwnd for newly acknowledged segments."""
+        if count:
+            self.cc.on_ack(count, self.rto.srtt or self.rto.rto)
+    
+    def _on_congestion(self):
+        """Shrink cwnd for a loss, at most once per window of data (NewReno recovery)."""
+        if self.base < self.recovery_point:
+            return
+        self.recovery_point = self.high_seq
+        self.cc.on_loss()
+    
+    def _handle_selective_ack(self, seq):
+        """Selective Repeat: mark one segment ACKed and slide past ACKed ones."""
+        if seq < self.base or seq >= self.next_seq or seq in self.acked:
+            return
+        sent = self.send_times.pop(seq, None)
+        if sent is not None:
+            self.rto.sample(time.monotonic() - sent)
+        self.sr_timers.pop(seq, None)
+        self.acked.add(seq)
+        self._on_acked(1)
+        if seq != self.base:
+            # ACKs above a hole play the role of duplicate ACKs
+            self._on_dup_ack()
+            return
+        while self.base in self.acked:
+            self.acked.discard(self.base)
+            self.base += 1
+        self._window_advanced()
+        if self.acked:
+            # Segments already ACKed above the next hole count towards
+            # fast retransmit of the new base straight away
+            self.dup_acks = len(self.acked) - 1
+            self._on_dup_ack()
+    
+    def _window_advanced(self):
+        """Reset loss detection and free buffers below the new base."""
+        self.rto.progress()
+        self.dup_acks = 0
+        self.in_recovery = False
+        self.frames.release(self.base)
+        if self.stream is not None:
+            self.stream.release(self.base)
+    
+    def _on_dup_ack(self):
+        """Fast retransmit after dupack_threshold duplicate ACKs, once per loss."""
+        self.dup_acks += 1
+        if self.dupack_threshold <= 0 or self.in_recovery or self.dup_acks < self.dupack_threshold:
+            return
+        # Later packets of the old window keep producing duplicates; ignore
+        # them until the retransmission advances base
+        self.in_recovery = True
+        self.stats['fast_retransmits'] += 1
+        self._on_congestion()
+        if self.selective:
+            self._retransmit_segment(self.base)
+        else:
+            self._retransmit_window()
+    
+    def _retransmit_segment(self, seq):
+        """Selective Repeat: resend one segment and restart its own timer."""
+        self.send_times.pop(seq, None)
+        if not self._send_frame(seq):
+            return False
+        self.stats['retransmissions'] += 1
+        self.sr_timers[seq] = time.monotonic()
+        self.sr_timers.move_to_end(seq)
+        return True
+    
+    def _retransmit_window(self):
+        """Go-Back-N: rewind to base so the send phase resends the window in order.
+        
+        Only as much of the old window as the (possibly reduced) cwnd
+        allows goes out at once; the rest follows as ACKs open the window.
+        """
+        for seq in range(self.base, self.next_seq):
+            self.send_times.pop(seq, None)
+        self.next_seq = self.base
+        self.timer = time.monotonic()
+    
+    def _retransmit_unacked(self, end):
+        """SACK: resend segments in [base, end) neither SACKed nor already resent."""
+        resent = False
+        for seq in range(self.base, end):
+            if seq in self.acked or seq in self.sack_resent:
+                continue
+            self.send_times.pop(seq, None)
+            if not self._send_frame(seq):
+                break
+            self.sack_resent.add(seq)
+            self.stats['retransmissions'] += 1
+            if seq == self.base:
+                self.timer = time.monotonic()
+            resent = True
+        return resent
+    
+    def _fall_back_to_gbn(self):
+        """Re-frame outstanding segments as plain Go-Back-N data for an old receiver."""
+        print("No SACK replies, falling back to Go-Back-N")
+        self.mode = 'gbn'
+        self.frames = FrameStore(self.segments, self.checksums, bounded=self.frames.bounded)
+        self.acked.clear()
+        self.sack_resent.clear()
+    
+    def _selective_timeout_phase(self):
+        """Selective Repeat: resend only the segments whose own timer expired."""
+        deadline = time.monotonic() - self.timeout_interval
+        expired = []
+        for seq, sent in self.sr_timers.items():
+            if sent > deadline:
+                break
+            expired.append(seq)
+        if not expired:
+            return
+        print(f"Timeout, sequence number = {expired[0]}")
+        self.stats['timeouts'] += 1
+        # Back off only when the oldest outstanding segment timed out, as
+        # TCP does; later holes expiring is not evidence of a longer RTT
+        if self.base in expired:
+            self.rto.backoff()
+            self.cc.on_timeout()
+            self.recovery_point = self.high_seq
+        for seq in expired:
+            if not self._retransmit_segment(seq):
+                break
+    
+    def _control_timeout_phase(self):
+        """Resend an unanswered OPEN or CLOSE, backing off like a data timeout."""
+        if self.control_sent is None or time.monotonic() - self.control_sent < self.timeout_interval:
+            return
+        self.control_tries += 1
+        print(f"Timeout, {self.phase.upper()}")
+        if self.phase == 'open' and self.control_tries >= OPEN_RETRIES:
+            print("No reply to OPEN, sending without the handshake")
+            self.handshake = False
+            self._control_done('data')
+            return
+        if self.phase == 'close' and self.control_tries >= CLOSE_RETRIES:
+            print("No reply to CLOSE, transfer unconfirmed")
+            self._control_done('done')
+            return
+        self.rto.backoff()
+        self.control_sent = None
+        self._send_control()
     
     def _timeout_phase(self):
         """Detect timeout and retransmit."""
-        if self.timer is not None and time.time() - self.timer > self.timeout_interval:
+        if self.phase != 'data':
+            self._control_timeout_phase()
+        elif self.selective:
+            self._selective_timeout_phase()
+        elif self.timer is not None and time.monotonic() - self.timer >= self.timeout_interval:
             print(f"Timeout, sequence number = {self.base}")
-            for seq in range(self.base, self.next_seq):
-                pkt = DataPacket(seq, self.segments[seq])
-                self.sock.sendto(pkt.serialize(), self.server_addr)
-            self.timer = time.time()
+            self.stats['timeouts'] += 1
+            self.rto.backoff()
+            self.cc.on_timeout()
+            self.recovery_point = self.high_seq
+            self.in_recovery = False
+            self.dup_acks = 0
+            if (self.mode == 'sack' and self.stats['acks_received'] == 0
+                    and self.stats['timeouts'] >= SACK_FALLBACK_TIMEOUTS):
+                self._fall_back_to_gbn()
+            if self.mode == 'sack':
+                self.sack_resent.clear()
+                self._retransmit_unacked(self.next_seq)
+                self.timer = time.monotonic()
+            else:
+                self._retransmit_window()
     
     def stop(self):
         """Cleanup."""
-        if self.file:
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+        if isinstance(self.segments, (MmapSegments, StreamSegments)):
+            self.segments.close()
+        if self.file and self.file is not sys.stdin.buffer:
             self.file.close()
         if self.sock:
             self.sock.close()
 
 
 def main():
-    if len(sys.argv) != 6:
-        print("Usage: python client.py <server_host> <server_port> <input_file> <window_size> <mss>")
-        sys.exit(1)
-    
-    host = sys.argv[1]
-    port = int(sys.argv[2])
-    input_file = sys.argv[3]
-    window_size = int(sys.argv[4])
-    mss = int(sys.argv[5])
+    parser = argparse.ArgumentParser(description='Simple-FTP Go-Back-N / Selective Repeat / SACK sender')
+    parser.add_argument('server_host')
+    parser.add_argument('server_port', type=int)
+    parser.add_argument('input_file', help="File to send, or '-' to stream from stdin")
+    parser.add_argument('window_size', type=int)
+    parser.add_argument('mss', type=int)
+    parser.add_argument('--mode', choices=MODES, default='gbn',
+                        help='Go-Back-N, Selective Repeat, or cumulative ACKs with SACK '
+                             'blocks (default: gbn)')
+    parser.add_argument('--dupack-threshold', type=int, default=DEFAULT_DUPACK_THRESHOLD,
+                        help=f'Duplicate ACKs that trigger fast retransmit, 0 disables '
+                             f'(default: {DEFAULT_DUPACK_THRESHOLD})')
+    parser.add_argument('--rto-initial', type=float, default=DEFAULT_INITIAL_RTO,
+                        help=f'Initial retransmission timeout in seconds (default: {DEFAULT_INITIAL_RTO})')
+    parser.add_argument('--rto-min', type=float, default=DEFAULT_MIN_RTO,
+                        help=f'Lower RTO clamp in seconds (default: {DEFAULT_MIN_RTO})')
+    parser.add_argument('--rto-max', type=float, default=DEFAULT_MAX_RTO,
+                        help=f'Upper RTO clamp in seconds (default: {DEFAULT_MAX_RTO})')
+    parser.add_argument('--fixed-rto', action='store_true',
+                        help='Keep the timeout fixed at --rto-initial (no RTT estimation or backoff)')
+    parser.add_argument('--rto-trace', help='Write the RTO trace to this CSV file')
+    parser.add_argument('--cc', choices=sorted(CONTROLLERS), default='none',
+                        help='Congestion control; window_size becomes the cwnd ceiling (default: none)')
+    parser.add_argument('--cwnd-trace', help='Write the per-RTT cwnd trace to this CSV file')
+    parser.add_argument('--pace', type=lambda text: text if text == 'cwnd' else parse_rate(text),
+                        help="Pace sends at RATE bytes/s (suffixes k, M, G), or 'cwnd' for "
+                             "cwnd/SRTT pacing (default: off)")
+    parser.add_argument('--no-handshake', action='store_true',
+                        help='Send the data without the OPEN/CLOSE exchange, for old receivers')
+    args = parser.parse_args()
     
-    client = SimpleFTPClient(host, port, input_file, window_size, mss)
+    client = SimpleFTPClient(args.server_host, args.server_port, args.input_file,
+                             args.window_size, args.mss,
+                             dupack_threshold=args.dupack_threshold,
+                             initial_rto=args.rto_initial, min_rto=args.rto_min,
+                             max_rto=args.rto_max, adaptive_rto=not args.fixed_rto,
+                             mode=args.mode, congestion=args.cc, pacing=args.pace,
+                             handshake=not args.no_handshake, rto_trace=bool(args.rto_trace))
     client.start()
     client.run()
+    if args.rto_trace:
+        client.rto.write_trace(args.rto_trace)
+    if args.cwnd_trace:
+        client.cc.write_trace(args.cwnd_trace)
+    
+    stats = client.stats
+    print(f"Sent {stats['payload_bytes']} bytes in {stats['elapsed']:.3f}s, "
+          f"{stats['retransmissions']} retransmissions, "
+          f"CPU {stats['cpu_time']:.3f}s ({client.cpu_per_mb():.3f} s/MB)")
+    if client.transfer_status == STATUS_OK:
+        print("Receiver confirmed length and digest")
+    if client.pacer is not None:
+        print(f"Pacing: target {stats['pacing_target'] / 1e6:.3f} MB/s, "
+              f"achieved {client.send_rate() / 1e6:.3f} MB/s")
 
 
 if __name__ == "__main__":
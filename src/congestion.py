@@ -0,0 +1,157 @@
+import time
+
+INITIAL_CWND = 2.0
+MIN_SSTHRESH = 2.0
+
+# CUBIC scaling constant and multiplicative decrease (RFC 8312)
+CUBIC_C = 0.4
+CUBIC_BETA = 0.7
+
+
+class CongestionControl:
+    """No congestion control: the window is always the ceiling N.
+    
+    Subclasses grow cwnd (in segments) on ACKs and shrink it on losses.
+    The sender never has more than min(cwnd, ceiling) segments in
+    flight. Each event, plus at most one ACK sample per RTT, is appended
+    to `trace` as (seconds since creation, event, cwnd, ssthresh).
+    """
+    
+    name = 'none'
+    initial_cwnd = None
+    
+    def __init__(self, ceiling):
+        self.ceiling = ceiling
+        self.cwnd = float(ceiling)
+        if self.initial_cwnd is not None:
+            self.cwnd = min(self.initial_cwnd, self.cwnd)
+        self.ssthresh = float('inf')
+        self.start = time.monotonic()
+        self.last_sample = None
+        self.trace = []
+        self._record('init')
+    
+    @property
+    def window(self):
+        """Segments the sender may have outstanding."""
+        return max(1, min(self.ceiling, int(self.cwnd)))
+    
+    def _record(self, event):
+        self.trace.append((time.monotonic() - self.start, event, self.cwnd, self.ssthresh))
+    
+    def on_ack(self, acked, rtt):
+        """acked new segments were acknowledged; rtt is the current RTT estimate."""
+        self._grow(acked, rtt)
+        self.cwnd = min(self.cwnd, float(self.ceiling))
+        now = time.monotonic()
+        if self.last_sample is None or now - self.last_sample >= rtt:
+            self.last_sample = now
+            self._record('ack')
+    
+    def on_loss(self):
+        """Loss detected by duplicate ACKs or SACK, once per window of data."""
+        self._reduce()
+        self._record('loss')
+    
+    def on_timeout(self):
+        """Retransmission timer expired."""
+        self._collapse()
+        self._record('timeout')
+    
+    def _grow(self, acked, rtt):
+        pass
+    
+    def _reduce(self):
+        pass
+    
+    def _collapse(self):
+        pass
+    
+    def write_trace(self, path):
+        """Write the trace as CSV for plotting."""
+        with open(path, 'w') as f:
+            f.write("time,event,cwnd,ssthresh\n")
+            for t, event, cwnd, ssthresh in self.trace:
+                ssthresh = '' if ssthresh == float('inf') else f"{ssthresh:.3f}"
+                f.write(f"{t:.6f},{event},{cwnd:.3f},{ssthresh}\n")
+
+
+class Reno(CongestionControl):
+    """Slow start, then additive increase / multiplicative decrease."""
+    
+    name = 'reno'
+    initial_cwnd = INITIAL_CWND
+    
+    def _grow(self, acked, rtt):
+        if self.cwnd < self.ssthresh:
+            self.cwnd += acked
+        else:
+            self.cwnd += acked / self.cwnd
+    
+    def _reduce(self):
+        self.ssthresh = max(self.cwnd / 2, MIN_SSTHRESH)
+        self.cwnd = self.ssthresh
+    
+    def _collapse(self):
+        self.ssthresh = max(self.cwnd / 2, MIN_SSTHRESH)
+        self.cwnd = 1.0
+
+
+class Cubic(Reno):
+    """CUBIC window growth (RFC 8312) with Reno slow start.
+    
+    After a loss cwnd follows W(t) = C(t - K)^3 + W_max, recovering
+    quickly towards the window where the loss happened and probing
+    slowly around it, but never grows slower than the Reno estimate.
+    """
+    
+    name = 'cubic'
+    
+    def __init__(self, ceiling):
+        super().__init__(ceiling)
+        self.w_max = 0.0
+        self.k = 0.0
+        self.epoch_start = None
+        self.w_est = 0.0
+    
+    def _grow(self, acked, rtt):
+        if self.cwnd < self.ssthresh:
+            self.cwnd += acked
+            return
+        now = time.monotonic()
+        if self.epoch_start is None:
+            # First congestion-avoidance ACK since the last loss
+            self.epoch_start = now
+            self.w_max = max(self.w_max, self.cwnd)
+            self.k = ((self.w_max - self.cwnd) / CUBIC_C) ** (1 / 3)
+            self.w_est = self.cwnd
+        target = CUBIC_C * (now - self.epoch_start + rtt - self.k) ** 3 + self.w_max
+        self.w_est += 3 * (1 - CUBIC_BETA) / (1 + CUBIC_BETA) * acked / self.cwnd
+        if target > self.cwnd:
+            self.cwnd += (target - self.cwnd) / self.cwnd * acked
+        else:
+            self.cwnd += 0.01 * acked / self.cwnd
+        self.cwnd = max(self.cwnd, self.w_est)
+    
+    def _reduce(self):
+        self.w_max = self.cwnd
+        self.cwnd = max(self.cwnd * CUBIC_BETA, MIN_SSTHRESH)
+        self.ssthresh = self.cwnd
+        self.epoch_start = None
+    
+    def _collapse(self):
+        self.w_max = self.cwnd
+        self.ssthresh = max(self.cwnd * CUBIC_BETA, MIN_SSTHRESH)
+        self.cwnd = 1.0
+        self.epoch_start = None
+
+
+CONTROLLERS = {cls.name: cls for cls in (CongestionControl, Reno, Cubic)}
+
+
+def create_controller(name, ceiling):
+    """Congestion controller by name, capped at ceiling segments."""
+    try:
+        return CONTROLLERS[name](ceiling)
+    except KeyError:
+        raise ValueError(f"Unknown congestion control: {name}")
@@ -1,4 +1,12 @@
 SERVER_PORT = 7735
 PACKET_TYPE_DATA = 0x5555
 PACKET_TYPE_ACK = 0xaaaa
+PACKET_TYPE_DATA_SR = 0x5556
+PACKET_TYPE_ACK_SR = 0xaaab
+PACKET_TYPE_DATA_SACK = 0x5557
+PACKET_TYPE_SACK = 0xaaac
+PACKET_TYPE_ACK_WINDOW = 0xaaad
+PACKET_TYPE_OPEN = 0x5560
+PACKET_TYPE_CLOSE = 0x5561
+PACKET_TYPE_CONTROL_REPLY = 0xaab0
 HEADER_SIZE = 8
@@ -0,0 +1,308 @@
+import argparse
+import heapq
+import random
+import selectors
+import socket
+import time
+from pacing import parse_rate
+
+# Longest the proxy loop sleeps, so stop() is noticed promptly
+POLL_INTERVAL = 0.1
+MAX_DATAGRAM = 65535
+# Datagrams read from one socket before due packets are delivered again
+RECV_BATCH = 64
+# Extra hold for a reordered packet unless reorder_delay is given
+DEFAULT_REORDER_DELAY = 0.005
+# Seconds of backlog the rate-limited queue holds before dropping
+DEFAULT_QUEUE_TIME = 0.1
+
+
+class Bernoulli:
+    """Independent loss with probability p."""
+    
+    def __init__(self, p):
+        self.p = p
+    
+    def lost(self, rng):
+        return rng.random() < self.p
+
+
+class GilbertElliott:
+    """Two-state bursty loss: a good and a bad state with their own loss rates.
+    
+    Each packet first moves good -> bad with probability p_good_bad (bad ->
+    good with p_bad_good), then is lost with the state's loss rate. Mean
+    burst length is 1 / p_bad_good packets.
+    """
+    
+    def __init__(self, p_good_bad, p_bad_good, loss_bad=1.0, loss_good=0.0):
+        self.p_good_bad = p_good_bad
+        self.p_bad_good = p_bad_good
+        self.loss_bad = loss_bad
+        self.loss_good = loss_good
+        self.bad = False
+    
+    def lost(self, rng):
+        # Always two draws, so later decisions do not depend on this one
+        move, loss = rng.random(), rng.random()
+        if self.bad:
+            self.bad = move >= self.p_bad_good
+        else:
+            self.bad = move < self.p_good_bad
+        return loss < (self.loss_bad if self.bad else self.loss_good)
+
+
+class Link:
+    """One direction of an emulated path.
+    
+    transmit(now, size) returns the times at which copies of a packet sent
+    at `now` arrive: none if it is lost, two if it is duplicated. Packets
+    are rate limited first (a token bucket of `burst` bytes refilled at
+    `rate` bytes/s, drained in order; packets that would wait longer than
+    queue_time are dropped, like a full router queue), then delayed by
+    delay plus uniform +-jitter, and with probability `reorder` held
+    another reorder_delay so later packets overtake them. Jitter alone
+    never reorders: like a real queue, the link is first-in first-out,
+    so a packet never arrives before the one sent ahead of it.
+    
+    Every packet draws the same amount from the seeded RNG whatever
+    happens to it, so the loss, jitter, reordering and duplication hitting
+    the k-th packet depend on the seed alone, not on timing. Queue drops
+    are the exception: whether the rate limiter drops a packet depends on
+    when it and the packets before it arrived.
+    """
+    
+    def __init__(self, loss=None, delay=0.0, jitter=0.0, reorder=0.0,
+                 reorder_delay=DEFAULT_REORDER_DELAY, duplicate=0.0, rate=None, burst=0,
+                 queue_time=DEFAULT_QUEUE_TIME, seed=0):
+        if isinstance(loss, (int, float)):
+            loss = Bernoulli(loss)
+        self.loss = loss
+        self.delay = delay
+        self.jitter = jitter
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay
+        self.duplicate = duplicate
+        self.rate = rate
+        self.burst = burst
+        self.queue_time = queue_time
+        self.rng = random.Random(seed)
+        # Token bucket state: tokens as of `stamp`, when the last packet left
+        self.tokens = burst
+        self.stamp = None
+        # Arrival of the last packet that was not reordered
+        self.last_arrival = 0.0
+        self.stats = {'packets': 0, 'lost': 0, 'queue_drops': 0, 'duplicated': 0, 'reordered': 0}
+    
+    def transmit(self, now, size):
+        self.stats['packets'] += 1
+        lost = self.loss is not None and self.loss.lost(self.rng)
+        jitter, reorder, duplicate = self.rng.random(), self.rng.random(), self.rng.random()
+        if lost:
+            self.stats['lost'] += 1
+            return []
+        departure = self._departure(now, size)
+        if departure is None:
+            self.stats['queue_drops'] += 1
+            return []
+        arrival = departure + max(0.0, self.delay + (2 * jitter - 1) * self.jitter)
+        arrival = max(arrival, self.last_arrival)
+        if reorder < self.reorder:
+            self.stats['reordered'] += 1
+            arrival += self.reorder_delay
+        else:
+            self.last_arrival = arrival
+        if duplicate < self.duplicate:
+            self.stats['duplicated'] += 1
+            return [arrival, arrival]
+        return [arrival]
+    
+    def _departure(self, now, size):
+        """When the packet clears the rate limiter, or None if the queue is full."""
+        if self.rate is None:
+            return now
+        start = now if self.stamp is None else max(now, self.stamp)
+        if start - now > self.queue_time:
+            return None
+        if self.stamp is not None:
+            self.tokens = min(self.burst, self.tokens + (start - self.stamp) * self.rate)
+        if self.tokens >= size:
+            self.tokens -= size
+            self.stamp = start
+        else:
+            self.stamp = start + (size - self.tokens) / self.rate
+            self.tokens = 0
+        return self.stamp
+
+
+# Named one-way impairments: (client -> server, server -> client)
+PROFILES = {
+    'lan': ({'delay': 0.0005}, {'delay': 0.0005}),
+    'wan': ({'delay': 0.02, 'jitter': 0.002, 'rate': 12.5e6, 'loss': 0.001},
+            {'delay': 0.02, 'jitter': 0.002}),
+    'lossy-wan': ({'delay': 0.03, 'jitter': 0.005, 'rate': 2.5e6, 'reorder': 0.01,
+                   'loss': GilbertElliott(0.01, 0.3)},
+                  {'delay': 0.03, 'jitter': 0.005, 'loss': 0.01}),
+    'satellite': ({'delay': 0.3, 'rate': 1.25e6, 'loss': 0.005}, {'delay': 0.3, 'loss': 0.005}),
+}
+
+
+def make_links(profile=None, seed=0, forward=None, reverse=None):
+    """(client -> server, server -> client) Links from a named profile plus overrides.
+    
+    The two directions get their own RNG streams derived from seed.
+    """
+    base = PROFILES[profile] if profile else ({}, {})
+    # Gilbert-Elliott state is per link, so profiles are copied
+    options = [{key: _fresh(value) for key, value in side.items()} for side in base]
+    options[0].update(forward or {})
+    options[1].update(reverse or {})
+    return Link(seed=2 * seed, **options[0]), Link(seed=2 * seed + 1, **options[1])
+
+
+def _fresh(value):
+    if isinstance(value, GilbertElliott):
+        return GilbertElliott(value.p_good_bad, value.p_bad_good, value.loss_bad, value.loss_good)
+    return value
+
+
+class NetemProxy:
+    """UDP relay that applies a Link in each direction between clients and one server.
+    
+    Clients send to the proxy's port; each client gets its own upstream
+    socket, so the server still sees one address (and session) per client.
+    """
+    
+    def __init__(self, port, target, forward=None, reverse=None):
+        self.port = port
+        self.target = target
+        self.forward = forward or Link()
+        self.reverse = reverse or Link()
+        self.sock = None
+        self.selector = None
+        # client addr -> upstream socket, and back
+        self.upstream = {}
+        self.clients = {}
+        # (arrival time, order, socket, data, destination)
+        self.pending = []
+        self.order = 0
+        self.running = False
+    
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('', self.port))
+        self.port = self.sock.getsockname()[1]
+        self.sock.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
+        self.running = True
+        print(f"Proxy on port {self.port} -> {self.target[0]}:{self.target[1]}")
+    
+    def run(self):
+        """Relay until stop(): receive, impair, and deliver what is due."""
+        try:
+            while self.running:
+                timeout = POLL_INTERVAL
+                if self.pending:
+                    timeout = min(timeout, max(0.0, self.pending[0][0] - time.monotonic()))
+                for key, _ in self.selector.select(timeout):
+                    self._receive(key.fileobj)
+                self._deliver()
+        except OSError:
+            # stop() from another thread closes the sockets under us
+            if self.running:
+                raise
+    
+    def _receive(self, sock):
+        for _ in range(RECV_BATCH):
+            try:
+                data, addr = sock.recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            now = time.monotonic()
+            if sock is self.sock:
+                self._queue(self.forward, now, self._upstream(addr), data, self.target)
+            else:
+                self._queue(self.reverse, now, self.sock, data, self.clients[sock])
+    
+    def _upstream(self, addr):
+        sock = self.upstream.get(addr)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            sock.connect(self.target)
+            self.upstream[addr] = sock
+            self.clients[sock] = addr
+            self.selector.register(sock, selectors.EVENT_READ)
+        return sock
+    
+    def _queue(self, link, now, sock, data, dest):
+        for arrival in link.transmit(now, len(data)):
+            heapq.heappush(self.pending, (arrival, self.order, sock, data, dest))
+            self.order += 1
+    
+    def _deliver(self):
+        now = time.monotonic()
+        while self.pending and self.pending[0][0] <= now:
+            _, _, sock, data, dest = heapq.heappop(self.pending)
+            try:
+                sock.sendto(data, dest)
+            except OSError:
+                # A full send buffer or a closed peer: the packet is lost
+                pass
+    
+    def stop(self):
+        self.running = False
+        for sock in [self.sock, *self.upstream.values()]:
+            if sock is not None:
+                sock.close()
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UDP impairment proxy between Simple-FTP client and server')
+    parser.add_argument('port', type=int, help='Port clients send to')
+    parser.add_argument('server_host')
+    parser.add_argument('server_port', type=int)
+    parser.add_argument('--profile', choices=sorted(PROFILES), help='Start from a named link profile')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed (default: 0)')
+    parser.add_argument('--loss', type=float, help='Data (client -> server) loss probability')
+    parser.add_argument('--burst-loss', type=float, nargs=2, metavar=('P_GB', 'P_BG'),
+                        help='Gilbert-Elliott data loss: good->bad and bad->good probabilities')
+    parser.add_argument('--ack-loss', type=float, help='ACK (server -> client) loss probability')
+    parser.add_argument('--delay', type=float, help='One-way delay in seconds, both directions')
+    parser.add_argument('--jitter', type=float, help='Uniform +- jitter in seconds, both directions')
+    parser.add_argument('--reorder', type=float, help='Probability a packet is held back and overtaken')
+    parser.add_argument('--duplicate', type=float, help='Probability a packet is delivered twice')
+    parser.add_argument('--rate', type=parse_rate, help='Data bandwidth in bytes/s (suffixes k, M, G)')
+    args = parser.parse_args()
+    
+    forward, reverse = {}, {}
+    for name in ('delay', 'jitter', 'reorder', 'duplicate'):
+        if getattr(args, name) is not None:
+            forward[name] = reverse[name] = getattr(args, name)
+    if args.rate is not None:
+        forward['rate'] = args.rate
+    if args.loss is not None:
+        forward['loss'] = args.loss
+    if args.burst_loss:
+        forward['loss'] = GilbertElliott(*args.burst_loss)
+    if args.ack_loss is not None:
+        reverse['loss'] = args.ack_loss
+    proxy = NetemProxy(args.port, (args.server_host, args.server_port),
+                       *make_links(args.profile, args.seed, forward, reverse))
+    proxy.start()
+    try:
+        proxy.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+    for name, link in (('client -> server', proxy.forward), ('server -> client', proxy.reverse)):
+        print(f"{name}: {link.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import time
+
+# Bucket depth: about this much time's worth of data at the pacing rate,
+# but never less than two frames so a full segment always fits
+BURST_TIME = 0.001
+MIN_BURST_FRAMES = 2
+
+# cwnd-derived pacing rate = gain * cwnd * MSS / SRTT, as in Linux TCP
+SLOW_START_GAIN = 2.0
+CONGESTION_AVOIDANCE_GAIN = 1.2
+
+RATE_SUFFIXES = {'k': 1e3, 'm': 1e6, 'g': 1e9}
+
+
+def parse_rate(text):
+    """Bytes per second from '250000', '500k', '10M' or '1G' (decimal multiples)."""
+    text = text.strip()
+    scale = RATE_SUFFIXES.get(text[-1:].lower(), 1)
+    if scale != 1:
+        text = text[:-1]
+    rate = float(text) * scale
+    if rate <= 0:
+        raise ValueError("Pacing rate must be positive")
+    return rate
+
+
+class TokenBucket:
+    """Byte-rate pacer: tokens accrue at `rate` bytes/s up to `burst` bytes.
+    
+    delay(n) is how long until n bytes may go out; charge(n) spends them
+    and may drive the balance negative (retransmissions that bypass the
+    pacer), which later sends then pay back. `target` is the time-weighted
+    mean rate, for comparing with the rate actually achieved.
+    """
+    
+    def __init__(self, rate, frame_size):
+        self.frame_size = frame_size
+        self.start = time.monotonic()
+        self.stamp = self.start
+        self.rate_integral = 0.0
+        self.charged = 0
+        self.rate = rate
+        self.burst = self._burst(rate)
+        self.tokens = self.burst
+    
+    def _burst(self, rate):
+        return max(MIN_BURST_FRAMES * self.frame_size, rate * BURST_TIME)
+    
+    def set_rate(self, rate):
+        """Change the rate; tokens earned so far are kept at the old rate."""
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.burst = self._burst(rate)
+    
+    def _refill(self, now):
+        elapsed = now - self.stamp
+        if elapsed > 0:
+            self.rate_integral += self.rate * elapsed
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.stamp = now
+    
+    def delay(self, nbytes):
+        """Seconds until nbytes may be sent (0.0 if now)."""
+        self._refill(time.monotonic())
+        if self.tokens >= nbytes:
+            return 0.0
+        return (nbytes - self.tokens) / self.rate
+    
+    def charge(self, nbytes):
+        """Spend tokens for nbytes just sent."""
+        self._refill(time.monotonic())
+        self.tokens -= nbytes
+        self.charged += nbytes
+    
+    @property
+    def target(self):
+        """Mean pacing rate in bytes/s since the bucket was created."""
+        self._refill(time.monotonic())
+        elapsed = self.stamp - self.start
+        return self.rate_integral / elapsed if elapsed > 0 else self.rate
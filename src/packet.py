@@ -3,54 +3,303 @@ from checksum import compute_checksum, verify_checksum
 
 PACKET_TYPE_DATA = 0x5555
 PACKET_TYPE_ACK = 0xaaaa
+# Selective Repeat variants: the sender's data type tells the receiver to
+# buffer out-of-order segments and ACK each one individually
+PACKET_TYPE_DATA_SR = 0x5556
+PACKET_TYPE_ACK_SR = 0xaaab
+# SACK variants: the receiver buffers out-of-order segments and answers
+# every data packet with a cumulative ACK plus the ranges held above it
+PACKET_TYPE_DATA_SACK = 0x5557
+PACKET_TYPE_SACK = 0xaaac
+# Any of the three ACK kinds plus the receiver's advertised window: the
+# checksummed body starts with the free window in segments and the kind
+PACKET_TYPE_ACK_WINDOW = 0xaaad
+# Control packets: the sender opens a transfer with its metadata and closes
+# it with the final length and digest; the receiver answers each with a
+# CONTROL_REPLY. The header's sequence field carries a random transfer id
+# and its checksum covers the body.
+PACKET_TYPE_OPEN = 0x5560
+PACKET_TYPE_CLOSE = 0x5561
+PACKET_TYPE_CONTROL_REPLY = 0xaab0
 HEADER_SIZE = 8
 MAX_PAYLOAD = 65535
+MAX_SACK_BLOCKS = 16
+
+HEADER = struct.Struct('!IHH')
+SACK_BLOCK = struct.Struct('!II')
+WINDOW = struct.Struct('!IH')
+MAX_WINDOW = 0xffffffff
+
+# OPEN: size, MSS, window, mode, flags and name length, then the name
+OPEN_BODY = struct.Struct('!QIIBBH')
+# OPEN flag: the sender understands PACKET_TYPE_ACK_WINDOW
+FLAG_WINDOW = 0x01
+UNKNOWN_SIZE = 0xffffffffffffffff
+# CLOSE: final length, then the SHA-256 digest of the data
+CLOSE_BODY = struct.Struct('!Q')
+DIGEST_SIZE = 32
+# CONTROL_REPLY: packet type answered and status
+REPLY_BODY = struct.Struct('!HB')
+STATUS_OK = 0
+STATUS_MISMATCH = 1
+STATUS_REFUSED = 2
+
+# ACK kinds carried by PACKET_TYPE_ACK_WINDOW
+ACK_CUMULATIVE = 0
+ACK_SELECTIVE = 1
+ACK_SACK = 2
+
+# Sender mode for each data packet type
+DATA_TYPES = {
+    'gbn': PACKET_TYPE_DATA,
+    'sr': PACKET_TYPE_DATA_SR,
+    'sack': PACKET_TYPE_DATA_SACK,
+}
+DATA_MODES = {pkt_type: mode for mode, pkt_type in DATA_TYPES.items()}
 
 
 class DataPacket:
-    def __init__(self, seq_num, data):
+    def __init__(self, seq_num, data, checksum=None, mode='gbn'):
         self.seq_num = seq_num
         self.data = data
-        self.checksum = compute_checksum(data)
+        self.mode = mode
+        # Callers that already know the payload checksum can skip recomputing it
+        self.checksum = compute_checksum(data) if checksum is None else checksum
     
     def serialize(self):
-        header = struct.pack('!IHH', self.seq_num, self.checksum, PACKET_TYPE_DATA)
+        header = struct.pack('!IHH', self.seq_num, self.checksum, DATA_TYPES[self.mode])
         return header + self.data
     
+    @staticmethod
+    def build_frame(seq_num, data, checksum=None, mode='gbn'):
+        """Header and payload packed into one preallocated buffer."""
+        if checksum is None:
+            checksum = compute_checksum(data)
+        frame = bytearray(HEADER_SIZE + len(data))
+        HEADER.pack_into(frame, 0, seq_num, checksum, DATA_TYPES[mode])
+        frame[HEADER_SIZE:] = data
+        return frame
+    
     @staticmethod
     def deserialize(raw):
+        """Parse and verify a data packet; None if malformed or corrupted.
+        
+        Given a memoryview, data is a view of the same buffer rather than
+        a copy, valid only as long as that buffer is.
+        """
         if len(raw) < HEADER_SIZE:
             return None
         
-        header = raw[:HEADER_SIZE]
-        data = raw[HEADER_SIZE:]
-        
-        seq_num, checksum, pkt_type = struct.unpack('!IHH', header)
+        seq_num, checksum, pkt_type = HEADER.unpack_from(raw)
         
-        if pkt_type != PACKET_TYPE_DATA:
+        mode = DATA_MODES.get(pkt_type)
+        if mode is None:
             return None
         
+        data = raw[HEADER_SIZE:]
         if not verify_checksum(data, checksum):
             return None
         
-        return DataPacket(seq_num, data)
+        return DataPacket(seq_num, data, checksum, mode)
+
+
+def _window_frame(ack_seq, rwnd, kind, body=b''):
+    body = WINDOW.pack(min(rwnd, MAX_WINDOW), kind) + body
+    return HEADER.pack(ack_seq, compute_checksum(body), PACKET_TYPE_ACK_WINDOW) + body
+
+
+def _parse_window(raw):
+    """(ack_seq, rwnd, kind, rest of body) of a window-advertising ACK, or None."""
+    if len(raw) < HEADER_SIZE + WINDOW.size:
+        return None
+    ack_seq, checksum, pkt_type = HEADER.unpack_from(raw)
+    if pkt_type != PACKET_TYPE_ACK_WINDOW:
+        return None
+    body = raw[HEADER_SIZE:]
+    if not verify_checksum(body, checksum):
+        return None
+    rwnd, kind = WINDOW.unpack_from(body)
+    return ack_seq, rwnd, kind, body[WINDOW.size:]
 
 
 class AckPacket:
-    def __init__(self, ack_seq):
+    """Cumulative ACK, or with selective=True an ACK for exactly one segment.
+    
+    With rwnd set the ACK also advertises how many more segments the
+    receiver can take, and is sent as PACKET_TYPE_ACK_WINDOW.
+    """
+    
+    def __init__(self, ack_seq, selective=False, rwnd=None):
         self.ack_seq = ack_seq
+        self.selective = selective
+        self.rwnd = rwnd
     
     def serialize(self):
-        return struct.pack('!IHH', self.ack_seq, 0, PACKET_TYPE_ACK)
+        if self.rwnd is not None:
+            kind = ACK_SELECTIVE if self.selective else ACK_CUMULATIVE
+            return _window_frame(self.ack_seq, self.rwnd, kind)
+        pkt_type = PACKET_TYPE_ACK_SR if self.selective else PACKET_TYPE_ACK
+        return struct.pack('!IHH', self.ack_seq, 0, pkt_type)
     
     @staticmethod
     def deserialize(raw):
         if len(raw) != HEADER_SIZE:
-            return None
+            parsed = _parse_window(raw)
+            if parsed is None or parsed[2] not in (ACK_CUMULATIVE, ACK_SELECTIVE) or parsed[3]:
+                return None
+            ack_seq, rwnd, kind, _ = parsed
+            return AckPacket(ack_seq, kind == ACK_SELECTIVE, rwnd)
         
         ack_seq, checksum, pkt_type = struct.unpack('!IHH', raw)
         
-        if pkt_type != PACKET_TYPE_ACK or checksum != 0:
+        if pkt_type not in (PACKET_TYPE_ACK, PACKET_TYPE_ACK_SR) or checksum != 0:
+            return None
+        
+        return AckPacket(ack_seq, pkt_type == PACKET_TYPE_ACK_SR)
+
+
+class SackPacket:
+    """Cumulative ACK extended with selective acknowledgment blocks.
+    
+    ack_seq is the next sequence number the receiver expects (everything
+    below it has been delivered); blocks are half-open (start, end) ranges
+    buffered above it, at most MAX_SACK_BLOCKS. The checksum field covers
+    the block list so a corrupted range is never trusted. With rwnd set
+    it is sent as PACKET_TYPE_ACK_WINDOW, advertising the receive window.
+    """
+    
+    def __init__(self, ack_seq, blocks=(), rwnd=None):
+        self.ack_seq = ack_seq
+        self.blocks = list(blocks)[:MAX_SACK_BLOCKS]
+        self.rwnd = rwnd
+    
+    def serialize(self):
+        body = b''.join(SACK_BLOCK.pack(start, end) for start, end in self.blocks)
+        if self.rwnd is not None:
+            return _window_frame(self.ack_seq, self.rwnd, ACK_SACK, body)
+        return HEADER.pack(self.ack_seq, compute_checksum(body), PACKET_TYPE_SACK) + body
+    
+    @staticmethod
+    def deserialize(raw):
+        if len(raw) < HEADER_SIZE:
+            return None
+        
+        ack_seq, checksum, pkt_type = HEADER.unpack_from(raw)
+        rwnd = None
+        if pkt_type == PACKET_TYPE_ACK_WINDOW:
+            parsed = _parse_window(raw)
+            if parsed is None or parsed[2] != ACK_SACK:
+                return None
+            ack_seq, rwnd, _, body = parsed
+        elif pkt_type == PACKET_TYPE_SACK:
+            body = raw[HEADER_SIZE:]
+            if not verify_checksum(body, checksum):
+                return None
+        else:
+            return None
+        
+        if len(body) % SACK_BLOCK.size or len(body) > MAX_SACK_BLOCKS * SACK_BLOCK.size:
+            return None
+        
+        blocks = [SACK_BLOCK.unpack_from(body, offset)
+                  for offset in range(0, len(body), SACK_BLOCK.size)]
+        if any(start >= end for start, end in blocks):
             return None
         
-        return AckPacket(ack_seq)
+        return SackPacket(ack_seq, blocks, rwnd)
+
+
+def _control_frame(transfer_id, pkt_type, body):
+    return HEADER.pack(transfer_id, compute_checksum(body), pkt_type) + body
+
+
+def _parse_control(raw, pkt_type, min_body):
+    """(transfer id, body) of a control packet of pkt_type, or None."""
+    if len(raw) < HEADER_SIZE + min_body:
+        return None
+    transfer_id, checksum, found = HEADER.unpack_from(raw)
+    if found != pkt_type:
+        return None
+    body = raw[HEADER_SIZE:]
+    if not verify_checksum(body, checksum):
+        return None
+    return transfer_id, body
+
+
+class OpenPacket:
+    """Transfer setup: file name, size (UNKNOWN_SIZE when streaming), MSS, window and mode."""
+    
+    def __init__(self, transfer_id, name, size, mss, window, mode='gbn', flags=0):
+        self.transfer_id = transfer_id
+        self.name = name
+        self.size = size
+        self.mss = mss
+        self.window = window
+        self.mode = mode
+        self.flags = flags
+    
+    def serialize(self):
+        name = self.name.encode('utf-8')[:MAX_PAYLOAD // 2]
+        body = OPEN_BODY.pack(self.size, self.mss, self.window, list(DATA_TYPES).index(self.mode),
+                              self.flags, len(name)) + name
+        return _control_frame(self.transfer_id, PACKET_TYPE_OPEN, body)
+    
+    @staticmethod
+    def deserialize(raw):
+        parsed = _parse_control(raw, PACKET_TYPE_OPEN, OPEN_BODY.size)
+        if parsed is None:
+            return None
+        transfer_id, body = parsed
+        size, mss, window, mode, flags, name_length = OPEN_BODY.unpack_from(body)
+        name = bytes(body[OPEN_BODY.size:])
+        if mode >= len(DATA_TYPES) or len(name) != name_length:
+            return None
+        return OpenPacket(transfer_id, name.decode('utf-8', 'replace'), size, mss, window,
+                          list(DATA_TYPES)[mode], flags)
+
+
+class ClosePacket:
+    """Transfer teardown: final length in bytes and SHA-256 digest of the data."""
+    
+    def __init__(self, transfer_id, length, digest):
+        self.transfer_id = transfer_id
+        self.length = length
+        self.digest = digest
+    
+    def serialize(self):
+        body = CLOSE_BODY.pack(self.length) + self.digest
+        return _control_frame(self.transfer_id, PACKET_TYPE_CLOSE, body)
+    
+    @staticmethod
+    def deserialize(raw):
+        parsed = _parse_control(raw, PACKET_TYPE_CLOSE, CLOSE_BODY.size + DIGEST_SIZE)
+        if parsed is None:
+            return None
+        transfer_id, body = parsed
+        if len(body) != CLOSE_BODY.size + DIGEST_SIZE:
+            return None
+        return ClosePacket(transfer_id, CLOSE_BODY.unpack_from(body)[0], bytes(body[CLOSE_BODY.size:]))
+
+
+class ControlReply:
+    """Receiver's answer to an OPEN or CLOSE (`answered`), echoing its transfer id."""
+    
+    def __init__(self, transfer_id, answered, status=STATUS_OK):
+        self.transfer_id = transfer_id
+        self.answered = answered
+        self.status = status
+    
+    def serialize(self):
+        body = REPLY_BODY.pack(self.answered, self.status)
+        return _control_frame(self.transfer_id, PACKET_TYPE_CONTROL_REPLY, body)
+    
+    @staticmethod
+    def deserialize(raw):
+        parsed = _parse_control(raw, PACKET_TYPE_CONTROL_REPLY, REPLY_BODY.size)
+        if parsed is None or len(parsed[1]) != REPLY_BODY.size:
+            return None
+        transfer_id, body = parsed
+        answered, status = REPLY_BODY.unpack_from(body)
+        if answered not in (PACKET_TYPE_OPEN, PACKET_TYPE_CLOSE):
+            return None
+        return ControlReply(transfer_id, answered, status)
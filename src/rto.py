@@ -0,0 +1,94 @@
+import time
+
+DEFAULT_INITIAL_RTO = 0.5
+DEFAULT_MIN_RTO = 0.02
+DEFAULT_MAX_RTO = 60.0
+
+# Jacobson/Karels gains and clock granularity (RFC 6298)
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+GRANULARITY = 0.001
+
+
+class RtoEstimator:
+    """Retransmission timeout from smoothed RTT samples (RFC 6298).
+    
+    Callers must only feed samples from segments that were never
+    retransmitted (Karn's rule); backoff() doubles the RTO on each timeout
+    until a fresh sample or progress() collapses it. progress() exists
+    because under heavy loss every outstanding segment is eventually
+    retransmitted, so Karn's rule can starve the estimator indefinitely;
+    like Linux TCP, an ACK for new data resets the backoff while keeping
+    SRTT. With adaptive=False the RTO stays fixed at `initial`. With
+    trace=True every change is appended to `trace` as (seconds since
+    creation, event, srtt, rttvar, rto); that is one entry per ACK, so it
+    is off by default and `trace` is None.
+    """
+    
+    def __init__(self, initial=DEFAULT_INITIAL_RTO, min_rto=DEFAULT_MIN_RTO,
+                 max_rto=DEFAULT_MAX_RTO, adaptive=True, trace=False):
+        if not 0 < min_rto <= max_rto:
+            raise ValueError("RTO clamps must satisfy 0 < min_rto <= max_rto")
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.adaptive = adaptive
+        self.srtt = None
+        self.rttvar = None
+        self.base_rto = self._clamp(initial) if adaptive else initial
+        self.backoffs = 0
+        self.rto = self.base_rto
+        self.samples = 0
+        self.start = time.monotonic()
+        self.trace = [] if trace else None
+        self._record('init')
+    
+    def _clamp(self, value):
+        return min(self.max_rto, max(self.min_rto, value))
+    
+    def _record(self, event):
+        if self.trace is not None:
+            self.trace.append((time.monotonic() - self.start, event, self.srtt, self.rttvar, self.rto))
+    
+    def sample(self, rtt):
+        """Update SRTT/RTTVAR with one RTT measurement in seconds."""
+        self.samples += 1
+        if not self.adaptive:
+            return
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+        self.base_rto = self._clamp(self.srtt + max(GRANULARITY, K * self.rttvar))
+        self.backoffs = 0
+        self.rto = self.base_rto
+        self._record('sample')
+    
+    def backoff(self):
+        """Double the RTO after a timeout."""
+        if not self.adaptive:
+            return
+        self.backoffs += 1
+        self.rto = self._clamp(self.rto * 2)
+        self._record('backoff')
+    
+    def progress(self):
+        """New data was ACKed: drop any backoff and return to the estimated RTO."""
+        if not self.adaptive or self.backoffs == 0:
+            return
+        self.backoffs = 0
+        self.rto = self.base_rto
+        self._record('reset')
+    
+    def write_trace(self, path):
+        """Write the trace as CSV for plotting."""
+        if self.trace is None:
+            raise ValueError("RTO tracing was not enabled (trace=True)")
+        with open(path, 'w') as f:
+            f.write("time,event,srtt,rttvar,rto\n")
+            for t, event, srtt, rttvar, rto in self.trace:
+                srtt = '' if srtt is None else f"{srtt:.6f}"
+                rttvar = '' if rttvar is None else f"{rttvar:.6f}"
+                f.write(f"{t:.6f},{event},{srtt},{rttvar},{rto:.6f}\n")
@@ -0,0 +1,175 @@
+import mmap
+import os
+from packet import DataPacket
+
+
+class MmapSegments:
+    """MSS-sized segments of a regular file exposed as memoryview slices of an mmap.
+    
+    Nothing is read up front: segment i is the slice [i * mss, (i + 1) * mss)
+    and pages are faulted in by the kernel as frames are built.
+    """
+    
+    def __init__(self, file, mss):
+        self.mss = mss
+        self.size = os.fstat(file.fileno()).st_size
+        self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+        self.view = memoryview(self.map)
+        self.count = (self.size + mss - 1) // mss
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = index * self.mss
+        return self.view[start:start + self.mss]
+    
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+
+class StreamSegments:
+    """Ring of at most `capacity` segments read lazily from an unbounded stream.
+    
+    Segments live in one preallocated buffer of capacity * mss bytes; slot
+    seq % capacity is reused once release() moves past seq. len() is the
+    number of segments read so far, which is the total once eof is set.
+    
+    A stream with a file descriptor is switched to non-blocking mode and
+    read from the descriptor directly, so read_ahead() only takes what is
+    already there. When it runs dry before EOF, `waiting` is set and the
+    caller should wait for fileno() to become readable before retrying.
+    """
+    
+    def __init__(self, file, mss, capacity):
+        self.file = file
+        self.mss = mss
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * mss)
+        self.view = memoryview(self.buffer)
+        self.lengths = [0] * capacity
+        self.base = 0
+        self.count = 0
+        # Bytes of the segment at count read so far
+        self.filled = 0
+        self.eof = False
+        self.waiting = False
+        self.fd = None
+        self.was_blocking = None
+        try:
+            fd = file.fileno()
+            self.was_blocking = os.get_blocking(fd)
+            os.set_blocking(fd, False)
+        except (AttributeError, OSError, ValueError):
+            # In-memory streams, and platforms without non-blocking pipes
+            pass
+        else:
+            self.fd = fd
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, seq):
+        if not self.base <= seq < self.count:
+            raise IndexError(seq)
+        slot = seq % self.capacity
+        start = slot * self.mss
+        return self.view[start:start + self.lengths[slot]]
+    
+    def fileno(self):
+        return self.fd
+    
+    def read_ahead(self, seq):
+        """Read segments up to and including seq if the ring has room; True if seq is available."""
+        self.waiting = False
+        while (self.count <= seq and not self.eof and self.count < self.base + self.capacity
+               and self._read_segment()):
+            pass
+        return self.base <= seq < self.count
+    
+    def _read_segment(self):
+        """Fill the next slot; False if the stream has no data ready yet."""
+        slot = self.count % self.capacity
+        start = slot * self.mss
+        # Pipes may return short reads; keep going until a full MSS or EOF
+        while self.filled < self.mss:
+            try:
+                n = self._readinto(self.view[start + self.filled:start + self.mss])
+            except BlockingIOError:
+                n = None
+            if n is None:
+                self.waiting = True
+                return False
+            if not n:
+                self.eof = True
+                break
+            self.filled += n
+        if self.filled:
+            self.lengths[slot] = self.filled
+            self.count += 1
+            self.filled = 0
+        return True
+    
+    def _readinto(self, view):
+        if self.fd is None:
+            return self.file.readinto(view)
+        return os.readv(self.fd, [view])
+    
+    def release(self, base):
+        """Free slots below base for reuse."""
+        self.base = max(self.base, min(base, self.count))
+    
+    def close(self):
+        if self.fd is not None and self.was_blocking:
+            # stdin may be a terminal shared with the shell
+            try:
+                os.set_blocking(self.fd, True)
+            except OSError:
+                pass
+        self.view.release()
+
+
+class FrameStore:
+    """Wire frames for a sequence of segments, each built exactly once.
+    
+    frame(seq) returns a cached memoryview over the packed header and
+    payload, so Go-Back-N retransmissions reuse the same buffer without
+    re-packing or re-hashing. In bounded mode only frames between the
+    last release() point and the highest frame requested are kept.
+    """
+    
+    def __init__(self, segments, checksums=None, bounded=False, mode='gbn'):
+        self.segments = segments
+        self.checksums = checksums
+        self.bounded = bounded
+        self.mode = mode
+        self.frames = {}
+        self.built = 0
+        self.released = 0
+    
+    def __len__(self):
+        return len(self.segments)
+    
+    def frame(self, seq):
+        """Memoryview of the wire frame for segment seq."""
+        view = self.frames.get(seq)
+        if view is None:
+            checksum = self.checksums[seq] if self.checksums is not None else None
+            view = memoryview(DataPacket.build_frame(seq, self.segments[seq], checksum,
+                                                     self.mode))
+            self.frames[seq] = view
+            self.built += 1
+        return view
+    
+    def release(self, base):
+        """Drop frames below base once they are acknowledged (bounded mode only)."""
+        if not self.bounded:
+            return
+        for seq in range(self.released, base):
+            self.frames.pop(seq, None)
+        self.released = max(self.released, base)
@@ -1,40 +1,293 @@
+import argparse
+import hashlib
+import itertools
+import os
 import socket
 import sys
+import time
 import random
-from packet import DataPacket, AckPacket
+from collections import OrderedDict
+from packet import (DataPacket, AckPacket, SackPacket, OpenPacket, ClosePacket, ControlReply,
+                    MAX_SACK_BLOCKS, HEADER, PACKET_TYPE_OPEN, PACKET_TYPE_CLOSE, UNKNOWN_SIZE, FLAG_WINDOW,
+                    STATUS_OK, STATUS_MISMATCH, STATUS_REFUSED)
 from constants import SERVER_PORT
+from batchio import DatagramIO
+from writer import WriteBehind, DEFAULT_CHUNK_SIZE, DEFAULT_MAX_QUEUED, FSYNC_POLICIES
+from admin import AdminChannel, DEFAULT_ADMIN_HOST
+
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_IDLE_TIMEOUT = 10.0
+DEFAULT_REASSEMBLY_LIMIT = 1024
+RECV_TIMEOUT = 0.5
+# Sessions with buffered output are flushed once no packet has arrived for this long
+IDLE_FLUSH = 0.05
+# Closed transfers remembered so a retransmitted CLOSE gets the same answer
+MAX_CLOSED = 1024
+# Settings configure() may change while running: name -> (type, check). Write
+# settings only apply to sessions opened after the change.
+SETTINGS = {
+    'loss_prob': (float, lambda v: 0.0 <= v <= 1.0),
+    'output_file': (str, lambda v: v != ''),
+    'max_sessions': (int, lambda v: v >= 1),
+    'idle_timeout': (float, lambda v: v > 0),
+    'reassembly_limit': (int, lambda v: v >= 1),
+    'advertise_window': (bool, lambda v: True),
+    'write_chunk': (int, lambda v: v > 0),
+    'fsync': (str, lambda v: v in FSYNC_POLICIES),
+    'write_thread': (bool, lambda v: True),
+    'write_queue': (int, lambda v: v >= 1),
+}
+# Settings kept in write_options, under the WriteBehind argument name
+WRITE_SETTINGS = {'write_chunk': 'chunk_size', 'fsync': 'fsync', 'write_thread': 'threaded',
+                  'write_queue': 'max_queued'}
+
+
+class Session:
+    """Receive state for one client (host, port).
+    
+    Payloads are written through a WriteBehind; write_options are passed to it.
+    """
+    
+    def __init__(self, addr, path, **write_options):
+        self.addr = addr
+        self.path = path
+        self.writer = WriteBehind(path, **write_options)
+        self.expected_seq = 0
+        self.bytes_received = 0
+        self.started = time.monotonic()
+        self.last_active = self.started
+        # Selective Repeat / SACK: out-of-order payloads waiting for the gap to fill
+        self.mode = 'gbn'
+        self.buffer = {}
+        self.buffered_bytes = 0
+        # Largest payload seen, for converting writer room into segments
+        self.segment_size = 0
+        # In-order segments refused because the writer thread was backed up
+        self.overflows = 0
+        # Set by an OPEN; None for senders that skip the handshake
+        self.transfer_id = None
+        self.name = None
+        # Whether the sender announced (FLAG_WINDOW) that it parses window ACKs
+        self.window_acks = False
+        self.digest = hashlib.sha256()
+    
+    def reset(self):
+        """Start over for a new transfer from the same address."""
+        self.expected_seq = 0
+        self.bytes_received = 0
+        self.digest = hashlib.sha256()
+        self.buffer.clear()
+        self.buffered_bytes = 0
+        self.writer.truncate()
+    
+    def accepts(self, size):
+        """Whether size bytes, and everything buffered behind them, fit the writer without blocking.
+        
+        Once the writer thread's queue is empty the segment is taken
+        regardless, so a reassembly buffer bigger than the queue cannot
+        wedge the session.
+        """
+        if self.writer.room >= size + self.buffered_bytes or self.writer.queued == 0:
+            return True
+        self.overflows += 1
+        return False
+    
+    def window(self, limit):
+        """Segments from expected_seq on that can be taken: limit, or fewer if the writer is backed up."""
+        room = self.writer.room - self.buffered_bytes
+        if self.segment_size and room < limit * self.segment_size:
+            # Buffered segments already have their room reserved
+            limit = min(limit, len(self.buffer) + max(0, int(room // self.segment_size)))
+        return limit
+    
+    def deliver(self, data):
+        """Write the next in-order payload, then any buffered ones it makes contiguous."""
+        self._write(data)
+        while self.expected_seq in self.buffer:
+            data = self.buffer.pop(self.expected_seq)
+            self.buffered_bytes -= len(data)
+            self._write(data)
+    
+    def _write(self, data):
+        self.writer.write(data)
+        self.digest.update(data)
+        self.expected_seq += 1
+        self.bytes_received += len(data)
+    
+    def hold(self, seq, data):
+        """Buffer an out-of-order payload, copied because the receive pool slot is reused."""
+        if seq not in self.buffer:
+            self.buffer[seq] = bytes(data)
+            self.buffered_bytes += len(data)
+    
+    def close(self):
+        self.writer.close()
+
 
 class SimpleFTPServer:
-    """Go-Back-N receiver."""
+    """Go-Back-N receiver serving concurrent transfers, one session per client address.
+    
+    If output_file contains {host} / {port} / {name} placeholders each
+    session writes to its own formatted path ({name} is the file name the
+    sender announced when opening the transfer). Otherwise the first active session writes to
+    output_file and concurrent ones to output_file.<host>_<port>.
+    
+    Output is coalesced into write_chunk-byte writes (see WriteBehind)
+    and flushed whenever a session has been idle for IDLE_FLUSH seconds
+    and when it ends. With write_thread (the default) each session's
+    writes run on its own thread behind a queue of write_queue chunks, so
+    packets are validated and ACKed without waiting for the disk. When
+    that queue is full, in-order segments are dropped unacknowledged, as
+    a full receive buffer would. With advertise_window every ACK to a
+    sender that set FLAG_WINDOW in its OPEN also carries the receive
+    window (reassembly_limit segments, shrinking as the writer queue
+    fills), so it slows down before that happens. Other senders get the
+    plain ACK types they know.
     
-    def __init__(self, port, output_file, loss_prob):
+    Senders that open a transfer (OPEN) get the output preallocated to the
+    announced size; their CLOSE is checked against the length and SHA-256
+    digest received, closes the session at once and appends a result to
+    `completed`.
+    
+    The SETTINGS can be changed while running with configure(); with an
+    admin_port they can also be queried and changed over an AdminChannel.
+    """
+    
+    def __init__(self, port, output_file, loss_prob, max_sessions=DEFAULT_MAX_SESSIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, reassembly_limit=DEFAULT_REASSEMBLY_LIMIT,
+                 write_chunk=DEFAULT_CHUNK_SIZE, fsync='none', write_thread=True,
+                 write_queue=DEFAULT_MAX_QUEUED, advertise_window=True, admin_port=None,
+                 admin_host=DEFAULT_ADMIN_HOST):
         self.port = port
         self.output_file = output_file
         self.loss_prob = loss_prob
-        self.expected_seq = 0
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reassembly_limit = reassembly_limit
+        self.advertise_window = advertise_window
+        self.write_options = {'chunk_size': write_chunk, 'fsync': fsync, 'threaded': write_thread,
+                              'max_queued': write_queue}
+        self.sessions = {}
+        # Sessions written to since the last idle flush
+        self.dirty = set()
+        self.last_session = None
+        self.last_eviction = 0.0
+        # addr -> (transfer id, status) of transfers ended by a CLOSE
+        self.closed = OrderedDict()
+        # One dict per transfer closed by its sender: name, bytes, elapsed, throughput, ...
+        self.completed = []
         self.sock = None
-        self.file = None
+        self.io = None
+        # ACKs queued while a received batch is processed, sent together after it
+        self.outbox = None
         self.running = False
+        self.admin = AdminChannel(self, admin_port, admin_host) if admin_port is not None else None
+    
+    @property
+    def expected_seq(self):
+        """Next expected sequence number of the most recently active session."""
+        return self.last_session.expected_seq if self.last_session else 0
     
     def start(self):
         """Bind socket and open output file."""
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.sock.bind(('', self.port))
-        self.sock.settimeout(0.5)
-        self.file = open(self.output_file, 'wb')
+        # Port 0 binds an ephemeral port; report the one actually chosen
+        self.port = self.sock.getsockname()[1]
+        self.sock.setblocking(False)
+        self.io = DatagramIO(self.sock)
+        self._prepare_output()
         self.running = True
         print(f"Server listening on port {self.port}")
+        if self.admin is not None:
+            self.admin.start()
+    
+    def settings(self):
+        """Current values of the SETTINGS."""
+        values = {}
+        for name in SETTINGS:
+            if name in WRITE_SETTINGS:
+                values[name] = self.write_options[WRITE_SETTINGS[name]]
+            else:
+                values[name] = getattr(self, name)
+        return values
+    
+    def status(self):
+        """Read-only counters reported alongside the settings."""
+        return {'sessions': len(self.sessions), 'completed': len(self.completed)}
+    
+    def configure(self, **changes):
+        """Change SETTINGS while running; a bad name or value raises ValueError and changes nothing.
+        
+        A new output_file is checked for writability before anything is
+        applied (OSError if it cannot be created). Safe to call from
+        another thread: each setting is a single attribute (or
+        write_options) replacement that the loop picks up on its next
+        packet or session.
+        """
+        values = {}
+        for name, value in changes.items():
+            if name not in SETTINGS:
+                raise ValueError(f"Unknown setting: {name}")
+            kind, check = SETTINGS[name]
+            if kind is float and type(value) is int:
+                value = float(value)
+            if type(value) is not kind or not check(value):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+            values[name] = value
+        new_output = values.get('output_file', self.output_file) != self.output_file
+        if new_output:
+            self._check_output(values['output_file'])
+        write_options = dict(self.write_options)
+        for name, value in values.items():
+            if name in WRITE_SETTINGS:
+                write_options[WRITE_SETTINGS[name]] = value
+            else:
+                setattr(self, name, value)
+        self.write_options = write_options
+        if new_output and self.running and all(s.path != self.output_file
+                                               for s in list(self.sessions.values())):
+            self._prepare_output()
+    
+    def _check_output(self, output_file):
+        """Raise unless sessions could create their files under output_file."""
+        if '{' not in output_file:
+            # Created without truncating; _prepare_output() empties it once applied
+            open(output_file, 'ab').close()
+            return
+        directory = os.path.dirname(output_file) or '.'
+        if '{' not in directory and not os.access(directory, os.W_OK | os.X_OK):
+            raise PermissionError(f"Cannot create output files in {directory}")
+    
+    def _prepare_output(self):
+        """Create the output file up front so a single transfer's path exists immediately."""
+        if not self._templated():
+            open(self.output_file, 'wb').close()
+    
+    def _templated(self):
+        return '{' in self.output_file
     
     def run(self):
-        """Main receive loop."""
+        """Main receive loop: handle each received batch, then send its ACKs together."""
         try:
             while self.running:
                 try:
-                    raw, addr = self.sock.recvfrom(65535)
-                    self._handle_packet(raw, addr)
-                except socket.timeout:
-                    pass
+                    batch = self.io.recv(IDLE_FLUSH if self.dirty else RECV_TIMEOUT)
+                    if not batch:
+                        self._flush_writes()
+                        self._evict_idle()
+                        continue
+                    self.outbox = []
+                    for raw, addr in batch:
+                        self._handle_packet(raw, addr)
+                    self._flush()
+                    self._flush_writes(IDLE_FLUSH)
+                except OSError:
+                    # stop() from another thread closes the socket under us
+                    if not self.running:
+                        break
+                    raise
         except KeyboardInterrupt:
             pass
         finally:
@@ -42,56 +295,286 @@ class SimpleFTPServer:
     
     def _handle_packet(self, raw, addr):
         """Process received packet with loss simulation."""
+        self._evict_idle()
         if random.random() <= self.loss_prob:
             # Extract sequence number from packet for loss output
-            if len(raw) >= 4:
-                import struct
-                seq_num = struct.unpack('!I', raw[:4])[0]
+            if len(raw) >= HEADER.size:
+                seq_num = HEADER.unpack_from(raw)[0]
                 print(f"Packet loss, sequence number = {seq_num}")
             return
         
+        # raw is a view into the receive pool: pkt.data is written straight
+        # from it and only copied when buffered out of order
         pkt = DataPacket.deserialize(raw)
         if pkt is None:
+            self._handle_control(raw, addr)
+            return
+        if addr in self.closed and addr not in self.sessions:
+            # Late retransmission for a transfer that has already been closed
             return
         
-        # Detect new transfer: if we get segment 0 and expected is way ahead, reset
-        if pkt.seq_num == 0 and self.expected_seq > 100:
-            self.expected_seq = 0
+        session = self._get_session(addr)
+        if session is None:
+            return
+        session.last_active = time.monotonic()
         
-        if pkt.seq_num == self.expected_seq:
-            self.file.write(pkt.data)
-            self.file.flush()
-            self._send_ack(pkt.seq_num, addr)
-            self.expected_seq += 1
+        # Detect new transfer: if we get segment 0 and expected is way ahead, reset.
+        # Only senders without the handshake need the guess; an OPEN marks a
+        # new transfer, so seq 0 here is a late duplicate
+        if pkt.seq_num == 0 and session.expected_seq > 100 and session.transfer_id is None:
+            session.reset()
+        
+        session.mode = pkt.mode
+        session.segment_size = max(session.segment_size, len(pkt.data))
+        if pkt.mode == 'sr':
+            self._handle_selective(session, pkt)
+        elif pkt.mode == 'sack':
+            self._handle_sack(session, pkt)
+        elif pkt.seq_num == session.expected_seq:
+            if session.accepts(len(pkt.data)):
+                session.deliver(pkt.data)
+                self._send_ack(session, pkt.seq_num)
+        elif session.expected_seq > 0:
+            # Out-of-order or duplicate: repeat the cumulative ACK so the
+            # sender sees duplicate ACKs and can fast-retransmit
+            self._send_ack(session, session.expected_seq - 1)
+    
+    def _reassemble(self, session, pkt):
+        """Deliver or buffer a segment; False if beyond the reassembly buffer or the writer is full."""
+        seq = pkt.seq_num
+        if seq >= session.expected_seq + self.reassembly_limit:
+            # The sender's timer will resend it
+            return False
+        if seq == session.expected_seq:
+            if not session.accepts(len(pkt.data)):
+                return False
+            session.deliver(pkt.data)
+        elif seq > session.expected_seq:
+            session.hold(seq, pkt.data)
+        return True
+    
+    def _handle_selective(self, session, pkt):
+        """Selective Repeat: buffer out-of-order segments and ACK each one."""
+        if self._reassemble(session, pkt):
+            # Duplicates below expected_seq are re-ACKed in case the ACK was lost
+            self._send_ack(session, pkt.seq_num, selective=True)
+    
+    def _handle_sack(self, session, pkt):
+        """SACK: buffer like Selective Repeat, answer with a cumulative ACK plus held ranges."""
+        if self._reassemble(session, pkt):
+            sack = SackPacket(session.expected_seq, self._sack_blocks(session, pkt.seq_num),
+                              self._rwnd(session))
+            self._send_packet(sack.serialize(), session.addr)
+    
+    def _sack_blocks(self, session, seq):
+        """Contiguous buffered ranges, the one holding seq first (as in RFC 2018)."""
+        blocks = []
+        for s in sorted(session.buffer):
+            if blocks and blocks[-1][1] == s:
+                blocks[-1][1] = s + 1
+            else:
+                blocks.append([s, s + 1])
+        blocks.sort(key=lambda block: not block[0] <= seq < block[1])
+        return [tuple(block) for block in blocks[:MAX_SACK_BLOCKS]]
+    
+    def _handle_control(self, raw, addr):
+        """Answer an OPEN or CLOSE; every copy is answered, in case the reply was lost."""
+        pkt = OpenPacket.deserialize(raw)
+        if pkt is not None:
+            self._open_transfer(pkt, addr)
+            return
+        pkt = ClosePacket.deserialize(raw)
+        if pkt is not None:
+            self._close_transfer(pkt, addr)
+    
+    def _open_transfer(self, pkt, addr):
+        closed = self.closed.get(addr)
+        if addr not in self.sessions and closed is not None and closed[0] == pkt.transfer_id:
+            # A delayed or duplicated OPEN of a transfer already closed: its
+            # output is complete, so answer without reopening (truncating) it
+            self._reply(pkt, addr, PACKET_TYPE_OPEN, STATUS_OK)
+            return
+        session = self.sessions.get(addr)
+        if session is not None and session.transfer_id != pkt.transfer_id:
+            # A new transfer from the same address
+            self._close_session(addr)
+            session = None
+        if session is None:
+            self.closed.pop(addr, None)
+            session = self._get_session(addr, pkt.name)
+            if session is None:
+                self._reply(pkt, addr, PACKET_TYPE_OPEN, STATUS_REFUSED)
+                return
+            session.transfer_id = pkt.transfer_id
+            session.name = pkt.name
+            session.segment_size = pkt.mss
+            session.window_acks = bool(pkt.flags & FLAG_WINDOW)
+            if pkt.size != UNKNOWN_SIZE:
+                session.writer.preallocate(pkt.size)
+            size = 'unknown size' if pkt.size == UNKNOWN_SIZE else f"{pkt.size} bytes"
+            print(f"Transfer {pkt.name} from {addr[0]}:{addr[1]}: {size}, MSS={pkt.mss}, "
+                  f"N={pkt.window}, {pkt.mode}")
+        session.last_active = time.monotonic()
+        self._reply(pkt, addr, PACKET_TYPE_OPEN, STATUS_OK)
+    
+    def _close_transfer(self, pkt, addr):
+        session = self.sessions.get(addr)
+        if session is None or session.transfer_id != pkt.transfer_id:
+            # Already closed: repeat the answer
+            closed = self.closed.get(addr)
+            if closed is not None and closed[0] == pkt.transfer_id:
+                self._reply(pkt, addr, PACKET_TYPE_CLOSE, closed[1])
+            return
+        digest_ok = session.bytes_received == pkt.length and session.digest.digest() == pkt.digest
+        status = STATUS_OK if digest_ok else STATUS_MISMATCH
+        elapsed = time.monotonic() - session.started
+        self._close_session(addr)
+        # Keep reporting the finished transfer (expected_seq, overflows)
+        self.last_session = session
+        throughput = session.bytes_received / elapsed if elapsed > 0 else 0.0
+        self.completed.append({'addr': addr, 'name': session.name, 'path': session.path,
+                               'bytes': session.bytes_received, 'elapsed': elapsed,
+                               'throughput': throughput, 'digest_ok': digest_ok})
+        check = "digest ok" if digest_ok else f"MISMATCH (sender sent {pkt.length} bytes)"
+        print(f"Transfer {session.name} complete: {session.bytes_received} bytes in {elapsed:.3f}s "
+              f"({throughput / 1e6:.2f} MB/s), {check}")
+        self.closed[addr] = (pkt.transfer_id, status)
+        if len(self.closed) > MAX_CLOSED:
+            self.closed.popitem(last=False)
+        self._reply(pkt, addr, PACKET_TYPE_CLOSE, status)
+    
+    def _reply(self, pkt, addr, answered, status):
+        self._send_packet(ControlReply(pkt.transfer_id, answered, status).serialize(), addr)
+    
+    def _get_session(self, addr, name=None):
+        """Look up or create the session for addr; None if at the session limit."""
+        session = self.sessions.get(addr)
+        if session is None:
+            self._evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            session = Session(addr, self._session_path(addr, name), **self.write_options)
+            self.sessions[addr] = session
+            print(f"New session from {addr[0]}:{addr[1]} -> {session.path}")
+        self.last_session = session
+        self.dirty.add(session)
+        return session
+    
+    def _session_path(self, addr, name=None):
+        if self._templated():
+            name = os.path.basename(name or '') or 'unnamed'
+            return self.output_file.format(host=addr[0], port=addr[1], name=name)
+        if all(s.path != self.output_file for s in self.sessions.values()):
+            return self.output_file
+        return f"{self.output_file}.{addr[0]}_{addr[1]}"
+    
+    def _evict_idle(self):
+        """Close sessions idle for longer than idle_timeout (checked at most once a second)."""
+        now = time.monotonic()
+        if now - self.last_eviction < 1.0 and len(self.sessions) < self.max_sessions:
+            return
+        self.last_eviction = now
+        for addr, session in list(self.sessions.items()):
+            if now - session.last_active > self.idle_timeout:
+                self._close_session(addr)
+    
+    def _flush_writes(self, idle=0.0):
+        """Write out what sessions without packets for `idle` seconds have buffered."""
+        now = time.monotonic()
+        for session in list(self.dirty):
+            if now - session.last_active >= idle:
+                session.writer.flush()
+                self.dirty.discard(session)
     
-    def _send_ack(self, ack_seq, addr):
+    def _close_session(self, addr):
+        session = self.sessions.pop(addr)
+        self.dirty.discard(session)
+        session.close()
+        if self.last_session is session:
+            self.last_session = None
+        overflow = f", {session.overflows} segments refused by a full writer" if session.overflows else ""
+        print(f"Session {addr[0]}:{addr[1]} closed: {session.bytes_received} bytes{overflow}")
+    
+    def _rwnd(self, session):
+        """Receive window to advertise to session, or None when not advertising."""
+        if not self.advertise_window or not session.window_acks:
+            return None
+        return session.window(self.reassembly_limit)
+    
+    def _send_ack(self, session, ack_seq, selective=False):
         """Send ACK packet."""
-        ack = AckPacket(ack_seq)
-        self.sock.sendto(ack.serialize(), addr)
+        self._send_packet(AckPacket(ack_seq, selective, self._rwnd(session)).serialize(), session.addr)
+    
+    def _send_packet(self, raw, addr):
+        if self.outbox is not None:
+            self.outbox.append((raw, addr))
+        else:
+            self.sock.sendto(raw, addr)
+    
+    def _flush(self):
+        """Send queued ACKs, one batch per run of packets to the same client."""
+        outbox, self.outbox = self.outbox, None
+        for addr, group in itertools.groupby(outbox, key=lambda item: item[1]):
+            # A full send buffer drops ACKs, which the sender recovers from like any loss
+            self.io.send([raw for raw, _ in group], addr)
+    
+    def _close_sessions(self):
+        self.dirty.clear()
+        for session in self.sessions.values():
+            session.close()
     
     def stop(self):
         """Cleanup."""
         self.running = False
-        if self.file:
-            self.file.close()
+        if self.admin is not None:
+            self.admin.stop()
+        self._close_sessions()
         if self.sock:
             self.sock.close()
 
 
 def main():
-    if len(sys.argv) != 4:
-        print("Usage: python server.py <port> <output_file> <loss_probability>")
-        sys.exit(1)
-    
-    port = int(sys.argv[1])
-    output_file = sys.argv[2]
-    loss_prob = float(sys.argv[3])
+    parser = argparse.ArgumentParser(description='Simple-FTP Go-Back-N receiver')
+    parser.add_argument('port', type=int)
+    parser.add_argument('output_file', help='Output path; may contain {host}, {port} and {name} per session')
+    parser.add_argument('loss_probability', type=float)
+    parser.add_argument('--max-sessions', type=int, default=DEFAULT_MAX_SESSIONS,
+                        help=f'Concurrent session limit (default: {DEFAULT_MAX_SESSIONS})')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help=f'Seconds before an idle session is closed (default: {DEFAULT_IDLE_TIMEOUT})')
+    parser.add_argument('--reassembly-limit', type=int, default=DEFAULT_REASSEMBLY_LIMIT,
+                        help=f'Selective Repeat out-of-order buffer in segments '
+                             f'(default: {DEFAULT_REASSEMBLY_LIMIT})')
+    parser.add_argument('--write-chunk', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Bytes coalesced per disk write (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default='none',
+                        help='fsync policy: none, end of transfer, or periodic (default: none)')
+    parser.add_argument('--write-thread', action=argparse.BooleanOptionalAction, default=True,
+                        help='Write output on a background thread per session (default: on)')
+    parser.add_argument('--advertise-window', action=argparse.BooleanOptionalAction, default=True,
+                        help='Send the receive window in the ACKs of senders that announce '
+                             'support for it in their OPEN (default: on)')
+    parser.add_argument('--admin-port', type=int,
+                        help='Accept live setting changes (loss probability, output path, ...) on this '
+                             'UDP port; see src/admin.py')
+    parser.add_argument('--admin-host', default=DEFAULT_ADMIN_HOST,
+                        help=f'Address the admin port binds to; anyone who can reach it can change '
+                             f'the server (default: {DEFAULT_ADMIN_HOST})')
+    parser.add_argument('--write-queue', type=int, default=DEFAULT_MAX_QUEUED,
+                        help=f'Chunks queued per writer thread before segments are refused '
+                             f'(default: {DEFAULT_MAX_QUEUED})')
+    args = parser.parse_args()
     
-    if not (0 < loss_prob < 1):
+    if not (0 < args.loss_probability < 1):
         print("Error: loss probability must be in (0, 1)")
         sys.exit(1)
     
-    server = SimpleFTPServer(port, output_file, loss_prob)
+    server = SimpleFTPServer(args.port, args.output_file, args.loss_probability,
+                             max_sessions=args.max_sessions, idle_timeout=args.idle_timeout,
+                             reassembly_limit=args.reassembly_limit, write_chunk=args.write_chunk,
+                             fsync=args.fsync, write_thread=args.write_thread,
+                             write_queue=args.write_queue, advertise_window=args.advertise_window,
+                             admin_port=args.admin_port, admin_host=args.admin_host)
     server.start()
     server.run()
 
@@ -0,0 +1,260 @@
+import os
+import queue
+import threading
+import time
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+# Buffered data is written once it has waited this long, even mid-chunk
+DEFAULT_MAX_DELAY = 0.5
+DEFAULT_FSYNC_INTERVAL = 1.0
+# Chunks a writer thread may have queued before write() would block
+DEFAULT_MAX_QUEUED = 16
+FSYNC_POLICIES = ('none', 'end', 'periodic')
+
+HAVE_PWRITEV = hasattr(os, 'pwritev')
+# Most buffers handed to one pwritev(); well below any IOV_MAX
+MAX_IOV = 64
+
+
+class WriteBehind:
+    """Coalescing output file writer for one transfer.
+    
+    write() copies in-order payloads into a chunk_size buffer, and each
+    full chunk goes to disk in one write at a chunk-aligned offset, so
+    a transfer of 500-byte segments costs one system call per chunk
+    rather than one per segment. flush() writes a partial chunk without
+    giving up its alignment: the bytes stay buffered and are written
+    again with the rest of the chunk. Data is also flushed once it has
+    waited max_delay seconds.
+    
+    With threaded=True chunks are handed to a background thread, which
+    writes every contiguous chunk queued with a single pwritev(), so a
+    slow disk never stalls the caller. At most max_queued chunks wait
+    for it; callers that must not block check `room` before writing.
+    fsync policy: 'none' leaves durability to the OS, 'end' syncs on
+    close(), 'periodic' also syncs at most every fsync_interval seconds.
+    """
+    
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, fsync='none', threaded=False,
+                 max_queued=DEFAULT_MAX_QUEUED, max_delay=DEFAULT_MAX_DELAY,
+                 fsync_interval=DEFAULT_FSYNC_INTERVAL):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.fsync = fsync
+        self.max_delay = max_delay
+        self.fsync_interval = fsync_interval
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        # Start of the chunk being filled, bytes in it, and how many are already on disk
+        self.offset = 0
+        self.fill = 0
+        self.flushed = 0
+        self.chunk = bytearray(chunk_size)
+        self.pending_since = None
+        self.last_fsync = time.monotonic()
+        self.bytes_written = 0
+        self.preallocated = 0
+        self.syscalls = 0
+        self.error = None
+        # stop() may close sessions from another thread while the server loop does too
+        self.close_lock = threading.Lock()
+        self.queue = None
+        self.thread = None
+        if threaded:
+            self.spare = []
+            self.queue = queue.Queue(max_queued)
+            self.thread = threading.Thread(target=self._drain, daemon=True)
+            self.thread.start()
+    
+    @property
+    def room(self):
+        """Bytes write() can take without blocking on the writer thread."""
+        if self.queue is None:
+            return float('inf')
+        # Completing a chunk submits it, which needs a free queue slot
+        free = self.queue.maxsize - self.queue.qsize()
+        return free * self.chunk_size + self.chunk_size - self.fill - 1
+    
+    @property
+    def queued(self):
+        """Chunks waiting for the writer thread."""
+        return 0 if self.queue is None else self.queue.qsize()
+    
+    def write(self, data):
+        """Buffer data (bytes or a memoryview, copied here) after everything written so far."""
+        size = len(data)
+        if self.fill + size <= self.chunk_size:
+            self.chunk[self.fill:self.fill + size] = data
+            self.fill += size
+        else:
+            view = memoryview(data)
+            pos = 0
+            while pos < size:
+                take = min(size - pos, self.chunk_size - self.fill)
+                self.chunk[self.fill:self.fill + take] = view[pos:pos + take]
+                self.fill += take
+                pos += take
+                if self.fill == self.chunk_size:
+                    self._submit_chunk()
+        if self.fill == self.chunk_size:
+            self._submit_chunk()
+        elif self.fill > self.flushed:
+            now = time.monotonic()
+            if self.pending_since is None:
+                self.pending_since = now
+            elif now - self.pending_since >= self.max_delay:
+                self.flush()
+    
+    def _submit_chunk(self):
+        """Write out the full chunk and start the next one."""
+        if self.queue is None:
+            self._write([self.chunk], self.offset)
+        else:
+            self._check()
+            self.queue.put((self.chunk, self.offset))
+            self.chunk = self.spare.pop() if self.spare else bytearray(self.chunk_size)
+        self.offset += self.chunk_size
+        self.fill = 0
+        self.flushed = 0
+        self.pending_since = None
+    
+    def flush(self, block=False):
+        """Write buffered data that is not on disk yet (or queue it, when threaded).
+        
+        A full writer queue skips the flush unless block is set; the data
+        stays buffered and goes out with its chunk.
+        """
+        if self.fill > self.flushed:
+            if self.queue is None:
+                self._write([memoryview(self.chunk)[:self.fill]], self.offset)
+            else:
+                # The chunk keeps filling; the thread gets a snapshot
+                self._check()
+                try:
+                    self.queue.put((bytes(self.chunk[:self.fill]), self.offset), block)
+                except queue.Full:
+                    return
+            self.flushed = self.fill
+        self.pending_since = None
+    
+    def preallocate(self, size):
+        """Reserve size bytes on disk up front, where posix_fallocate is available.
+        
+        close() trims the file back to the bytes actually written.
+        """
+        if not hasattr(os, 'posix_fallocate') or size <= 0:
+            return False
+        try:
+            os.posix_fallocate(self.fd, 0, size)
+        except OSError:
+            # Not supported by every filesystem; the file just grows as written
+            return False
+        self.preallocated = max(self.preallocated, size)
+        return True
+    
+    def truncate(self):
+        """Discard everything written so far and start again at offset 0."""
+        self._wait()
+        os.ftruncate(self.fd, 0)
+        self.offset = 0
+        self.fill = 0
+        self.flushed = 0
+        self.pending_since = None
+        self.bytes_written = 0
+        self.preallocated = 0
+    
+    def close(self):
+        """Flush, stop the writer thread and apply the fsync policy."""
+        with self.close_lock:
+            if self.fd is None:
+                return
+            try:
+                self.flush(block=True)
+                if self.thread is not None:
+                    self.queue.put(None)
+                    self.thread.join()
+                    self.thread = None
+                    self._check()
+                if self.preallocated > self.bytes_written:
+                    os.ftruncate(self.fd, self.bytes_written)
+                if self.fsync != 'none':
+                    os.fsync(self.fd)
+            finally:
+                os.close(self.fd)
+                self.fd = None
+    
+    def _wait(self):
+        """Block until the writer thread has written everything queued."""
+        if self.queue is not None:
+            self.queue.join()
+            self._check()
+    
+    def _check(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+    
+    def _drain(self):
+        """Writer thread: write queued chunks, merging contiguous ones into one pwritev()."""
+        while True:
+            item = self.queue.get()
+            items = [item]
+            while item is not None and len(items) < MAX_IOV:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+            stop = items[-1] is None
+            if stop:
+                items.pop()
+            try:
+                self._write_runs(items)
+            except OSError as e:
+                self.error = e
+            for _ in range(len(items) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+    
+    def _write_runs(self, items):
+        run, start = [], None
+        for buf, offset in items:
+            if run and offset != start + sum(len(b) for b in run):
+                self._write(run, start)
+                run = []
+            if not run:
+                start = offset
+            run.append(buf)
+        if run:
+            self._write(run, start)
+        for buf, _ in items:
+            if len(buf) == self.chunk_size and isinstance(buf, bytearray):
+                self.spare.append(buf)
+    
+    def _write(self, buffers, offset):
+        """Write buffers back to back at offset, retrying short writes."""
+        end = offset + sum(len(b) for b in buffers)
+        buffers = list(buffers)
+        while buffers:
+            self.syscalls += 1
+            if HAVE_PWRITEV:
+                written = os.pwritev(self.fd, buffers, offset)
+            else:
+                os.lseek(self.fd, offset, os.SEEK_SET)
+                written = os.write(self.fd, buffers[0])
+            offset += written
+            while buffers and written >= len(buffers[0]):
+                written -= len(buffers[0])
+                buffers.pop(0)
+            if written:
+                buffers[0] = memoryview(buffers[0])[written:]
+        self.bytes_written = max(self.bytes_written, end)
+        if self.fsync == 'periodic':
+            now = time.monotonic()
+            if now - self.last_fsync >= self.fsync_interval:
+                self.last_fsync = now
+                os.fsync(self.fd)
@@ -3,10 +3,13 @@
 Task 1: Effect of Window Size N on Transfer Delay
 
 Automatically runs client with varying window sizes and measures transfer time.
-Server must be running separately before executing this script.
+Transfers run in-process; without --host the server runs in-process too,
+on loopback, so no separate server is needed.
+Every run is also appended to task1_results.jsonl (--records) as a record
+the plot scripts read.
 
 Usage:
-    python3 task_1.py --host <server-hostname> --file <input-file> --output <output-file>
+    python3 task_1.py [--host <server-hostname>] --file <input-file> --output <output-file>
 
 Example:
     python3 task_1.py --host eos.cs.university.edu --file testfile.bin --output results.txt
@@ -14,57 +17,55 @@ Example:
 
 import os
 import sys
-import subprocess
-import time
 import argparse
-from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
 
-def run_client(host, port, input_file, window_size, mss):
+from harness import run_transfer, SWEEPS
+from results import record, append
+
+
+def run_client(host, port, input_file, window_size, mss, dupack_threshold=3, rto_trace=None,
+               congestion='none', cwnd_trace=None, loss=0.05):
     """
-    Run client and measure transfer time.
+    Run one transfer in-process and measure it.
+    
+    With host None the server runs in this process on loopback, dropping
+    packets with probability loss.
     
     Returns:
-        elapsed_time: Time in seconds for transfer (from 'time' command)
+        result: run_transfer() result dict; result['ok'] is False if it failed
     """
-    cmd = [
-        'python3',
-        'src/client.py',
-        host,
-        str(port),
-        input_file,
-        str(window_size),
-        str(mss)
-    ]
-    
-    start = time.time()
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=300)
-        elapsed = time.time() - start
-        
-        if result.returncode != 0:
-            print(f"  ERROR: Client failed with return code {result.returncode}")
-            return None
-        
-        return elapsed
-    except subprocess.TimeoutExpired:
-        print(f"  ERROR: Transfer timed out after 300 seconds")
-        return None
-    except Exception as e:
-        print(f"  ERROR: {e}")
-        return None
+    result = run_transfer(input_file, window_size, mss, loss, host, port, rto_trace=rto_trace,
+                          cwnd_trace=cwnd_trace, dupack_threshold=dupack_threshold,
+                          congestion=congestion)
+    if not result['ok']:
+        print(f"  ERROR: {result['error']}")
+    return result
 
 
 def main():
     parser = argparse.ArgumentParser(
         description='Task 1: Measure effect of window size N on transfer delay'
     )
-    parser.add_argument('--host', required=True, help='Server hostname or IP address')
+    parser.add_argument('--host',
+                       help='Server hostname or IP address (default: run the server in-process '
+                            'on loopback)')
     parser.add_argument('--file', required=True, help='Input file to transfer')
     parser.add_argument('--port', type=int, default=7735, help='Server port (default: 7735)')
     parser.add_argument('--mss', type=int, default=500, help='MSS in bytes (default: 500)')
     parser.add_argument('--output', default='task1_results.txt', 
                        help='Output file for results (default: task1_results.txt)')
+    parser.add_argument('--records', default='task1_results.jsonl',
+                       help='JSON Lines file every run is appended to, read by plot/ '
+                            '(default: task1_results.jsonl)')
+    parser.add_argument('--dupack-threshold', type=int, default=3,
+                       help='Duplicate ACKs that trigger fast retransmit, 0 disables (default: 3)')
+    parser.add_argument('--cc', choices=['none', 'reno', 'cubic'], default='none',
+                       help='Client congestion control, N becomes the cwnd ceiling (default: none)')
+    parser.add_argument('--trace-dir',
+                       help='Directory for per-run RTO and cwnd trace CSVs '
+                            '(plot with plot/plot_rto.py and plot/plot_cwnd.py)')
     parser.add_argument('--runs', type=int, default=5, 
                        help='Number of runs per N (default: 5)')
     
@@ -75,13 +76,10 @@ def main():
         print(f"ERROR: Input file not found: {args.file}")
         sys.exit(1)
     
-    # Check if src/client.py exists
-    if not os.path.exists('src/client.py'):
-        print("ERROR: src/client.py not found. Run this script from project root directory.")
-        sys.exit(1)
-    
     # Window sizes to test
-    window_sizes = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    window_sizes = SWEEPS['task1'][1]
+    
+    server = f"{args.host}:{args.port}" if args.host else "in-process (loopback)"
     
     # Get file size
     file_size_mb = os.path.getsize(args.file) / (1024 * 1024)
@@ -89,14 +87,19 @@ def main():
     print("="*70)
     print("TASK 1: Effect of Window Size N on Transfer Delay")
     print("="*70)
-    print(f"Server: {args.host}:{args.port}")
+    print(f"Server: {server}")
     print(f"Input file: {args.file} ({file_size_mb:.2f} MB)")
     print(f"MSS: {args.mss} bytes (fixed)")
+    print(f"Dup-ACK threshold: {args.dupack_threshold}")
+    print(f"Congestion control: {args.cc}")
     print(f"Loss probability: 0.05 (fixed, 5%)")
     print(f"Runs per N: {args.runs}")
     print("="*70)
     print()
     
+    if args.trace_dir:
+        os.makedirs(args.trace_dir, exist_ok=True)
+    
     results = {}
     
     # Run tests for each window size
@@ -107,12 +110,22 @@ def main():
         for run in range(1, args.runs + 1):
             print(f"  Run {run}/{args.runs}...", end=' ', flush=True)
             
-            elapsed = run_client(args.host, args.port, args.file, n, args.mss)
+            trace = cwnd_trace = None
+            if args.trace_dir:
+                trace = os.path.join(args.trace_dir, f"task1_N{n}_run{run}.csv")
+                cwnd_trace = os.path.join(args.trace_dir, f"task1_N{n}_run{run}_cwnd.csv")
+            
+            result = run_client(args.host, args.port, args.file, n, args.mss,
+                                args.dupack_threshold, trace, args.cc, cwnd_trace)
             
-            if elapsed is None:
+            params = {'window': n, 'mss': args.mss, 'loss': 0.05, 'congestion': args.cc,
+                      'dupack_threshold': args.dupack_threshold}
+            append(args.records, [record(result, 'task1', params, run, server=args.host)])
+            if not result['ok']:
                 print("FAILED")
                 continue
             
+            elapsed = result['time']
             times.append(elapsed)
             print(f"{elapsed:.3f}s")
         
@@ -138,9 +151,11 @@ def main():
         f.write("Task 1 Results: Effect of Window Size N on Transfer Delay\n")
         f.write("="*70 + "\n\n")
         f.write(f"Test Configuration:\n")
-        f.write(f"  Server: {args.host}:{args.port}\n")
+        f.write(f"  Server: {server}\n")
         f.write(f"  Input File: {args.file} ({file_size_mb:.2f} MB)\n")
         f.write(f"  MSS: {args.mss} bytes\n")
+        f.write(f"  Dup-ACK threshold: {args.dupack_threshold}\n")
+        f.write(f"  Congestion control: {args.cc}\n")
         f.write(f"  Loss Probability: 0.05 (5%)\n")
         f.write(f"  Runs per N: {args.runs}\n\n")
         
@@ -163,7 +178,7 @@ def main():
         avg_times = [results[n]['avg'] for n in window_sizes if n in results]
         f.write("avg_delays = [" + ", ".join(f"{t:.3f}" for t in avg_times) + "]\n")
     
-    print(f"Results saved to {args.output}")
+    print(f"Results saved to {args.output} (per-run records appended to {args.records})")
     
     # Print summary table
     print("\n" + "="*70)
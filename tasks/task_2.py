@@ -4,10 +4,13 @@ Task 2: Effect of MSS on Transfer Delay
 
 Automatically runs client with varying MSS values and measures transfer time.
 Window size N and loss probability are fixed.
-Server must be running separately before executing this script.
+Transfers run in-process; without --host the server runs in-process too,
+on loopback, so no separate server is needed.
+Every run is also appended to task2_results.jsonl (--records) as a record
+the plot scripts read.
 
 Usage:
-    python3 task_2.py --host <server-hostname> --file <input-file> --output <output-file>
+    python3 task_2.py [--host <server-hostname>] --file <input-file> --output <output-file>
 
 Example:
     python3 task_2.py --host 152.7.176.68 --file testfile_1mb.bin --output task2_results.txt
@@ -15,57 +18,45 @@ Example:
 
 import os
 import sys
-import subprocess
-import time
 import argparse
-from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
 
-def run_client(host, port, input_file, window_size, mss):
+from harness import run_transfer, SWEEPS
+from results import record, append
+
+
+def run_client(host, port, input_file, window_size, mss, loss=0.05):
     """
-    Run client and measure transfer time.
+    Run one transfer in-process and measure it.
+    
+    With host None the server runs in this process on loopback, dropping
+    packets with probability loss.
     
     Returns:
-        elapsed_time: Time in seconds for transfer
+        result: run_transfer() result dict; result['ok'] is False if it failed
     """
-    cmd = [
-        'python3',
-        'src/client.py',
-        host,
-        str(port),
-        input_file,
-        str(window_size),
-        str(mss)
-    ]
-    
-    start = time.time()
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=300)
-        elapsed = time.time() - start
-        
-        if result.returncode != 0:
-            print(f"  ERROR: Client failed with return code {result.returncode}")
-            return None
-        
-        return elapsed
-    except subprocess.TimeoutExpired:
-        print(f"  ERROR: Transfer timed out after 300 seconds")
-        return None
-    except Exception as e:
-        print(f"  ERROR: {e}")
-        return None
+    result = run_transfer(input_file, window_size, mss, loss, host, port)
+    if not result['ok']:
+        print(f"  ERROR: {result['error']}")
+    return result
 
 
 def main():
     parser = argparse.ArgumentParser(
         description='Task 2: Measure effect of MSS on transfer delay'
     )
-    parser.add_argument('--host', required=True, help='Server hostname or IP address')
+    parser.add_argument('--host',
+                       help='Server hostname or IP address (default: run the server in-process '
+                            'on loopback)')
     parser.add_argument('--file', required=True, help='Input file to transfer')
     parser.add_argument('--port', type=int, default=7735, help='Server port (default: 7735)')
     parser.add_argument('--window', type=int, default=64, help='Window size N (default: 64)')
     parser.add_argument('--output', default='task2_results.txt', 
                        help='Output file for results (default: task2_results.txt)')
+    parser.add_argument('--records', default='task2_results.jsonl',
+                       help='JSON Lines file every run is appended to, read by plot/ '
+                            '(default: task2_results.jsonl)')
     parser.add_argument('--runs', type=int, default=5, 
                        help='Number of runs per MSS (default: 5)')
     
@@ -76,13 +67,10 @@ def main():
         print(f"ERROR: Input file not found: {args.file}")
         sys.exit(1)
     
-    # Check if src/client.py exists
-    if not os.path.exists('src/client.py'):
-        print("ERROR: src/client.py not found. Run this script from project root directory.")
-        sys.exit(1)
-    
     # MSS values to test
-    mss_values = [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
+    mss_values = SWEEPS['task2'][1]
+    
+    server = f"{args.host}:{args.port}" if args.host else "in-process (loopback)"
     
     # Get file size
     file_size_mb = os.path.getsize(args.file) / (1024 * 1024)
@@ -90,7 +78,7 @@ def main():
     print("="*70)
     print("TASK 2: Effect of MSS on Transfer Delay")
     print("="*70)
-    print(f"Server: {args.host}:{args.port}")
+    print(f"Server: {server}")
     print(f"Input file: {args.file} ({file_size_mb:.2f} MB)")
     print(f"Window size: {args.window} (fixed)")
     print(f"Loss probability: 0.05 (fixed, 5%)")
@@ -108,12 +96,15 @@ def main():
         for run in range(1, args.runs + 1):
             print(f"  Run {run}/{args.runs}...", end=' ', flush=True)
             
-            elapsed = run_client(args.host, args.port, args.file, args.window, mss)
+            result = run_client(args.host, args.port, args.file, args.window, mss)
             
-            if elapsed is None:
+            params = {'window': args.window, 'mss': mss, 'loss': 0.05}
+            append(args.records, [record(result, 'task2', params, run, server=args.host)])
+            if not result['ok']:
                 print("FAILED")
                 continue
             
+            elapsed = result['time']
             times.append(elapsed)
             print(f"{elapsed:.3f}s")
         
@@ -139,7 +130,7 @@ def main():
         f.write("Task 2 Results: Effect of MSS on Transfer Delay\n")
         f.write("="*70 + "\n\n")
         f.write(f"Test Configuration:\n")
-        f.write(f"  Server: {args.host}:{args.port}\n")
+        f.write(f"  Server: {server}\n")
         f.write(f"  Input File: {args.file} ({file_size_mb:.2f} MB)\n")
         f.write(f"  Window Size: {args.window}\n")
         f.write(f"  Loss Probability: 0.05 (5%)\n")
@@ -175,7 +166,7 @@ def main():
         f.write("plt.savefig('task2_plot.png', dpi=150)\n")
         f.write("plt.show()\n")
     
-    print(f"Results saved to {args.output}")
+    print(f"Results saved to {args.output} (per-run records appended to {args.records})")
     
     # Print summary table
     print("\n" + "="*70)
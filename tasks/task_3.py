@@ -3,72 +3,88 @@
 Task 3: Effect of Loss Probability p on Transfer Delay
 
 Automatically runs client with varying loss probabilities and measures transfer time.
-Window size N and MSS are fixed. Server loss probability must be changed between runs.
+Window size N and MSS are fixed. Without --host the server runs in-process on
+loopback and each p is applied directly. With --host and --admin-port the
+remote server's loss probability is changed through its admin channel.
+Every run is also appended to task3_results.jsonl (--records) as a record
+the plot scripts read.
 
 Usage:
-    python3 task_3.py --host <server-hostname> --file <input-file> --output <output-file>
+    python3 task_3.py [--host <server-hostname> [--admin-port <port>]] --file <input-file> --output <output-file>
 
 Example:
     python3 task_3.py --host 152.7.176.68 --file testfile_1mb.bin --output task3_results.txt
 
-Note: This script requires manually restarting the server with different loss probability
-values for each p in the test set (0.01, 0.02, ..., 0.10).
+Note: With --host but no --admin-port this script requires manually restarting the
+remote server with different loss probability values for each p in the test set
+(0.01, 0.02, ..., 0.10).
 """
 
 import os
 import sys
-import subprocess
-import time
 import argparse
-from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-def run_client(host, port, input_file, window_size, mss):
+from harness import run_transfer, SWEEPS
+from results import record, append
+import admin
+
+
+def run_client(host, port, input_file, window_size, mss, dupack_threshold=3, rto_trace=None,
+               congestion='none', cwnd_trace=None, loss=0.05):
     """
-    Run client and measure transfer time.
+    Run one transfer in-process and measure it.
+    
+    With host None the server runs in this process on loopback, dropping
+    packets with probability loss.
     
     Returns:
-        elapsed_time: Time in seconds for transfer
+        result: run_transfer() result dict; result['ok'] is False if it failed
     """
-    cmd = [
-        'python3',
-        'src/client.py',
-        host,
-        str(port),
-        input_file,
-        str(window_size),
-        str(mss)
-    ]
-    
-    start = time.time()
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=300)
-        elapsed = time.time() - start
-        
-        if result.returncode != 0:
-            print(f"  ERROR: Client failed with return code {result.returncode}")
-            return None
-        
-        return elapsed
-    except subprocess.TimeoutExpired:
-        print(f"  ERROR: Transfer timed out after 300 seconds")
-        return None
-    except Exception as e:
-        print(f"  ERROR: {e}")
-        return None
+    result = run_transfer(input_file, window_size, mss, loss, host, port, rto_trace=rto_trace,
+                          cwnd_trace=cwnd_trace, dupack_threshold=dupack_threshold,
+                          congestion=congestion)
+    if not result['ok']:
+        print(f"  ERROR: {result['error']}")
+    return result
+
+
+def set_loss(host, admin_port, p):
+    """Set the remote server's loss probability through its admin channel."""
+    reply = admin.request((host, admin_port), {'loss_prob': p})
+    if not reply['ok']:
+        raise RuntimeError(f"server refused loss_prob={p}: {reply['error']}")
+    return reply['settings']['loss_prob']
 
 
 def main():
     parser = argparse.ArgumentParser(
         description='Task 3: Measure effect of loss probability p on transfer delay'
     )
-    parser.add_argument('--host', required=True, help='Server hostname or IP address')
+    parser.add_argument('--host',
+                       help='Server hostname or IP address (default: run the server in-process '
+                            'on loopback)')
     parser.add_argument('--file', required=True, help='Input file to transfer')
     parser.add_argument('--port', type=int, default=7735, help='Server port (default: 7735)')
+    parser.add_argument('--admin-port', type=int,
+                       help="With --host, the server's --admin-port: each p is set remotely "
+                            "instead of waiting for a restart")
     parser.add_argument('--window', type=int, default=64, help='Window size N (default: 64)')
     parser.add_argument('--mss', type=int, default=500, help='MSS in bytes (default: 500)')
     parser.add_argument('--output', default='task3_results.txt', 
                        help='Output file for results (default: task3_results.txt)')
+    parser.add_argument('--records', default='task3_results.jsonl',
+                       help='JSON Lines file every run is appended to, read by plot/ '
+                            '(default: task3_results.jsonl)')
+    parser.add_argument('--dupack-threshold', type=int, default=3,
+                       help='Duplicate ACKs that trigger fast retransmit, 0 disables (default: 3)')
+    parser.add_argument('--cc', choices=['none', 'reno', 'cubic'], default='none',
+                       help='Client congestion control, N becomes the cwnd ceiling (default: none)')
+    parser.add_argument('--trace-dir',
+                       help='Directory for per-run RTO and cwnd trace CSVs '
+                            '(plot with plot/plot_rto.py and plot/plot_cwnd.py)')
     parser.add_argument('--runs', type=int, default=5, 
                        help='Number of runs per p (default: 5)')
     
@@ -79,13 +95,10 @@ def main():
         print(f"ERROR: Input file not found: {args.file}")
         sys.exit(1)
     
-    # Check if src/client.py exists
-    if not os.path.exists('src/client.py'):
-        print("ERROR: src/client.py not found. Run this script from project root directory.")
-        sys.exit(1)
-    
     # Loss probability values to test
-    loss_probs = [0.01, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08, 0.09, 0.10]
+    loss_probs = SWEEPS['task3'][1]
+    
+    server = f"{args.host}:{args.port}" if args.host else "in-process (loopback)"
     
     # Get file size
     file_size_mb = os.path.getsize(args.file) / (1024 * 1024)
@@ -93,24 +106,37 @@ def main():
     print("="*70)
     print("TASK 3: Effect of Loss Probability p on Transfer Delay")
     print("="*70)
-    print(f"Server: {args.host}:{args.port}")
+    print(f"Server: {server}")
     print(f"Input file: {args.file} ({file_size_mb:.2f} MB)")
     print(f"Window size: {args.window} (fixed)")
     print(f"MSS: {args.mss} bytes (fixed)")
+    print(f"Dup-ACK threshold: {args.dupack_threshold}")
+    print(f"Congestion control: {args.cc}")
     print(f"Runs per p: {args.runs}")
     print("="*70)
     print()
-    print("IMPORTANT: Before running each test, restart the server with the new loss probability:")
-    print("  python3 src/server.py 7735 output.bin <p>")
-    print()
+    if args.host and args.admin_port is None:
+        print("IMPORTANT: Before running each test, restart the server with the new loss probability:")
+        print("  python3 src/server.py 7735 output.bin <p>")
+        print()
+    
+    if args.trace_dir:
+        os.makedirs(args.trace_dir, exist_ok=True)
     
     results = {}
     
     # Run tests for each loss probability value
     for p in loss_probs:
-        # Prompt user to restart server with new loss probability
-        input_msg = f"Press ENTER when server is running with p={p:.2f}: "
-        input(input_msg)
+        if args.host and args.admin_port is not None:
+            try:
+                set_loss(args.host, args.admin_port, p)
+            except (OSError, RuntimeError) as e:
+                print(f"ERROR: could not set p={p:.2f} on the server: {e}")
+                sys.exit(1)
+        elif args.host:
+            # Prompt user to restart server with new loss probability
+            input_msg = f"Press ENTER when server is running with p={p:.2f}: "
+            input(input_msg)
         
         print(f"Loss Probability p = {p:.2f}:")
         times = []
@@ -118,12 +144,22 @@ def main():
         for run in range(1, args.runs + 1):
             print(f"  Run {run}/{args.runs}...", end=' ', flush=True)
             
-            elapsed = run_client(args.host, args.port, args.file, args.window, args.mss)
+            trace = cwnd_trace = None
+            if args.trace_dir:
+                trace = os.path.join(args.trace_dir, f"task3_p{p:.2f}_run{run}.csv")
+                cwnd_trace = os.path.join(args.trace_dir, f"task3_p{p:.2f}_run{run}_cwnd.csv")
+            
+            result = run_client(args.host, args.port, args.file, args.window, args.mss,
+                                args.dupack_threshold, trace, args.cc, cwnd_trace, loss=p)
             
-            if elapsed is None:
+            params = {'window': args.window, 'mss': args.mss, 'loss': p, 'congestion': args.cc,
+                      'dupack_threshold': args.dupack_threshold}
+            append(args.records, [record(result, 'task3', params, run, server=args.host)])
+            if not result['ok']:
                 print("FAILED")
                 continue
             
+            elapsed = result['time']
             times.append(elapsed)
             print(f"{elapsed:.3f}s")
         
@@ -149,10 +185,12 @@ def main():
         f.write("Task 3 Results: Effect of Loss Probability p on Transfer Delay\n")
         f.write("="*70 + "\n\n")
         f.write(f"Test Configuration:\n")
-        f.write(f"  Server: {args.host}:{args.port}\n")
+        f.write(f"  Server: {server}\n")
         f.write(f"  Input File: {args.file} ({file_size_mb:.2f} MB)\n")
         f.write(f"  Window Size: {args.window}\n")
         f.write(f"  MSS: {args.mss} bytes\n")
+        f.write(f"  Dup-ACK threshold: {args.dupack_threshold}\n")
+        f.write(f"  Congestion control: {args.cc}\n")
         f.write(f"  Runs per p: {args.runs}\n\n")
         
         f.write("Results:\n")
@@ -185,7 +223,7 @@ def main():
         f.write("plt.savefig('task3_plot.png', dpi=150)\n")
         f.write("plt.show()\n")
     
-    print(f"Results saved to {args.output}")
+    print(f"Results saved to {args.output} (per-run records appended to {args.records})")
     
     # Print summary table
     print("\n" + "="*70)
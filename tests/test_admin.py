@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import admin
+from server import SimpleFTPServer, SETTINGS
+
+
+@pytest.fixture
+def running_server(tmp_path):
+    """Server with an admin channel on ephemeral ports, its loop on a thread."""
+    server = SimpleFTPServer(0, str(tmp_path / 'out.bin'), 0.05, admin_port=0)
+    server.start()
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join()
+
+
+def test_settings_cover_every_setting(tmp_path):
+    server = SimpleFTPServer(0, str(tmp_path / 'out.bin'), 0.05, write_chunk=4096)
+    settings = server.settings()
+    assert set(settings) == set(SETTINGS)
+    assert settings['loss_prob'] == 0.05
+    assert settings['write_chunk'] == 4096
+
+
+def test_configure_applies_settings(tmp_path):
+    server = SimpleFTPServer(0, str(tmp_path / 'out.bin'), 0.05)
+    server.configure(loss_prob=0, max_sessions=4, fsync='end', write_thread=False)
+    assert server.loss_prob == 0.0 and isinstance(server.loss_prob, float)
+    assert server.max_sessions == 4
+    assert server.write_options['fsync'] == 'end'
+    assert server.write_options['threaded'] is False
+
+
+@pytest.mark.parametrize('changes', [
+    {'loss_prob': 1.5},
+    {'loss_prob': '0.1'},
+    {'max_sessions': 0},
+    {'max_sessions': 2.5},
+    {'write_thread': 1},
+    {'fsync': 'always'},
+    {'no_such_setting': 1},
+])
+def test_configure_rejects_bad_values(tmp_path, changes):
+    server = SimpleFTPServer(0, str(tmp_path / 'out.bin'), 0.05)
+    before = server.settings()
+    with pytest.raises(ValueError):
+        server.configure(reassembly_limit=8, **changes)
+    # Nothing is applied when any change is bad
+    assert server.settings() == before
+
+
+def test_admin_query_and_set(running_server):
+    addr = ('127.0.0.1', running_server.admin.port)
+    reply = admin.request(addr)
+    assert reply['ok']
+    assert reply['settings']['loss_prob'] == 0.05
+    assert reply['status'] == {'sessions': 0, 'completed': 0}
+    
+    reply = admin.request(addr, {'loss_prob': 0.02, 'idle_timeout': 3})
+    assert reply['ok']
+    assert reply['settings']['loss_prob'] == 0.02
+    assert running_server.loss_prob == 0.02
+    assert running_server.idle_timeout == 3.0
+
+
+def test_admin_reports_errors(running_server):
+    addr = ('127.0.0.1', running_server.admin.port)
+    reply = admin.request(addr, {'loss_prob': 2})
+    assert not reply['ok']
+    assert 'loss_prob' in reply['error']
+    assert running_server.loss_prob == 0.05
+    
+    bad = running_server.admin.handle(b'not json')
+    assert not bad['ok']
+    assert not running_server.admin.handle(json.dumps([1]).encode())['ok']
+
+
+def test_admin_new_output_file(running_server, tmp_path):
+    addr = ('127.0.0.1', running_server.admin.port)
+    path = str(tmp_path / 'next.bin')
+    assert admin.request(addr, {'output_file': path})['ok']
+    # A single output path exists as soon as it is set, like at start()
+    assert os.path.exists(path)
+    assert running_server.output_file == path
+
+
+@pytest.mark.parametrize('name', ['missing/dir/out.bin', 'missing/dir/out_{port}.bin'])
+def test_admin_unwritable_output_file(running_server, tmp_path, name):
+    addr = ('127.0.0.1', running_server.admin.port)
+    before = running_server.settings()
+    reply = admin.request(addr, {'output_file': str(tmp_path / name), 'loss_prob': 0.0})
+    assert not reply['ok']
+    assert running_server.settings() == before
+    # The admin thread survived the failed request
+    assert admin.request(addr)['ok']
+
+
+def test_admin_request_times_out():
+    with pytest.raises(TimeoutError):
+        # Nothing answers on the discard port
+        admin.request(('127.0.0.1', 9), timeout=0.05, retries=2)
+
+
+def test_parse_assignment():
+    assert admin.parse_assignment('loss_prob=0.02') == ('loss_prob', 0.02)
+    assert admin.parse_assignment('write_thread=false') == ('write_thread', False)
+    assert admin.parse_assignment('output_file=out_{name}.bin') == ('output_file', 'out_{name}.bin')
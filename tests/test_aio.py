@@ -0,0 +1,180 @@
+import sys
+import os
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import admin
+import server as server_module
+from aio import send_file, start_server
+from packet import DataPacket
+
+
+@pytest.fixture
+def temp_dir():
+    """Temporary directory for input and output files."""
+    with tempfile.TemporaryDirectory() as path:
+        yield path
+
+
+def test_async_transfer(temp_dir):
+    """Async client and server should transfer a file intact."""
+    input_file = os.path.join(temp_dir, 'in.bin')
+    output_file = os.path.join(temp_dir, 'out.bin')
+    test_data = os.urandom(5000)
+    with open(input_file, 'wb') as f:
+        f.write(test_data)
+    
+    async def transfer():
+        server = await start_server(0, output_file, 0.0, host='127.0.0.1')
+        try:
+            return await send_file('127.0.0.1', server.port, input_file, 8, 100)
+        finally:
+            server.stop()
+    
+    stats = asyncio.run(asyncio.wait_for(transfer(), 5))
+    assert stats['payload_bytes'] == len(test_data)
+    with open(output_file, 'rb') as f:
+        assert f.read() == test_data
+
+
+def test_async_stream_input_leaves_loop_free(temp_dir):
+    """A pausing pipe producer should not stall the event loop."""
+    fifo = os.path.join(temp_dir, 'input')
+    output_file = os.path.join(temp_dir, 'out.bin')
+    os.mkfifo(fifo)
+    test_data = os.urandom(2000)
+    
+    def produce():
+        with open(fifo, 'wb', buffering=0) as f:
+            f.write(test_data[:1050])
+            time.sleep(0.5)
+            f.write(test_data[1050:])
+    
+    async def tick(ticks):
+        while True:
+            await asyncio.sleep(0.05)
+            ticks.append(time.monotonic())
+    
+    async def transfer(ticks):
+        server = await start_server(0, output_file, 0.0, host='127.0.0.1')
+        ticker = asyncio.ensure_future(tick(ticks))
+        try:
+            return await send_file('127.0.0.1', server.port, fifo, 8, 100)
+        finally:
+            ticker.cancel()
+            server.stop()
+    
+    threading.Thread(target=produce, daemon=True).start()
+    ticks = []
+    stats = asyncio.run(asyncio.wait_for(transfer(ticks), 5))
+    assert stats['payload_bytes'] == len(test_data)
+    with open(output_file, 'rb') as f:
+        assert f.read() == test_data
+    # Other tasks kept running through the pause
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.3
+
+
+def test_async_server_writes_without_threads(temp_dir, monkeypatch):
+    """Sessions of one async server should not each start a writer thread."""
+    count = 5
+    for i in range(count):
+        with open(os.path.join(temp_dir, f'in{i}.bin'), 'wb') as f:
+            f.write(os.urandom(2000))
+    threaded = []
+    
+    class RecordingWriter(server_module.WriteBehind):
+        def __init__(self, path, **options):
+            threaded.append(options.get('threaded'))
+            super().__init__(path, **options)
+    
+    monkeypatch.setattr(server_module, 'WriteBehind', RecordingWriter)
+    
+    async def transfer():
+        server = await start_server(0, os.path.join(temp_dir, 'out_{port}.bin'), 0.0,
+                                    host='127.0.0.1', write_chunk=4096)
+        assert server.write_options['chunk_size'] == 4096
+        try:
+            await asyncio.gather(*(
+                send_file('127.0.0.1', server.port, os.path.join(temp_dir, f'in{i}.bin'), 4, 100)
+                for i in range(count)))
+        finally:
+            server.stop()
+    
+    asyncio.run(asyncio.wait_for(transfer(), 10))
+    assert threaded == [False] * count
+
+
+def test_async_server_admin_channel(temp_dir):
+    """admin_port should give the asyncio server a working admin channel."""
+    input_file = os.path.join(temp_dir, 'in.bin')
+    output_file = os.path.join(temp_dir, 'out.bin')
+    test_data = os.urandom(3000)
+    with open(input_file, 'wb') as f:
+        f.write(test_data)
+    
+    async def transfer():
+        server = await start_server(0, output_file, 0.5, host='127.0.0.1', admin_port=0)
+        try:
+            addr = ('127.0.0.1', server.admin.port)
+            # admin.request() blocks, so it runs off the loop
+            reply = await asyncio.to_thread(admin.request, addr, {'loss_prob': 0.0})
+            assert reply['ok'] and reply['settings']['loss_prob'] == 0.0
+            assert server.loss_prob == 0.0
+            return await send_file('127.0.0.1', server.port, input_file, 8, 100)
+        finally:
+            server.stop()
+    
+    stats = asyncio.run(asyncio.wait_for(transfer(), 5))
+    assert stats['retransmissions'] == 0
+    with open(output_file, 'rb') as f:
+        assert f.read() == test_data
+
+
+def test_async_server_evicts_idle_sessions(temp_dir):
+    """An abandoned session should be closed on a quiet server, not only on the next datagram."""
+    async def abandon():
+        server = await start_server(0, os.path.join(temp_dir, 'out.bin'), 0.0, host='127.0.0.1',
+                                    idle_timeout=0.2)
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(DataPacket(0, b'abc').serialize(), ('127.0.0.1', server.port))
+                while not server.sessions:
+                    await asyncio.sleep(0.01)
+                # Eviction runs at most once a second
+                await asyncio.sleep(1.8)
+                return len(server.sessions)
+        finally:
+            server.stop()
+    
+    assert asyncio.run(asyncio.wait_for(abandon(), 5)) == 0
+
+
+def test_concurrent_async_transfers(temp_dir):
+    """One event loop should drive several transfers at once."""
+    count = 10
+    payloads = [os.urandom(3000 + i) for i in range(count)]
+    for i, data in enumerate(payloads):
+        with open(os.path.join(temp_dir, f'in{i}.bin'), 'wb') as f:
+            f.write(data)
+    
+    async def transfer():
+        servers = [await start_server(0, os.path.join(temp_dir, f'out{i}.bin'), 0.0,
+                                      host='127.0.0.1') for i in range(count)]
+        try:
+            await asyncio.gather(*(
+                send_file('127.0.0.1', server.port, os.path.join(temp_dir, f'in{i}.bin'), 4, 100)
+                for i, server in enumerate(servers)))
+        finally:
+            for server in servers:
+                server.stop()
+    
+    asyncio.run(asyncio.wait_for(transfer(), 10))
+    for i, data in enumerate(payloads):
+        with open(os.path.join(temp_dir, f'out{i}.bin'), 'rb') as f:
+            assert f.read() == data
@@ -0,0 +1,126 @@
+import sys
+import os
+import socket
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import batchio
+from batchio import DatagramIO, HAVE_MMSG, encode_sockaddr, decode_sockaddr
+
+MODES = [False, True] if HAVE_MMSG else [False]
+
+
+def make_pair(family=socket.AF_INET, host='127.0.0.1'):
+    sender = socket.socket(family, socket.SOCK_DGRAM)
+    receiver = socket.socket(family, socket.SOCK_DGRAM)
+    receiver.bind((host, 0))
+    for sock in (sender, receiver):
+        sock.setblocking(False)
+    return sender, receiver
+
+
+def test_sockaddr_roundtrip():
+    """Encoded socket addresses should decode to what recvfrom() returns."""
+    raw = encode_sockaddr(socket.AF_INET, ('127.0.0.1', 7735))
+    assert len(raw) == 16
+    assert decode_sockaddr(raw) == ('127.0.0.1', 7735)
+    raw = encode_sockaddr(socket.AF_INET6, ('::1', 7735, 0, 0))
+    assert len(raw) == 28
+    assert decode_sockaddr(raw) == ('::1', 7735, 0, 0)
+
+
+@pytest.mark.parametrize('use_mmsg', MODES)
+def test_send_recv_batch(use_mmsg):
+    """A batch should arrive intact, in order and with the sender's address."""
+    sender, receiver = make_pair()
+    out = DatagramIO(sender, batch_size=8, use_mmsg=use_mmsg)
+    inp = DatagramIO(receiver, batch_size=8, use_mmsg=use_mmsg)
+    frames = [bytearray(f'frame{i}'.encode()) for i in range(5)] + [b'bytes too']
+    assert out.send(frames, receiver.getsockname()) == len(frames)
+    batch = inp.recv(timeout=1.0)
+    assert [data for data, _ in batch] == [bytes(frame) for frame in frames]
+    assert all(addr[1] == sender.getsockname()[1] for _, addr in batch)
+    if use_mmsg:
+        assert out.syscalls == 1
+        assert inp.syscalls == 1
+    sender.close()
+    receiver.close()
+
+
+@pytest.mark.parametrize('use_mmsg', MODES)
+def test_recv_limits_and_empty(use_mmsg):
+    """recv() returns at most batch_size datagrams and [] when nothing is queued."""
+    sender, receiver = make_pair()
+    out = DatagramIO(sender, batch_size=4, use_mmsg=use_mmsg)
+    inp = DatagramIO(receiver, batch_size=4, use_mmsg=use_mmsg)
+    assert inp.recv() == []
+    assert out.send([b'x'] * 10, receiver.getsockname()) == 10
+    assert len(inp.recv(timeout=1.0)) == 4
+    assert len(inp.recv()) == 4
+    assert len(inp.recv()) == 2
+    assert inp.recv(timeout=0.01) == []
+    sender.close()
+    receiver.close()
+
+
+@pytest.mark.parametrize('use_mmsg', MODES)
+def test_recv_reuses_pool(use_mmsg):
+    """Received data is a view into the pool, overwritten by the next recv()."""
+    sender, receiver = make_pair()
+    out = DatagramIO(sender, batch_size=2, use_mmsg=use_mmsg)
+    inp = DatagramIO(receiver, batch_size=2, use_mmsg=use_mmsg)
+    out.send([b'first'], receiver.getsockname())
+    (data, _), = inp.recv(timeout=1.0)
+    assert data.obj is inp.recv_buf
+    out.send([b'again'], receiver.getsockname())
+    (again, _), = inp.recv(timeout=1.0)
+    assert data == again == b'again'
+    sender.close()
+    receiver.close()
+
+
+@pytest.mark.parametrize('use_mmsg', MODES)
+def test_ipv6(use_mmsg):
+    if not socket.has_ipv6:
+        pytest.skip("no IPv6")
+    try:
+        sender, receiver = make_pair(socket.AF_INET6, '::1')
+    except OSError:
+        pytest.skip("no IPv6 loopback")
+    out = DatagramIO(sender, use_mmsg=use_mmsg)
+    inp = DatagramIO(receiver, use_mmsg=use_mmsg)
+    assert out.send([b'six'], receiver.getsockname()) == 1
+    (data, addr), = inp.recv(timeout=1.0)
+    assert data == b'six'
+    assert addr[:2] == ('::1', sender.getsockname()[1])
+    sender.close()
+    receiver.close()
+
+
+@pytest.mark.skipif(not HAVE_MMSG, reason='address caches are only kept with sendmmsg/recvmmsg')
+def test_address_caches_stay_bounded(monkeypatch):
+    """A stream of new peers should not grow the address caches past their limit."""
+    monkeypatch.setattr(batchio, 'ADDRESS_CACHE', 4)
+    pairs = [make_pair() for _ in range(6)]
+    out = DatagramIO(pairs[0][0], use_mmsg=True)
+    inp = DatagramIO(pairs[0][1], use_mmsg=True)
+    for sender, receiver in pairs:
+        assert out.send([b'to'], receiver.getsockname()) == 1
+        assert bytes(DatagramIO(receiver, use_mmsg=False).recv(timeout=1.0)[0][0]) == b'to'
+        sender.sendto(b'from', pairs[0][1].getsockname())
+        (data, addr), = inp.recv(timeout=1.0)
+        assert addr[1] == sender.getsockname()[1]
+    assert list(out.names) == [receiver.getsockname() for _, receiver in pairs[2:]]
+    ports = [sender.getsockname()[1] for sender, _ in pairs[2:]]
+    assert [addr[1] for addr in inp.addrs.values()] == ports
+    for sock in sum(pairs, ()):
+        sock.close()
+
+
+def test_closed_socket_raises():
+    """Waiting on a closed socket raises OSError so receive loops can exit."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    io = DatagramIO(sock)
+    sock.close()
+    with pytest.raises(OSError):
+        io.recv(timeout=0.1)
@@ -2,7 +2,10 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from checksum import compute_checksum, verify_checksum
+import pytest
+
+from checksum import (compute_checksum, verify_checksum, reference_checksum,
+                      select_backend, adjust_checksum, InternetChecksum, BACKENDS)
 
 
 def test_empty_data():
@@ -61,3 +64,70 @@ def test_large_data():
     data = b'x' * 10000
     checksum = compute_checksum(data)
     assert verify_checksum(data, checksum)
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('data', [
+    b'',
+    b'\x01',
+    b'\x12\x34',
+    b'\x00' * 7,
+    b'\xff' * 9,
+    b'\xff\xff\x00\x00',
+    b'Hello, World!',
+    bytes(range(256)) * 4 + b'\x7f',
+    os.urandom(65535),
+])
+def test_backends_match_reference(backend, data):
+    """Every backend should be bit-for-bit identical to the reference loop."""
+    assert BACKENDS[backend](data) == reference_checksum(data)
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_backends_accept_memoryview(backend):
+    """Backends should checksum buffer slices without copying them first."""
+    data = os.urandom(1001)
+    view = memoryview(bytearray(data))[1:]
+    assert BACKENDS[backend](view) == reference_checksum(data[1:])
+
+
+def test_select_unknown_backend():
+    """Selecting an unknown backend should raise."""
+    with pytest.raises(ValueError):
+        select_backend('nope')
+
+
+@pytest.mark.parametrize('sizes', [[0], [1], [2, 3], [1, 1, 1], [3, 500, 7, 0, 1], [500] * 8])
+def test_incremental_matches_one_shot(sizes):
+    """Chunked updates at any alignment should equal the one-shot checksum."""
+    data = os.urandom(sum(sizes))
+    csum = InternetChecksum()
+    offset = 0
+    for size in sizes:
+        csum.update(data[offset:offset + size])
+        offset += size
+    assert csum.digest() == compute_checksum(data)
+    assert csum.verify(compute_checksum(data))
+
+
+def test_incremental_combine():
+    """Combining two partial sums should equal checksumming the concatenation."""
+    left, right = os.urandom(333), os.urandom(100)
+    combined = InternetChecksum(left).combine(InternetChecksum(right))
+    assert combined.digest() == compute_checksum(left + right)
+    assert combined.length == 433
+
+
+def test_incremental_all_zero_and_empty():
+    """Zero payloads and empty streams should match compute_checksum edge cases."""
+    assert InternetChecksum().digest() == compute_checksum(b'') == 0
+    assert InternetChecksum(b'\x00' * 5).digest() == compute_checksum(b'\x00' * 5)
+
+
+def test_adjust_checksum():
+    """RFC 1624 adjustment should equal recomputing after a word change."""
+    data = bytearray(os.urandom(64))
+    checksum = compute_checksum(data)
+    old_word = (data[10] << 8) | data[11]
+    data[10:12] = b'\xbe\xef'
+    assert adjust_checksum(checksum, old_word, 0xbeef) == compute_checksum(data)
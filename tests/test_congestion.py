@@ -0,0 +1,77 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from congestion import CongestionControl, Reno, Cubic, create_controller, INITIAL_CWND
+
+
+def test_none_uses_ceiling():
+    """Without congestion control the window is always N."""
+    cc = CongestionControl(64)
+    cc.on_timeout()
+    assert cc.window == 64
+
+
+def test_reno_slow_start_then_aimd():
+    """Slow start doubles per window of ACKs, then grows one segment per RTT."""
+    cc = Reno(1000)
+    assert cc.cwnd == INITIAL_CWND
+    cc.on_ack(2, 0.01)
+    cc.on_ack(4, 0.01)
+    assert cc.cwnd == pytest.approx(8)
+    cc.on_loss()
+    assert cc.cwnd == pytest.approx(4)
+    assert cc.ssthresh == pytest.approx(4)
+    for _ in range(4):
+        cc.on_ack(1, 0.01)
+    assert 4.9 < cc.cwnd < 5.1
+
+
+def test_reno_timeout_collapses():
+    """A timeout drops cwnd to one segment and halves ssthresh."""
+    cc = Reno(1000)
+    cc.on_ack(30, 0.01)
+    cc.on_timeout()
+    assert cc.window == 1
+    assert cc.ssthresh == pytest.approx(16)
+
+
+def test_window_capped_at_ceiling():
+    """cwnd never exceeds the user's N."""
+    cc = Reno(8)
+    cc.on_ack(100, 0.01)
+    assert cc.cwnd == 8
+    assert cc.window == 8
+
+
+def test_cubic_recovers_towards_w_max():
+    """After a loss CUBIC cuts by beta and climbs back faster than Reno."""
+    cubic, reno = Cubic(1000), Reno(1000)
+    for cc in (cubic, reno):
+        cc.on_ack(98, 0.01)
+        cc.on_loss()
+    assert cubic.cwnd == pytest.approx(70)
+    for _ in range(200):
+        cubic.on_ack(1, 0.5)
+        reno.on_ack(1, 0.5)
+    assert cubic.cwnd > reno.cwnd
+    assert cubic.cwnd <= 1000
+
+
+def test_trace_written(tmp_path):
+    """Events should be written as CSV with one ACK sample per RTT."""
+    cc = Reno(100)
+    for _ in range(10):
+        cc.on_ack(1, 60.0)
+    cc.on_loss()
+    path = tmp_path / 'cwnd.csv'
+    cc.write_trace(path)
+    lines = path.read_text().splitlines()
+    assert lines[0] == 'time,event,cwnd,ssthresh'
+    assert [line.split(',')[1] for line in lines[1:]] == ['init', 'ack', 'loss']
+
+
+def test_unknown_controller():
+    with pytest.raises(ValueError):
+        create_controller('vegas', 8)
@@ -0,0 +1,50 @@
+import sys
+import os
+import tempfile
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from harness import run_transfer, cells, SWEEPS
+
+
+@pytest.fixture
+def input_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'input.bin')
+        with open(path, 'wb') as f:
+            f.write(os.urandom(30000))
+        yield path
+
+
+@pytest.mark.parametrize('loss', [0.0, 0.1])
+def test_run_transfer_in_process(input_file, loss):
+    """A loopback transfer should verify its output and report its costs."""
+    result = run_transfer(input_file, 16, 500, loss, initial_rto=0.05)
+    assert result['ok'], result['error']
+    assert result['bytes'] == 30000
+    assert result['time'] > 0 and result['goodput'] > 0
+    assert result['packets_sent'] >= 60
+    if loss:
+        assert result['retransmissions'] > 0
+    assert result['client_cpu'] > 0 and result['server_cpu'] > 0
+
+
+def test_run_transfer_over_emulated_link(input_file):
+    result = run_transfer(input_file, 16, 500, profile='lan', seed=3, initial_rto=0.05)
+    assert result['ok'], result['error']
+    assert (result['profile'], result['data_drops'], result['ack_drops']) == ('lan', 0, 0)
+
+
+def test_run_transfer_reports_failure(input_file):
+    """Nothing listening: the transfer times out instead of hanging."""
+    result = run_transfer(input_file, 4, 500, host='127.0.0.1', port=9, timeout=0.5)
+    assert not result['ok']
+    assert 'timed out' in result['error']
+
+
+def test_cells_cover_the_sweep():
+    grid = cells('task3', 2, window=8, congestion='reno')
+    assert len(grid) == 2 * len(SWEEPS['task3'][1])
+    params, run = grid[1]
+    assert (params['loss'], params['window'], params['mss'], params['congestion'], run) == \
+        (0.01, 8, 500, 'reno', 2)
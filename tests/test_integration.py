@@ -2,6 +2,7 @@ import sys
 import os
 import threading
 import tempfile
+import random
 import time
 import pytest
 
@@ -9,6 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from server import SimpleFTPServer
 from client import SimpleFTPClient
+from packet import STATUS_OK
 
 
 @pytest.fixture
@@ -172,3 +174,467 @@ def test_last_segment_less_than_mss(temp_files, test_port):
     with open(output_file, 'rb') as f:
         received = f.read()
     assert received == test_data
+
+
+def test_bounded_frame_store(temp_files, test_port):
+    """Bounded frame store should transfer the file intact."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(5000)
+    write_test_file(input_file, test_data)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 4, 100, bounded_frames=True)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=5)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert len(client.frames.frames) <= 4
+
+
+@pytest.mark.parametrize('segmentation', ['mmap', 'list', 'stream'])
+def test_segmentation_modes(temp_files, test_port, segmentation):
+    """Every segmentation mode should transfer the file intact."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(3050)
+    write_test_file(input_file, test_data)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 8, 100,
+                             segmentation=segmentation)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=5)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+
+
+def test_stream_input_pauses_without_blocking(tmp_path, test_port):
+    """ACKs should be handled while a streaming producer pauses mid-segment."""
+    output_file = str(tmp_path / 'out.bin')
+    fifo = str(tmp_path / 'input')
+    os.mkfifo(fifo)
+    test_data = os.urandom(2000)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, fifo, 8, 100)
+    paused = {}
+    
+    def produce():
+        with open(fifo, 'wb', buffering=0) as f:
+            # Ten full segments and half of the eleventh, then a pause
+            f.write(test_data[:1050])
+            time.sleep(1.0)
+            paused['base'] = client.base
+            paused['wakeups'] = client.stats['wakeups']
+            f.write(test_data[1050:])
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    # The producer blocks opening the FIFO if the client never does
+    threads = [threading.Thread(target=run_server), threading.Thread(target=produce, daemon=True),
+               threading.Thread(target=run_client)]
+    for thread in threads:
+        thread.start()
+    
+    threads[2].join(timeout=5)
+    server.stop()
+    threads[0].join(timeout=1)
+    threads[1].join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        assert f.read() == test_data
+    # Everything written before the pause was acknowledged during it
+    assert paused['base'] == 10
+    # ...and the loop slept on the pipe rather than polling it
+    assert paused['wakeups'] < 50
+
+
+def test_client_idles_between_acks(temp_files, test_port):
+    """Event loop should record transfer stats and not spin while waiting."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(2000)
+    write_test_file(input_file, test_data)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 4, 100)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=5)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    stats = client.stats
+    assert stats['payload_bytes'] == len(test_data)
+    assert stats['packets_sent'] >= 20
+    # One wakeup per ACK batch at most, never a busy spin
+    assert stats['wakeups'] <= stats['acks_received'] + stats['timeouts'] + 1
+    assert stats['cpu_time'] <= stats['elapsed']
+
+
+def test_fast_retransmit_on_loss(temp_files, test_port):
+    """Duplicate ACKs should trigger fast retransmit well before the timer."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(20000)
+    write_test_file(input_file, test_data)
+    random.seed(7)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.1)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 16, 100, dupack_threshold=3)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=20)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert client.stats['fast_retransmits'] > 0
+    assert client.stats['fast_retransmits'] > client.stats['timeouts']
+
+
+def test_selective_repeat_on_loss(temp_files, test_port):
+    """Selective Repeat should deliver intact data retransmitting only lost segments."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(20000)
+    write_test_file(input_file, test_data)
+    random.seed(7)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.1)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 16, 100, mode='sr')
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=20)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    # Roughly one resend per loss instead of a window per loss
+    assert client.stats['retransmissions'] < 100
+
+
+def test_sack_on_loss(temp_files, test_port):
+    """SACK mode should deliver intact data resending only the holes."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(20000)
+    write_test_file(input_file, test_data)
+    random.seed(7)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.1)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 16, 100, mode='sack')
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=20)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert client.stats['fast_retransmits'] > 0
+    assert client.stats['retransmissions'] < 100
+
+
+@pytest.mark.parametrize('congestion', ['reno', 'cubic'])
+def test_congestion_control_on_loss(temp_files, test_port, congestion):
+    """A congestion-controlled sender should stay below N after losses and deliver intact data."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(50000)
+    write_test_file(input_file, test_data)
+    random.seed(7)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.05)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 64, 100, congestion=congestion)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=30)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    events = [event for _, event, _, _ in client.cc.trace]
+    assert 'loss' in events or 'timeout' in events
+    assert client.stats['payload_bytes'] == len(test_data)
+
+
+def test_paced_transfer_rate(temp_files, test_port):
+    """A paced transfer should take about size / rate and report its target."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(100000)
+    write_test_file(input_file, test_data)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 64, 1000, pacing=400000)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=20)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert client.stats['pacing_target'] == pytest.approx(400000)
+    # Beyond the initial burst every byte waits for tokens earned at the rate,
+    # however slow the machine (unpaced this takes milliseconds on loopback)
+    paced_bytes = client.stats['bytes_sent'] - client.pacer.burst
+    assert client.stats['elapsed'] >= paced_bytes / 400000 > 0.2
+
+
+@pytest.mark.parametrize('mode', ['gbn', 'sack'])
+def test_receive_window_limits_sender(temp_files, test_port, mode):
+    """The sender should adopt the server's advertised window below its own N."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(20000)
+    write_test_file(input_file, test_data)
+    
+    server = SimpleFTPServer(test_port, output_file, 0.0, reassembly_limit=4)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 64, 100, mode=mode)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=10)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert client.rwnd == 4
+    assert client._send_window() == 4
+
+
+class LegacyServer(SimpleFTPServer):
+    """Receiver that only understands plain Go-Back-N data packets."""
+    
+    def _handle_packet(self, raw, addr):
+        if raw[6:8] == b'\x55\x55':
+            super()._handle_packet(raw, addr)
+
+
+def test_sack_falls_back_to_gbn(temp_files, test_port):
+    """A SACK sender should fall back to Go-Back-N when the receiver never answers."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(3000)
+    write_test_file(input_file, test_data)
+    
+    server = LegacyServer(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 8, 100, mode='sack',
+                             initial_rto=0.05)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=20)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    assert client.mode == 'gbn'
+
+
+class NoHandshakeServer(SimpleFTPServer):
+    """Receiver from before the OPEN/CLOSE handshake: control packets are dropped."""
+    
+    def _handle_control(self, raw, addr):
+        pass
+
+
+@pytest.mark.parametrize('server_class', [SimpleFTPServer, NoHandshakeServer])
+def test_handshake(temp_files, test_port, server_class):
+    """The receiver confirms the transfer; without handshake support the data still arrives."""
+    input_file, output_file = temp_files
+    test_data = os.urandom(5000)
+    write_test_file(input_file, test_data)
+    
+    server = server_class(test_port, output_file, 0.0)
+    client = SimpleFTPClient('127.0.0.1', test_port, input_file, 8, 100, initial_rto=0.05)
+    
+    def run_server():
+        server.start()
+        server.run()
+    
+    def run_client():
+        time.sleep(0.2)
+        client.start()
+        client.run()
+    
+    server_thread = threading.Thread(target=run_server)
+    client_thread = threading.Thread(target=run_client)
+    
+    server_thread.start()
+    client_thread.start()
+    
+    client_thread.join(timeout=10)
+    server.stop()
+    server_thread.join(timeout=1)
+    
+    with open(output_file, 'rb') as f:
+        received = f.read()
+    assert received == test_data
+    if server_class is SimpleFTPServer:
+        assert client.transfer_status == STATUS_OK
+        assert server.completed[0]['bytes'] == len(test_data)
+        assert server.completed[0]['digest_ok']
+    else:
+        assert client.transfer_status is None
+        assert not client.handshake
@@ -0,0 +1,108 @@
+import sys
+import os
+import tempfile
+import threading
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from netem import Link, Bernoulli, GilbertElliott, NetemProxy, make_links, PROFILES
+from server import SimpleFTPServer
+from client import SimpleFTPClient
+
+
+def outcomes(link, count=2000, size=100):
+    return [link.transmit(i * 0.001, size) for i in range(count)]
+
+
+def test_same_seed_same_impairments():
+    """Impairments depend only on the seed and the packet's position."""
+    options = {'loss': 0.1, 'jitter': 0.01, 'reorder': 0.05, 'duplicate': 0.05}
+    assert outcomes(Link(seed=3, **options)) == outcomes(Link(seed=3, **options))
+    assert outcomes(Link(seed=3, **options)) != outcomes(Link(seed=4, **options))
+
+
+def test_bernoulli_loss_rate():
+    link = Link(loss=Bernoulli(0.2), seed=1)
+    outcomes(link, 10000)
+    assert 1800 < link.stats['lost'] < 2200
+
+
+def test_gilbert_elliott_losses_come_in_bursts():
+    link = Link(loss=GilbertElliott(0.02, 0.25), seed=1)
+    lost = [not arrivals for arrivals in outcomes(link, 20000)]
+    bursts = sum(1 for i, drop in enumerate(lost) if drop and (i == 0 or not lost[i - 1]))
+    # Mean burst length is 1 / p_bad_good = 4 packets
+    assert 3 < sum(lost) / bursts < 5
+
+
+def test_delay_jitter_reorder_duplicate():
+    link = Link(delay=0.05, jitter=0.01, reorder=0.1, reorder_delay=0.2, duplicate=0.1, seed=2)
+    results = outcomes(link, 1000)
+    arrivals = [times[0] - i * 0.001 for i, times in enumerate(results)]
+    assert all(0.04 <= a <= 0.26 for a in arrivals)
+    assert sum(len(times) == 2 for times in results) == link.stats['duplicated'] > 0
+    assert sum(a > 0.2 for a in arrivals) == link.stats['reordered'] > 0
+
+
+@pytest.mark.parametrize('name', ['wan', 'lossy-wan'])
+def test_jitter_keeps_packets_in_order(name):
+    """Without the reorder draw, a jittered link delivers in sending order."""
+    for link in make_links(name, seed=1):
+        link.reorder = 0.0
+        arrivals = [times[0] for times in outcomes(link, 5000) if times]
+        assert arrivals == sorted(arrivals)
+        assert link.stats['reordered'] == 0
+
+
+def test_rate_limit_and_queue_drops():
+    """Packets leave at the link rate and are dropped once the queue is too long."""
+    link = Link(rate=10000, queue_time=0.5)
+    departures = [link.transmit(0.0, 1000) for _ in range(10)]
+    assert [times[0] for times in departures[:6]] == pytest.approx([0.1 * i for i in range(1, 7)])
+    assert departures[-1] == []
+    assert link.stats['queue_drops'] == 4
+    # An idle link starts sending at once again
+    assert link.transmit(10.0, 1000) == [pytest.approx(10.1)]
+
+
+def test_profiles_build_independent_links():
+    for name in PROFILES:
+        forward, reverse = make_links(name, seed=5)
+        assert forward.rng.random() != reverse.rng.random()
+    first, _ = make_links('lossy-wan')
+    second, _ = make_links('lossy-wan')
+    assert first.loss is not second.loss
+
+
+def test_transfer_through_proxy():
+    """Data and ACKs crossing a lossy, reordering, duplicating path still arrive intact."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        output_file = os.path.join(tmp, 'output.bin')
+        data = os.urandom(50000)
+        with open(input_file, 'wb') as f:
+            f.write(data)
+        server = SimpleFTPServer(0, output_file, 0.0)
+        server.start()
+        forward, reverse = make_links(seed=7, forward={'loss': 0.05, 'delay': 0.002, 'jitter': 0.001,
+                                                       'reorder': 0.05, 'duplicate': 0.05},
+                                      reverse={'loss': 0.05, 'delay': 0.002})
+        proxy = NetemProxy(0, ('127.0.0.1', server.port), forward, reverse)
+        proxy.start()
+        threads = [threading.Thread(target=server.run), threading.Thread(target=proxy.run)]
+        for thread in threads:
+            thread.start()
+        client = SimpleFTPClient('127.0.0.1', proxy.port, input_file, 16, 500, mode='sack',
+                                 initial_rto=0.05)
+        try:
+            client.start()
+            client.run()
+        finally:
+            proxy.stop()
+            server.stop()
+            for thread in threads:
+                thread.join()
+        with open(output_file, 'rb') as f:
+            assert f.read() == data
+        assert forward.stats['lost'] > 0 and reverse.stats['lost'] > 0
+        assert client.stats['retransmissions'] > 0
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pacing import TokenBucket, parse_rate
+
+
+def test_parse_rate():
+    """Rates accept plain numbers and decimal k/M/G suffixes."""
+    assert parse_rate('250000') == 250000
+    assert parse_rate('500k') == 500e3
+    assert parse_rate('10M') == 10e6
+    assert parse_rate('1g') == 1e9
+    with pytest.raises(ValueError):
+        parse_rate('0')
+
+
+def test_bucket_starts_full_then_waits():
+    """A full bucket admits a burst, then the next frame waits size/rate."""
+    bucket = TokenBucket(1e6, 1000)
+    assert bucket.burst == 2000
+    assert bucket.delay(1000) == 0.0
+    bucket.charge(1000)
+    bucket.charge(1000)
+    assert bucket.delay(1000) == pytest.approx(0.001, abs=2e-4)
+
+
+def test_bucket_debt_from_bypassing_sends():
+    """Charging past zero delays later sends until the debt is repaid."""
+    bucket = TokenBucket(1e6, 1000)
+    bucket.charge(5000)
+    assert bucket.delay(1000) == pytest.approx(0.004, abs=2e-4)
+
+
+def test_bucket_refills_to_burst():
+    """Idle time never accrues more than one burst."""
+    bucket = TokenBucket(1e7, 1000)
+    bucket.charge(bucket.burst)
+    time.sleep(0.01)
+    assert bucket.delay(bucket.burst) == 0.0
+    assert bucket.delay(bucket.burst + 1000) > 0
+
+
+def test_target_is_time_weighted():
+    """The reported target averages the rate over time."""
+    bucket = TokenBucket(1e6, 1000)
+    time.sleep(0.02)
+    bucket.set_rate(3e6)
+    time.sleep(0.02)
+    assert 1.5e6 < bucket.target < 2.5e6
@@ -3,7 +3,10 @@ import os
 import struct
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from packet import DataPacket, AckPacket, PACKET_TYPE_DATA, PACKET_TYPE_ACK
+from packet import (DataPacket, AckPacket, SackPacket, OpenPacket, ClosePacket, ControlReply,
+                    PACKET_TYPE_DATA, PACKET_TYPE_ACK, PACKET_TYPE_DATA_SR, PACKET_TYPE_ACK_SR,
+                    PACKET_TYPE_SACK, PACKET_TYPE_ACK_WINDOW, PACKET_TYPE_OPEN, PACKET_TYPE_CLOSE,
+                    MAX_SACK_BLOCKS, UNKNOWN_SIZE, STATUS_MISMATCH)
 
 
 def test_data_packet_serialize_deserialize():
@@ -63,6 +66,16 @@ def test_data_packet_corrupted_checksum():
     assert result is None
 
 
+def test_data_packet_deserialize_view():
+    """A memoryview should parse without copying the payload out of its buffer."""
+    buf = bytearray(DataPacket(7, b'payload').serialize())
+    pkt = DataPacket.deserialize(memoryview(buf))
+    assert pkt.seq_num == 7
+    assert isinstance(pkt.data, memoryview) and pkt.data.obj is buf
+    assert pkt.data == b'payload'
+    assert DataPacket.deserialize(memoryview(buf)[:-1]) is None
+
+
 def test_data_packet_wrong_type():
     """Packet with wrong type should fail deserialization."""
     header = struct.pack('!IHH', 0, 0, PACKET_TYPE_ACK)
@@ -123,3 +136,82 @@ def test_ack_packet_wrong_size():
     """ACK packet with wrong size should fail."""
     result = AckPacket.deserialize(b'short')
     assert result is None
+
+
+def test_selective_packet_types():
+    """Selective Repeat packets should use their own types and round-trip."""
+    data = DataPacket(5, b'sr', mode='sr').serialize()
+    ack = AckPacket(5, selective=True).serialize()
+    assert struct.unpack('!IHH', data[:8])[2] == PACKET_TYPE_DATA_SR
+    assert struct.unpack('!IHH', ack)[2] == PACKET_TYPE_ACK_SR
+    assert DataPacket.deserialize(data).mode == 'sr'
+    assert AckPacket.deserialize(ack).selective
+
+
+def test_sack_packet_roundtrip():
+    """SACK packets should carry the cumulative ACK and ranges, and not parse as plain ACKs."""
+    raw = SackPacket(7, [(9, 12), (15, 16)]).serialize()
+    assert struct.unpack('!IHH', raw[:8])[2] == PACKET_TYPE_SACK
+    sack = SackPacket.deserialize(raw)
+    assert sack.ack_seq == 7
+    assert sack.blocks == [(9, 12), (15, 16)]
+    assert AckPacket.deserialize(raw) is None
+    assert SackPacket.deserialize(AckPacket(7).serialize()) is None
+    assert SackPacket.deserialize(SackPacket(3).serialize()).blocks == []
+
+
+def test_sack_packet_rejects_corruption():
+    """A corrupted or oversized block list should be rejected."""
+    raw = bytearray(SackPacket(7, [(9, 12)]).serialize())
+    raw[-1] ^= 0xff
+    assert SackPacket.deserialize(bytes(raw)) is None
+    assert SackPacket.deserialize(bytes(raw[:-1])) is None
+    blocks = [(i * 2, i * 2 + 1) for i in range(MAX_SACK_BLOCKS + 4)]
+    assert len(SackPacket(0, blocks).blocks) == MAX_SACK_BLOCKS
+
+
+def test_window_ack_roundtrip():
+    """ACKs with a receive window use the window type and keep their kind."""
+    for selective in (False, True):
+        raw = AckPacket(9, selective, rwnd=12).serialize()
+        assert struct.unpack('!IHH', raw[:8])[2] == PACKET_TYPE_ACK_WINDOW
+        ack = AckPacket.deserialize(raw)
+        assert (ack.ack_seq, ack.selective, ack.rwnd) == (9, selective, 12)
+        assert SackPacket.deserialize(raw) is None
+    raw = SackPacket(4, [(6, 8)], rwnd=0).serialize()
+    sack = SackPacket.deserialize(raw)
+    assert (sack.ack_seq, sack.blocks, sack.rwnd) == (4, [(6, 8)], 0)
+    assert AckPacket.deserialize(raw) is None
+    assert AckPacket.deserialize(AckPacket(3).serialize()).rwnd is None
+
+
+def test_window_ack_rejects_corruption():
+    """A corrupted window must not be trusted."""
+    raw = bytearray(AckPacket(9, rwnd=12).serialize())
+    raw[11] ^= 0x01
+    assert AckPacket.deserialize(bytes(raw)) is None
+    assert AckPacket.deserialize(bytes(raw[:-1])) is None
+
+
+def test_control_packets_roundtrip():
+    """OPEN, CLOSE and their replies keep every field and carry the transfer id."""
+    opened = OpenPacket.deserialize(OpenPacket(77, 'report.pdf', UNKNOWN_SIZE, 500, 64, 'sack').serialize())
+    assert (opened.transfer_id, opened.name, opened.size, opened.mss, opened.window, opened.mode) == \
+        (77, 'report.pdf', UNKNOWN_SIZE, 500, 64, 'sack')
+    closed = ClosePacket.deserialize(ClosePacket(77, 12345, bytes(range(32))).serialize())
+    assert (closed.transfer_id, closed.length, closed.digest) == (77, 12345, bytes(range(32)))
+    reply = ControlReply.deserialize(ControlReply(77, PACKET_TYPE_CLOSE, STATUS_MISMATCH).serialize())
+    assert (reply.transfer_id, reply.answered, reply.status) == (77, PACKET_TYPE_CLOSE, STATUS_MISMATCH)
+    # Control packets are never taken for data or ACKs, nor for each other
+    raw = OpenPacket(1, 'a', 1, 500, 1).serialize()
+    assert DataPacket.deserialize(raw) is None
+    assert ClosePacket.deserialize(raw) is None
+    assert AckPacket.deserialize(ControlReply(1, PACKET_TYPE_OPEN).serialize()) is None
+
+
+def test_control_packets_reject_corruption():
+    raw = bytearray(OpenPacket(5, 'file.bin', 100, 500, 8).serialize())
+    raw[-1] ^= 0x01
+    assert OpenPacket.deserialize(bytes(raw)) is None
+    raw = ClosePacket(5, 100, bytes(32)).serialize()
+    assert ClosePacket.deserialize(raw[:-1]) is None
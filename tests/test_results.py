@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from results import (record, append, load, times_by, averages, by_revision, revision_label,
+                     find_results, run_info)
+
+LEGACY = """Task 3 Results: Effect of Loss Probability p on Transfer Delay
+======================================================================
+
+Results:
+----------------------------------------------------------------------
+p\tAvg (s)\t\tMin (s)\t\tMax (s)\t\tAll Times
+----------------------------------------------------------------------
+0.01\t2.000\t\t1.000\t\t3.000\t\t1.000, 3.000
+0.02\t4.000\t\t4.000\t\t4.000\t\t4.000
+0.03\tFAILED
+
+======================================================================
+loss_probs = [0.01, 0.02]
+"""
+
+
+def result(time, ok=True):
+    return {'ok': ok, 'error': None if ok else 'timed out', 'time': time, 'retransmissions': 3}
+
+
+def test_record_carries_parameters_and_environment():
+    rec = record(result(1.5), 'task1', {'window': 8, 'mss': 500}, 2, server=None)
+    assert (rec['sweep'], rec['params'], rec['run'], rec['time']) == ('task1', {'window': 8, 'mss': 500}, 2, 1.5)
+    env = rec['env']
+    assert env is run_info()
+    assert set(env) >= {'host', 'platform', 'python', 'cpus', 'revision', 'dirty'}
+    # None outside a git checkout
+    assert env['revision'] is None or len(env['revision']) == 40
+    json.dumps(rec)
+
+
+def test_append_and_load(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    append(path, [record(result(1.0), 'task1', {'window': 1}, 1),
+                  record(result(9.0, ok=False), 'task1', {'window': 1}, 2)])
+    # A record cut short by a killed writer, then more records after it
+    with open(path, 'a') as f:
+        f.write('{"sweep": "task1", "par')
+    append(path, [record(result(2.0), 'task1', {'window': 1}, 2),
+                  record(result(0.5), 'task2', {'mss': 100}, 1)])
+    
+    assert [rec['time'] for rec in load(path)] == [1.0, 2.0, 0.5]
+    assert [rec['time'] for rec in load(path, 'task1')] == [1.0, 2.0]
+    assert [rec['ok'] for rec in load(path, 'task1', failed=True)] == [True, False, True]
+
+
+def test_load_legacy_table(tmp_path):
+    path = str(tmp_path / 'task3_results.txt')
+    with open(path, 'w') as f:
+        f.write(LEGACY)
+    records = load(path, 'task3')
+    assert [(rec['params'], rec['run'], rec['time']) for rec in records] == [
+        ({'loss': 0.01}, 1, 1.0), ({'loss': 0.01}, 2, 3.0), ({'loss': 0.02}, 1, 4.0)]
+    assert times_by(records, 'loss') == {0.01: [1.0, 3.0], 0.02: [4.0]}
+    assert averages(records, 'loss') == ([0.01, 0.02], [2.0, 4.0])
+    assert list(by_revision(records)) == ['legacy']
+
+
+def test_by_revision_keeps_file_order():
+    records = [
+        dict(result(1.0), params={'window': 2}, env={'revision': 'b' * 40, 'dirty': False}),
+        dict(result(3.0), params={'window': 1}, env={'revision': 'a' * 40, 'dirty': True}),
+        dict(result(5.0), params={'window': 2}, env={'revision': 'b' * 40, 'dirty': False}),
+    ]
+    groups = by_revision(records)
+    assert list(groups) == ['bbbbbbbb', 'aaaaaaaa+']
+    assert averages(groups['bbbbbbbb'], 'window') == ([2], [3.0])
+    assert revision_label(dict(result(1.0), env={'revision': None})) == 'unknown'
+
+
+def test_find_results_prefers_json_lines(tmp_path, monkeypatch):
+    work = tmp_path / 'plot'
+    work.mkdir()
+    monkeypatch.chdir(work)
+    assert find_results('task1') is None
+    (tmp_path / 'task1_results.txt').write_text(LEGACY)
+    assert find_results('task1') == os.path.join('..', 'task1_results.txt')
+    (work / 'task1_results.jsonl').write_text('')
+    assert find_results('task1') == os.path.join('.', 'task1_results.jsonl')
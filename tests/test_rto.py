@@ -0,0 +1,92 @@
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rto import RtoEstimator
+
+
+def test_first_sample_initializes_estimate():
+    """First sample sets SRTT = R and RTTVAR = R/2."""
+    est = RtoEstimator(initial=1.0, min_rto=0.001, max_rto=60.0)
+    est.sample(0.1)
+    assert est.srtt == pytest.approx(0.1)
+    assert est.rttvar == pytest.approx(0.05)
+    assert est.rto == pytest.approx(0.1 + 4 * 0.05)
+
+
+def test_subsequent_samples_smooth():
+    """Later samples follow the Jacobson/Karels update."""
+    est = RtoEstimator(initial=1.0, min_rto=0.001, max_rto=60.0)
+    est.sample(0.1)
+    est.sample(0.2)
+    assert est.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert est.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+
+
+def test_backoff_doubles_and_clamps():
+    """Timeouts should double the RTO up to max_rto."""
+    est = RtoEstimator(initial=0.5, min_rto=0.01, max_rto=1.5)
+    est.backoff()
+    assert est.rto == pytest.approx(1.0)
+    est.backoff()
+    assert est.rto == pytest.approx(1.5)
+
+
+def test_progress_resets_backoff():
+    """ACKed new data should collapse backoff to the estimated RTO."""
+    est = RtoEstimator(initial=1.0, min_rto=0.001, max_rto=60.0)
+    est.sample(0.1)
+    estimated = est.rto
+    est.backoff()
+    est.backoff()
+    assert est.rto == pytest.approx(4 * estimated)
+    est.progress()
+    assert est.rto == pytest.approx(estimated)
+    assert est.srtt == pytest.approx(0.1)
+
+
+def test_min_clamp():
+    """Tiny RTTs should not push the RTO below min_rto."""
+    est = RtoEstimator(min_rto=0.2)
+    est.sample(0.0001)
+    assert est.rto == pytest.approx(0.2)
+
+
+def test_fixed_rto():
+    """Non-adaptive mode should keep the initial timeout."""
+    est = RtoEstimator(initial=0.5, adaptive=False)
+    est.sample(0.01)
+    est.backoff()
+    assert est.rto == 0.5
+
+
+def test_trace_written(tmp_path):
+    """Trace should record every change and be written as CSV."""
+    est = RtoEstimator(trace=True)
+    est.sample(0.05)
+    est.backoff()
+    assert [event for _, event, _, _, _ in est.trace] == ['init', 'sample', 'backoff']
+    path = tmp_path / 'trace.csv'
+    est.write_trace(str(path))
+    lines = path.read_text().splitlines()
+    assert lines[0] == 'time,event,srtt,rttvar,rto'
+    assert len(lines) == 4
+
+
+def test_trace_off_by_default(tmp_path):
+    """Without trace=True nothing is kept per ACK, so memory does not grow with the transfer."""
+    est = RtoEstimator()
+    for _ in range(1000):
+        est.sample(0.05)
+        est.backoff()
+        est.progress()
+    assert est.trace is None
+    with pytest.raises(ValueError):
+        est.write_trace(str(tmp_path / 'trace.csv'))
+
+
+def test_invalid_clamps():
+    """min_rto above max_rto should be rejected."""
+    with pytest.raises(ValueError):
+        RtoEstimator(min_rto=2.0, max_rto=1.0)
@@ -0,0 +1,164 @@
+import sys
+import os
+import io
+import tempfile
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from packet import DataPacket
+from segments import FrameStore, MmapSegments, StreamSegments
+
+
+def test_frame_matches_serialize():
+    """Cached frame should be byte-identical to DataPacket.serialize()."""
+    segments = [b'abc', b'defg', b'']
+    store = FrameStore(segments)
+    for seq, data in enumerate(segments):
+        assert bytes(store.frame(seq)) == DataPacket(seq, data).serialize()
+
+
+def test_frame_built_once():
+    """Repeated frame() calls should return the same buffer without rebuilding."""
+    store = FrameStore([b'x' * 100, b'y' * 100])
+    first = store.frame(0)
+    assert store.frame(0) is first
+    store.frame(0)
+    assert store.built == 1
+
+
+def test_frame_uses_precomputed_checksum():
+    """Supplied checksums should be written into the header as-is."""
+    store = FrameStore([b'data'], checksums=[0x1234])
+    assert DataPacket.deserialize(bytes(store.frame(0))) is None
+    assert bytes(store.frame(0)[4:6]) == b'\x12\x34'
+
+
+def test_bounded_store_releases_acked_frames():
+    """Bounded mode should drop frames below the released base."""
+    store = FrameStore([b'a', b'b', b'c', b'd'], bounded=True)
+    for seq in range(3):
+        store.frame(seq)
+    store.release(2)
+    assert sorted(store.frames) == [2]
+
+
+def test_unbounded_store_keeps_frames():
+    """Default mode should keep every frame for the whole transfer."""
+    store = FrameStore([b'a', b'b'])
+    store.frame(0)
+    store.frame(1)
+    store.release(2)
+    assert sorted(store.frames) == [0, 1]
+
+
+@pytest.fixture
+def mapped_file():
+    """Temporary file of 1050 bytes opened for reading."""
+    temp = tempfile.NamedTemporaryFile(delete=False)
+    temp.write(bytes(range(256)) * 4 + b'z' * 26)
+    temp.close()
+    f = open(temp.name, 'rb')
+    yield f
+    f.close()
+    os.remove(temp.name)
+
+
+def test_mmap_segments_slices(mapped_file):
+    """Segment i should be the file slice starting at i * mss."""
+    content = mapped_file.read()
+    segments = MmapSegments(mapped_file, 100)
+    assert len(segments) == 11
+    assert bytes(segments[3]) == content[300:400]
+    assert bytes(segments[10]) == content[1000:]
+    segments.close()
+
+
+def test_mmap_segments_index_error(mapped_file):
+    """Indexing past the last segment should raise IndexError."""
+    segments = MmapSegments(mapped_file, 500)
+    with pytest.raises(IndexError):
+        segments[3]
+    segments.close()
+
+
+def test_mmap_segments_frames(mapped_file):
+    """Frames built from mapped segments should match in-memory frames."""
+    content = mapped_file.read()
+    segments = MmapSegments(mapped_file, 100)
+    store = FrameStore(segments, bounded=True)
+    assert bytes(store.frame(2)) == DataPacket(2, content[200:300]).serialize()
+    store = None
+    segments.close()
+
+
+class ShortReader(io.RawIOBase):
+    """Pipe-like reader that returns at most 7 bytes per read."""
+    
+    def __init__(self, data):
+        self.source = io.BytesIO(data)
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buf):
+        chunk = self.source.read(min(len(buf), 7))
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def test_stream_segments_read_lazily():
+    """Segments should only be read when requested and within the ring."""
+    data = os.urandom(1050)
+    stream = StreamSegments(io.BytesIO(data), 100, 4)
+    assert len(stream) == 0
+    assert stream.read_ahead(1)
+    assert len(stream) == 2
+    assert bytes(stream[1]) == data[100:200]
+    assert not stream.read_ahead(4)
+    assert len(stream) == 4
+
+
+def test_stream_segments_ring_reuse():
+    """Releasing the base should free slots for further read-ahead."""
+    data = os.urandom(1050)
+    stream = StreamSegments(io.BytesIO(data), 100, 4)
+    received = []
+    seq = 0
+    while stream.read_ahead(seq):
+        received.append(bytes(stream[seq]))
+        stream.release(seq + 1)
+        seq += 1
+    assert stream.eof
+    assert len(stream) == 11
+    assert b''.join(received) == data
+    with pytest.raises(IndexError):
+        stream[0]
+
+
+def test_stream_segments_short_reads():
+    """Short reads from pipes should still produce full MSS segments."""
+    data = os.urandom(250)
+    stream = StreamSegments(ShortReader(data), 100, 8)
+    assert not stream.read_ahead(5)
+    assert stream.eof
+    assert [len(stream[i]) for i in range(len(stream))] == [100, 100, 50]
+
+
+def test_stream_segments_never_block_on_pipe():
+    """An empty pipe should leave the partial segment pending, not block until EOF."""
+    data = os.urandom(250)
+    read_fd, write_fd = os.pipe()
+    with open(read_fd, 'rb') as source:
+        stream = StreamSegments(source, 100, 8)
+        os.write(write_fd, data[:150])
+        assert stream.read_ahead(0)
+        assert not stream.read_ahead(1)
+        assert stream.waiting and not stream.eof
+        os.write(write_fd, data[150:])
+        os.close(write_fd)
+        assert not stream.read_ahead(5)
+        assert stream.eof and not stream.waiting
+        assert b''.join(bytes(stream[i]) for i in range(len(stream))) == data
+        stream.close()
+        # Blocking mode is restored for whoever reads the descriptor next
+        assert os.get_blocking(read_fd)
@@ -4,12 +4,16 @@ import socket
 import threading
 import tempfile
 import time
+import hashlib
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import server as server_module
 from server import SimpleFTPServer
-from packet import DataPacket
+from packet import (DataPacket, AckPacket, SackPacket, OpenPacket, ClosePacket, ControlReply,
+                    PACKET_TYPE_OPEN, PACKET_TYPE_CLOSE, STATUS_OK, STATUS_MISMATCH, FLAG_WINDOW,
+                    HEADER, PACKET_TYPE_ACK, PACKET_TYPE_ACK_SR, PACKET_TYPE_SACK)
 
 
 @pytest.fixture
@@ -127,3 +131,352 @@ def test_server_ignores_out_of_order(temp_files, test_port):
     with open(temp_files, 'rb') as f:
         data = f.read()
     assert data == b'In'
+
+
+def test_server_sessions_per_client(temp_files, test_port):
+    """Interleaved packets from two clients should go to separate outputs."""
+    template = temp_files + '.{port}'
+    server = SimpleFTPServer(test_port, template, 0.0)
+    server.start()
+    socks = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(2)]
+    for sock in socks:
+        sock.bind(('127.0.0.1', 0))
+    
+    def send_packets():
+        time.sleep(0.1)
+        for seq in range(3):
+            for i, sock in enumerate(socks):
+                pkt = DataPacket(seq, f'c{i}s{seq};'.encode())
+                sock.sendto(pkt.serialize(), ('127.0.0.1', test_port))
+                time.sleep(0.01)
+        time.sleep(0.1)
+        server.stop()
+    
+    sender = threading.Thread(target=send_packets)
+    sender.start()
+    server.run()
+    sender.join()
+    
+    for i, sock in enumerate(socks):
+        path = template.format(port=sock.getsockname()[1])
+        with open(path, 'rb') as f:
+            assert f.read() == f'c{i}s0;c{i}s1;c{i}s2;'.encode()
+        os.remove(path)
+        sock.close()
+
+
+def test_server_session_limit(temp_files, test_port):
+    """Clients beyond max_sessions should be ignored while sessions are active."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0, max_sessions=1)
+    server.start()
+    server._handle_packet(DataPacket(0, b'first').serialize(), ('127.0.0.1', 40001))
+    server._handle_packet(DataPacket(0, b'second').serialize(), ('127.0.0.1', 40002))
+    assert list(server.sessions) == [('127.0.0.1', 40001)]
+    server.stop()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'first'
+
+
+def test_server_idle_eviction(temp_files, test_port):
+    """Idle sessions should be closed and free their slot."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0, max_sessions=1, idle_timeout=0.0)
+    server.start()
+    server._handle_packet(DataPacket(0, b'first').serialize(), ('127.0.0.1', 40001))
+    time.sleep(0.01)
+    server._handle_packet(DataPacket(0, b'second').serialize(), ('127.0.0.1', 40002))
+    assert list(server.sessions) == [('127.0.0.1', 40002)]
+    server.stop()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'second'
+
+
+def test_server_selective_repeat_buffers(temp_files, test_port):
+    """SR packets should be buffered out of order and ACKed individually."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    
+    for seq, data in ((1, b'B'), (2, b'C'), (0, b'A')):
+        server._handle_packet(DataPacket(seq, data, mode='sr').serialize(), addr)
+    acks = [AckPacket.deserialize(client.recvfrom(64)[0]) for _ in range(3)]
+    assert [ack.ack_seq for ack in acks] == [1, 2, 0]
+    assert all(ack.selective for ack in acks)
+    assert server.expected_seq == 3
+    server.stop()
+    client.close()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'ABC'
+
+
+def test_server_buffers_copy_of_view(temp_files, test_port):
+    """Out-of-order payloads received into a reused buffer must be copied before buffering."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    addr = ('127.0.0.1', 40000)
+    slot = bytearray(64)
+    for seq, data in ((1, b'B'), (2, b'C'), (0, b'A')):
+        frame = DataPacket(seq, data, mode='sr').serialize()
+        slot[:len(frame)] = frame
+        server._handle_packet(memoryview(slot)[:len(frame)], addr)
+    server.stop()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'ABC'
+
+
+def test_server_flushes_when_idle(temp_files, test_port):
+    """Buffered output should reach the file once packets stop, before the session ends."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    server_thread = threading.Thread(target=server.run)
+    server_thread.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for seq, data in enumerate((b'write', b'-', b'behind')):
+        client.sendto(DataPacket(seq, data).serialize(), ('127.0.0.1', server.port))
+    time.sleep(0.3)
+    try:
+        with open(temp_files, 'rb') as f:
+            assert f.read() == b'write-behind'
+    finally:
+        server.stop()
+        server_thread.join()
+        client.close()
+
+
+def test_server_advertises_window(temp_files, test_port):
+    """ACKs to a sender that opened with FLAG_WINDOW carry the receive window unless turned off."""
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    for advertise, expected in ((True, 8), (False, None)):
+        server = SimpleFTPServer(test_port, temp_files, 0.0, reassembly_limit=8,
+                                 advertise_window=advertise)
+        server.start()
+        server._handle_packet(OpenPacket(1, 'x', 2, 1, 8, flags=FLAG_WINDOW).serialize(), addr)
+        client.recvfrom(64)
+        server._handle_packet(DataPacket(0, b'A').serialize(), addr)
+        server._handle_packet(DataPacket(2, b'C', mode='sack').serialize(), addr)
+        ack = AckPacket.deserialize(client.recvfrom(64)[0])
+        sack = SackPacket.deserialize(client.recvfrom(64)[0])
+        assert ack.rwnd == sack.rwnd == expected
+        server.stop()
+    client.close()
+
+
+@pytest.mark.parametrize('open_first', [False, True])
+def test_server_old_senders_get_plain_acks(temp_files, test_port, open_first):
+    """Senders without FLAG_WINDOW (no OPEN at all, or an OPEN without it) get the original frames."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    if open_first:
+        server._handle_packet(OpenPacket(1, 'x', 3, 1, 8).serialize(), addr)
+        client.recvfrom(64)
+    
+    server._handle_packet(DataPacket(0, b'A').serialize(), addr)
+    raw = client.recvfrom(64)[0]
+    assert len(raw) == HEADER.size
+    assert HEADER.unpack(raw) == (0, 0, PACKET_TYPE_ACK)
+    server._handle_packet(DataPacket(1, b'B', mode='sr').serialize(), addr)
+    raw = client.recvfrom(64)[0]
+    assert len(raw) == HEADER.size and HEADER.unpack(raw)[2] == PACKET_TYPE_ACK_SR
+    server._handle_packet(DataPacket(3, b'D', mode='sack').serialize(), addr)
+    sack = client.recvfrom(64)[0]
+    assert HEADER.unpack_from(sack)[2] == PACKET_TYPE_SACK
+    assert SackPacket.deserialize(sack).rwnd is None
+    server.stop()
+    client.close()
+
+
+def test_server_refuses_when_writer_full(temp_files, test_port, monkeypatch):
+    """In-order segments that would block on a backed-up writer are dropped unacknowledged."""
+    release = threading.Event()
+    
+    class StalledWriter(server_module.WriteBehind):
+        def _write(self, buffers, offset):
+            release.wait(5)
+            super()._write(buffers, offset)
+    
+    monkeypatch.setattr(server_module, 'WriteBehind', StalledWriter)
+    server = SimpleFTPServer(test_port, temp_files, 0.0, write_chunk=4, write_queue=1)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    
+    server._handle_packet(OpenPacket(1, 'x', 24, 4, 8, flags=FLAG_WINDOW).serialize(), addr)
+    client.recvfrom(64)
+    for seq in range(6):
+        server._handle_packet(DataPacket(seq, b'abcd').serialize(), addr)
+    session = server.last_session
+    assert session.overflows > 0
+    accepted = session.expected_seq
+    assert accepted < 6
+    acks = [AckPacket.deserialize(client.recvfrom(64)[0]) for _ in range(accepted)]
+    assert [ack.ack_seq for ack in acks] == list(range(accepted))
+    # The window closed as the writer backed up
+    assert acks[-1].rwnd == 0
+    release.set()
+    server.stop()
+    client.close()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'abcd' * accepted
+
+
+def test_server_sack_blocks(temp_files, test_port):
+    """SACK packets should report the cumulative ACK and the newest range first."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    
+    for seq in (0, 2, 3, 5, 1):
+        server._handle_packet(DataPacket(seq, bytes([65 + seq]), mode='sack').serialize(), addr)
+    sacks = [SackPacket.deserialize(client.recvfrom(256)[0]) for _ in range(5)]
+    assert [sack.ack_seq for sack in sacks] == [1, 1, 1, 1, 4]
+    assert sacks[2].blocks == [(2, 4)]
+    assert sacks[3].blocks == [(5, 6), (2, 4)]
+    assert sacks[4].blocks == [(5, 6)]
+    server.stop()
+    client.close()
+    
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'ABCD'
+
+
+def test_server_open_close_transfer(temp_files, test_port):
+    """OPEN preallocates and names the output, CLOSE verifies it and ends the session."""
+    output = temp_files + '.{name}'
+    server = SimpleFTPServer(test_port, output, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    path = temp_files + '.notes.txt'
+    data = [b'open', b'-', b'close']
+    
+    try:
+        server._handle_packet(OpenPacket(42, 'dir/notes.txt', 1000, 5, 4).serialize(), addr)
+        reply = ControlReply.deserialize(client.recvfrom(64)[0])
+        assert (reply.transfer_id, reply.answered, reply.status) == (42, PACKET_TYPE_OPEN, STATUS_OK)
+        session = server.sessions[addr]
+        assert session.path == path
+        if session.writer.preallocated:
+            assert os.path.getsize(path) == 1000
+        
+        for seq, payload in enumerate(data):
+            server._handle_packet(DataPacket(seq, payload).serialize(), addr)
+            client.recvfrom(64)
+        digest = hashlib.sha256(b''.join(data)).digest()
+        close = ClosePacket(42, 10, digest).serialize()
+        server._handle_packet(close, addr)
+        reply = ControlReply.deserialize(client.recvfrom(64)[0])
+        assert (reply.answered, reply.status) == (PACKET_TYPE_CLOSE, STATUS_OK)
+        assert addr not in server.sessions
+        with open(path, 'rb') as f:
+            assert f.read() == b'open-close'
+        result = server.completed[0]
+        assert (result['name'], result['bytes'], result['digest_ok']) == ('dir/notes.txt', 10, True)
+        
+        # A retransmitted CLOSE is answered again; late data is ignored
+        server._handle_packet(close, addr)
+        assert ControlReply.deserialize(client.recvfrom(64)[0]).status == STATUS_OK
+        server._handle_packet(DataPacket(2, b'close').serialize(), addr)
+        assert addr not in server.sessions
+        assert len(server.completed) == 1
+    finally:
+        server.stop()
+        client.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def test_server_replayed_open_keeps_closed_output(temp_files, test_port):
+    """A late copy of the OPEN of a closed transfer must not reopen (truncate) its output."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    open_pkt = OpenPacket(9, 'x', 3, 3, 1).serialize()
+    
+    server._handle_packet(open_pkt, addr)
+    client.recvfrom(64)
+    server._handle_packet(DataPacket(0, b'abc').serialize(), addr)
+    client.recvfrom(64)
+    server._handle_packet(ClosePacket(9, 3, hashlib.sha256(b'abc').digest()).serialize(), addr)
+    assert ControlReply.deserialize(client.recvfrom(64)[0]).status == STATUS_OK
+    
+    server._handle_packet(open_pkt, addr)
+    reply = ControlReply.deserialize(client.recvfrom(64)[0])
+    assert (reply.transfer_id, reply.answered, reply.status) == (9, PACKET_TYPE_OPEN, STATUS_OK)
+    assert addr not in server.sessions
+    with open(temp_files, 'rb') as f:
+        assert f.read() == b'abc'
+    # A new transfer from the same address still starts a session
+    server._handle_packet(OpenPacket(10, 'y', 1, 1, 1).serialize(), addr)
+    client.recvfrom(64)
+    assert server.sessions[addr].transfer_id == 10
+    server.stop()
+    client.close()
+
+
+@pytest.mark.parametrize('mode', ['gbn', 'sr'])
+def test_server_late_seq_zero_keeps_handshake_transfer(temp_files, test_port, mode):
+    """A duplicate of segment 0 mid-transfer must not restart a transfer opened with OPEN."""
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    segments = [os.urandom(10) for _ in range(150)]
+    data = b''.join(segments)
+    
+    server._handle_packet(OpenPacket(5, 'x', len(data), 10, 8, mode).serialize(), addr)
+    for seq, segment in enumerate(segments):
+        server._handle_packet(DataPacket(seq, segment, mode=mode).serialize(), addr)
+        if seq == 120:
+            server._handle_packet(DataPacket(0, segments[0], mode=mode).serialize(), addr)
+    server._handle_packet(ClosePacket(5, len(data), hashlib.sha256(data).digest()).serialize(), addr)
+    assert server.completed[0]['digest_ok'] is True
+    with open(temp_files, 'rb') as f:
+        assert f.read() == data
+    server.stop()
+    client.close()
+
+
+def test_server_close_reports_mismatch(temp_files, test_port):
+    server = SimpleFTPServer(test_port, temp_files, 0.0)
+    server.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    addr = client.getsockname()
+    client.settimeout(1.0)
+    
+    server._handle_packet(OpenPacket(7, 'x', 2, 1, 1).serialize(), addr)
+    client.recvfrom(64)
+    server._handle_packet(DataPacket(0, b'a').serialize(), addr)
+    client.recvfrom(64)
+    server._handle_packet(ClosePacket(7, 2, hashlib.sha256(b'ab').digest()).serialize(), addr)
+    assert ControlReply.deserialize(client.recvfrom(64)[0]).status == STATUS_MISMATCH
+    assert server.completed[0]['digest_ok'] is False
+    server.stop()
+    client.close()
+    # The preallocated tail is trimmed on close
+    assert os.path.getsize(temp_files) == 1
@@ -0,0 +1,40 @@
+import sys
+import os
+import tempfile
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bench'))
+
+from sweep import run_sweep, load_checkpoint, summarize, SWEEPS
+
+
+@pytest.fixture
+def paths():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, 'input.bin')
+        with open(input_file, 'wb') as f:
+            f.write(os.urandom(20000))
+        yield input_file, os.path.join(tmp, 'cells.jsonl')
+
+
+def test_sweep_runs_in_parallel_and_resumes(paths):
+    """Every cell runs once; a second invocation only runs what is missing."""
+    input_file, checkpoint = paths
+    points = len(SWEEPS['task2'][1])
+    results = run_sweep('task2', input_file, 1, 2, checkpoint)
+    assert len(results) == points
+    assert all(result['ok'] for result in results)
+    assert {result['params']['mss'] for result in results} == set(SWEEPS['task2'][1])
+    
+    # A killed sweep can leave a partial last line behind
+    with open(checkpoint, 'a') as f:
+        f.write('{"window": 6')
+    assert len(load_checkpoint(checkpoint)) == points
+    assert run_sweep('task2', input_file, 1, 2, checkpoint) == []
+    # More runs per point only add the new cells
+    assert len(run_sweep('task2', input_file, 2, 2, checkpoint)) == points
+    
+    times = summarize(checkpoint, 'task2', 2)
+    assert all(len(runs) == 2 for runs in times.values())
+    # Another configuration does not reuse these cells
+    assert summarize(checkpoint, 'task2', 2, congestion='reno') == {}
+    assert len(load_checkpoint(checkpoint)) == 2 * points
@@ -0,0 +1,116 @@
+import sys
+import os
+import tempfile
+import threading
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from writer import WriteBehind
+
+
+class StalledWriter(WriteBehind):
+    """Writer thread that blocks until `release` is set."""
+    
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+    
+    def _write(self, buffers, offset):
+        self.release.wait(5)
+        super()._write(buffers, offset)
+
+
+@pytest.fixture
+def path():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield os.path.join(tmp, 'out.bin')
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_coalesces_into_chunks(path, threaded):
+    """Many small writes should reach the file as whole chunks."""
+    data = os.urandom(10000)
+    writer = WriteBehind(path, chunk_size=1000, threaded=threaded)
+    for i in range(0, len(data), 100):
+        writer.write(memoryview(data)[i:i + 100])
+    writer.close()
+    assert read(path) == data
+    assert writer.syscalls <= 10
+
+
+def test_writes_spanning_chunks(path):
+    """A write larger than the remaining chunk space is split across chunks."""
+    data = os.urandom(2500)
+    writer = WriteBehind(path, chunk_size=1000)
+    writer.write(data[:300])
+    writer.write(data[300:])
+    assert read(path) == data[:2000]
+    writer.close()
+    assert read(path) == data
+
+
+def test_flush_keeps_chunk_alignment(path):
+    """A flushed partial chunk is on disk, and later written again as a whole chunk."""
+    writer = WriteBehind(path, chunk_size=8)
+    writer.write(b'abc')
+    assert read(path) == b''
+    writer.flush()
+    assert read(path) == b'abc'
+    writer.write(b'defgh')
+    assert writer.offset == 8
+    writer.write(b'ij')
+    writer.close()
+    assert read(path) == b'abcdefghij'
+
+
+def test_max_delay_flushes(path):
+    """Data waiting longer than max_delay is written by the next write."""
+    writer = WriteBehind(path, chunk_size=1024, max_delay=0.0)
+    writer.write(b'x')
+    writer.write(b'y')
+    assert read(path) == b'xy'
+    writer.close()
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_truncate_restarts(path, threaded):
+    writer = WriteBehind(path, chunk_size=4, threaded=threaded)
+    writer.write(b'old data')
+    writer.truncate()
+    writer.write(b'new')
+    writer.close()
+    assert read(path) == b'new'
+
+
+@pytest.mark.parametrize('policy', ['none', 'end', 'periodic'])
+def test_fsync_policies(path, policy):
+    writer = WriteBehind(path, chunk_size=4, fsync=policy, fsync_interval=0.0)
+    writer.write(b'durable')
+    writer.close()
+    assert read(path) == b'durable'
+
+
+def test_room_shrinks_while_writer_stalls(path):
+    """A backed-up writer thread reports less room and flushes without blocking."""
+    writer = StalledWriter(path, chunk_size=4, threaded=True, max_queued=2)
+    assert writer.room == 2 * 4 + 3
+    writer.write(b'abcd')
+    # The thread may already hold the first chunk; the queue keeps at most two
+    writer.write(b'efgh')
+    writer.write(b'ij')
+    assert writer.room < 2 * 4 + 3
+    writer.flush()
+    writer.release.set()
+    writer.close()
+    assert read(path) == b'abcdefghij'
+    assert writer.queued == 0
+
+
+def test_rejects_unknown_policy(path):
+    with pytest.raises(ValueError):
+        WriteBehind(path, fsync='sometimes')